@@ -0,0 +1,93 @@
+"""
+Book ingestion throughput: chunked INSERT ... ON CONFLICT DO NOTHING versus
+the previous one-SELECT-per-row + session.add() path.
+
+    python benchmarks/bench_ingest.py --books 100000 --dup-ratio 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from sqlalchemy import and_, select  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.models import book, review, user  # noqa: E402,F401
+from app.models.book import Book  # noqa: E402
+from app.repositories.book_repo import BookRepository  # noqa: E402
+
+
+def synthetic_rows(n: int, dup_ratio: float, seed: int = 11):
+    rnd = random.Random(seed)
+    rows = [
+        {"title": f"Title {i}", "author": f"Author {i % 997}", "genre": "Bench"}
+        for i in range(n)
+    ]
+    rows += rnd.sample(rows, int(n * dup_ratio))
+    rnd.shuffle(rows)
+    return rows
+
+
+async def legacy_ingest(session, rows) -> int:
+    """Reference copy of the old per-row existence check + ORM add."""
+    inserted = 0
+    for row in rows:
+        stmt = select(Book).where(
+            and_(Book.title == row["title"], Book.author == row["author"])
+        )
+        if (await session.execute(stmt)).scalar_one_or_none() is None:
+            session.add(Book(**row))
+            await session.flush()
+            inserted += 1
+    await session.commit()
+    return inserted
+
+
+async def run(label: str, url: str, rows, ingest) -> None:
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    async with sessions() as session:
+        t0 = time.perf_counter()
+        inserted = await ingest(session, rows)
+        elapsed = time.perf_counter() - t0
+    await engine.dispose()
+    print(
+        f"{label:<8} {len(rows):>8} rows  {inserted:>8} inserted  "
+        f"{elapsed:>7.2f}s  {len(rows) / elapsed:>10.0f} rows/s"
+    )
+
+
+async def bulk_ingest(session, rows) -> int:
+    return (await BookRepository(session).ingest_books(rows)).inserted
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=50_000)
+    parser.add_argument("--dup-ratio", type=float, default=0.2)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    rows = synthetic_rows(args.books, args.dup_ratio)
+    with tempfile.TemporaryDirectory() as tmp:
+        await run("bulk", f"sqlite+aiosqlite:///{tmp}/bulk.db", rows, bulk_ingest)
+        if not args.skip_legacy:
+            await run(
+                "legacy", f"sqlite+aiosqlite:///{tmp}/legacy.db", rows, legacy_ingest
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
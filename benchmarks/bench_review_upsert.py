@@ -0,0 +1,150 @@
+"""
+Review write throughput: the single INSERT ... ON CONFLICT DO UPDATE ...
+RETURNING upsert versus the previous book lookup + SELECT + INSERT/UPDATE +
+refresh path, with `--writers` concurrent sessions on a file database.
+
+    python benchmarks/bench_review_upsert.py --writes 5000 --users 2000 --writers 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+os.environ.setdefault("BOOK_LIST_CACHE_BACKEND", "none")
+
+from sqlalchemy import select  # noqa: E402
+from sqlalchemy.exc import IntegrityError  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.db.dialect import enforce_foreign_keys  # noqa: E402
+from app.models import book, recommendation, review, user  # noqa: E402,F401
+from app.models.book import Book  # noqa: E402
+from app.models.review import Review  # noqa: E402
+from app.repositories.book_repo import BookRepository  # noqa: E402
+from app.repositories.review_repo import ReviewRepository  # noqa: E402
+
+
+def synthetic_writes(n: int, users: int, books: int, seed: int = 5):
+    """(book_id, username, rating) triples; repeats of a pair become updates."""
+    rnd = random.Random(seed)
+    return [
+        (rnd.randint(1, books), f"user{rnd.randrange(users)}", rnd.randint(1, 5))
+        for _ in range(n)
+    ]
+
+
+async def legacy_upsert(session, book_id: int, username: str, rating: int) -> None:
+    """Reference copy of the old existence check + SELECT + INSERT/UPDATE path."""
+    repo = ReviewRepository(session)
+    if await session.get(Book, book_id) is None:
+        raise LookupError(book_id)
+    stmt = select(Review).where(Review.book_id == book_id, Review.username == username)
+    existing = (await session.execute(stmt)).scalars().first()
+    if existing is None:
+        existing = Review(
+            book_id=book_id, username=username, rating=rating, review_text=""
+        )
+        session.add(existing)
+        try:
+            await session.flush()
+        except IntegrityError:
+            await session.rollback()
+            existing = (await session.execute(stmt)).scalars().first()
+            old, existing.rating = existing.rating, rating
+            await repo._apply_rating_delta(
+                book_id, sum_delta=rating - old, count_delta=0
+            )
+        else:
+            await repo._apply_rating_delta(book_id, sum_delta=rating, count_delta=1)
+            repo._record_event(
+                book_id=book_id, username=username, old_rating=None, new_rating=rating
+            )
+    else:
+        old, existing.rating = existing.rating, rating
+        await repo._apply_rating_delta(book_id, sum_delta=rating - old, count_delta=0)
+        if rating != old:
+            repo._record_event(
+                book_id=book_id, username=username, old_rating=old, new_rating=rating
+            )
+    await session.commit()
+    await session.refresh(existing)
+
+
+async def single_statement_upsert(
+    session, book_id: int, username: str, rating: int
+) -> None:
+    await ReviewRepository(session).upsert(
+        book_id=book_id, username=username, rating=rating, review_text=""
+    )
+
+
+async def run(label: str, url: str, books: int, writes, writers: int, upsert) -> None:
+    engine = create_async_engine(url, pool_size=writers, max_overflow=0)
+    enforce_foreign_keys(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    async with sessions() as session:
+        await BookRepository(session).ingest_books(
+            [
+                {"title": f"Title {i}", "author": "Bench", "genre": "Bench"}
+                for i in range(books)
+            ]
+        )
+
+    async def writer(part) -> None:
+        async with sessions() as session:
+            for book_id, username, rating in part:
+                await upsert(session, book_id, username, rating)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(writer(writes[i::writers]) for i in range(writers)))
+    elapsed = time.perf_counter() - t0
+    await engine.dispose()
+    print(
+        f"{label:<8} {len(writes):>8} writes  {writers:>3} writers  "
+        f"{elapsed:>7.2f}s  {len(writes) / elapsed:>10.0f} writes/s"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writes", type=int, default=2_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--books", type=int, default=500)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--skip-legacy", action="store_true")
+    args = parser.parse_args()
+
+    writes = synthetic_writes(args.writes, args.users, args.books)
+    with tempfile.TemporaryDirectory() as tmp:
+        await run(
+            "upsert",
+            f"sqlite+aiosqlite:///{tmp}/upsert.db",
+            args.books,
+            writes,
+            args.writers,
+            single_statement_upsert,
+        )
+        if not args.skip_legacy:
+            await run(
+                "legacy",
+                f"sqlite+aiosqlite:///{tmp}/legacy.db",
+                args.books,
+                writes,
+                args.writers,
+                legacy_upsert,
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
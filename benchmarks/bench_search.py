@@ -0,0 +1,96 @@
+"""
+Compare the LIKE scan with the full-text search backend on a synthetic catalog.
+
+    python benchmarks/bench_search.py --books 200000 --repeat 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+os.environ.setdefault("DATABASE_URL", "sqlite+aiosqlite:///:memory:")
+
+from sqlalchemy import insert  # noqa: E402
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine  # noqa: E402
+
+from app.db.base import Base  # noqa: E402
+from app.models import book, review, user  # noqa: E402,F401
+from app.models.book import Book  # noqa: E402
+from app.repositories.book_repo import BookRepository  # noqa: E402
+from app.repositories.search import get_search_backend  # noqa: E402
+
+WORDS = (
+    "data python learning deep machine history war peace garden night river "
+    "city empire code design pattern system network cloud secret stone fire "
+    "ocean winter summer journey ghost kingdom algorithm theory practice art"
+).split()
+QUERIES = ["python", "deep learning", "secret garden", "algo", "empire stone", "zzz"]
+
+
+def synthetic_rows(n: int, seed: int = 7):
+    rnd = random.Random(seed)
+    for i in range(n):
+        title = " ".join(rnd.choices(WORDS, k=rnd.randint(2, 6))).title()
+        author = f"{rnd.choice(WORDS).title()} {rnd.choice(WORDS).title()} {i}"
+        yield {"title": f"{title} {i}", "author": author, "genre": rnd.choice(WORDS)}
+
+
+async def build_catalog(url: str, n: int) -> None:
+    engine = create_async_engine(url)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        rows = list(synthetic_rows(n))
+        for start in range(0, n, 5000):
+            await conn.execute(insert(Book), rows[start : start + 5000])
+    await engine.dispose()
+
+
+async def time_backend(url: str, backend: str, repeat: int) -> dict:
+    engine = create_async_engine(url)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    timings = {}
+    async with sessions() as session:
+        repo = BookRepository(
+            session, search_backend=get_search_backend(engine.dialect.name, backend)
+        )
+        for q in QUERIES:
+            samples = []
+            for _ in range(repeat):
+                t0 = time.perf_counter()
+                await repo.list_with_avg(search=q, limit=50, offset=0)
+                samples.append((time.perf_counter() - t0) * 1000)
+            timings[q] = statistics.median(samples)
+    await engine.dispose()
+    return timings
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--books", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite+aiosqlite:///{tmp}/bench.db"
+        t0 = time.perf_counter()
+        await build_catalog(url, args.books)
+        print(f"catalog: {args.books} books built in {time.perf_counter() - t0:.1f}s")
+
+        like = await time_backend(url, "like", args.repeat)
+        fts = await time_backend(url, "auto", args.repeat)
+
+    print(f"{'query':<16}{'LIKE ms':>10}{'FTS ms':>10}{'speedup':>10}")
+    for q in QUERIES:
+        print(f"{q:<16}{like[q]:>10.2f}{fts[q]:>10.2f}{like[q] / fts[q]:>9.1f}x")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
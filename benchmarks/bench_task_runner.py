@@ -0,0 +1,76 @@
+"""
+Per-task overhead of running Celery task coroutines with a fresh
+`asyncio.run()` each time versus the long-lived worker loop in
+`app.task.runner`. Each simulated task runs one small query and opens the
+HTTP client scope, like `refresh_books` does.
+
+    python benchmarks/bench_task_runner.py --tasks 200
+    DATABASE_URL=postgresql+asyncpg://... python benchmarks/bench_task_runner.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+os.environ.setdefault("SECRET_KEY", "bench")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+os.environ.setdefault(
+    "DATABASE_URL",
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}",
+)
+
+from sqlalchemy import text  # noqa: E402
+
+from app.clients.http import shared_http_client_scope  # noqa: E402
+from app.db import session as db_session  # noqa: E402
+from app.task import runner  # noqa: E402
+
+
+async def one_task() -> None:
+    async with shared_http_client_scope(), db_session.get_sessionmaker()() as session:
+        await session.execute(text("SELECT 1"))
+
+
+def per_task_loop(tasks: int) -> float:
+    """The old path: a new loop per task, so pooled connections can't be kept."""
+
+    async def _run() -> None:
+        try:
+            await one_task()
+        finally:
+            await db_session.get_engine().dispose()
+
+    t0 = time.perf_counter()
+    for _ in range(tasks):
+        asyncio.run(_run())
+    return (time.perf_counter() - t0) / tasks * 1000
+
+
+def long_lived_loop(tasks: int) -> float:
+    runner.init_worker_process()
+    try:
+        t0 = time.perf_counter()
+        for _ in range(tasks):
+            runner.run_task("bench", one_task())
+        return (time.perf_counter() - t0) / tasks * 1000
+    finally:
+        runner.shutdown_worker_process()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tasks", type=int, default=200)
+    args = parser.parse_args()
+
+    old = per_task_loop(args.tasks)
+    new = long_lived_loop(args.tasks)
+    print(f"asyncio.run per task: {old:7.3f} ms/task")
+    print(f"worker loop:          {new:7.3f} ms/task  ({old / new:.1f}x less overhead)")
+
+
+if __name__ == "__main__":
+    main()
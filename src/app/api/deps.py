@@ -3,6 +3,7 @@ from app.db.session import get_session
 from fastapi import Depends, HTTPException, status
 from jose import JWTError, jwt
 from app.core.config import settings
+from app.core.token_cache import token_cache
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
 
@@ -18,6 +19,9 @@ async def get_current_username(
     credentials: HTTPAuthorizationCredentials = Depends(bearer_scheme),
 ) -> str:
     token = credentials.credentials
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
@@ -27,6 +31,7 @@ async def get_current_username(
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
             )
+        token_cache.put(token, str(sub), payload.get("exp"))
         return str(sub)
     except JWTError:
         raise HTTPException(
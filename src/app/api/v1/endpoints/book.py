@@ -1,21 +1,92 @@
+from typing import List
+
 from app.celery_app import celery_app
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_db, get_current_username
-from app.schemas.book import BookRead
+from app.core.config import settings
+from app.core.etag import etag_matches, not_modified, set_etag
+from app.core.pagination import NEXT_CURSOR_HEADER
+from app.schemas.book import BookBatch, BookRead
+from app.schemas.recommendation import ScoredBookRead
 from app.services.book_service import BookService
+from app.services.recommendation_service import RecommendationService
 
 router = APIRouter(dependencies=[Depends(get_current_username)])
 
 
 @router.get("/", response_model=list[BookRead])
 async def get_books(
+    request: Request,
+    response: Response,
     search: str = Query(default=None, description="Search by title or author"),
     limit: int = Query(default=50, ge=1, le=100),
     offset: int = Query(default=0, ge=0),
+    cursor: str = Query(
+        default=None,
+        description="Opaque cursor from the previous page's X-Next-Cursor header; "
+        "takes precedence over offset",
+    ),
     db: AsyncSession = Depends(get_db),
 ) -> list[BookRead]:
-    return await BookService(db).list_books(search=search, limit=limit, offset=offset)
+    service = BookService(db)
+    # One version read for both: the tag and the (possibly cached) body
+    # then always describe the same catalog state.
+    version = await service.catalog_version()
+    etag = await service.listing_etag(
+        search=search, limit=limit, offset=offset, cursor=cursor, version=version
+    )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    page = await service.list_books_page(
+        search=search, limit=limit, offset=offset, cursor=cursor, version=version
+    )
+    set_etag(response, etag)
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
+
+
+@router.get("/batch", response_model=BookBatch)
+async def get_books_batch(
+    ids: List[str] = Query(
+        description="Book ids, comma-separated and/or repeated (ids=1,2&ids=3)",
+    ),
+    db: AsyncSession = Depends(get_db),
+) -> BookBatch:
+    """Many books by id in one query, in the requested order; unknown ids in `missing`."""
+    try:
+        book_ids = [
+            int(part) for value in ids for part in value.split(",") if part.strip()
+        ]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="ids must be integers") from exc
+    if len(book_ids) > settings.BOOKS_BATCH_MAX_IDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.BOOKS_BATCH_MAX_IDS} ids per request",
+        )
+    return await BookService(db).get_books(book_ids)
+
+
+@router.get("/{book_id}/similar", response_model=list[ScoredBookRead])
+async def get_similar_books(
+    book_id: int,
+    limit: int = Query(default=10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+) -> list[ScoredBookRead]:
+    """Books rated alike by the same readers (item-item collaborative filtering)."""
+    return await RecommendationService(db).similar_books(book_id=book_id, limit=limit)
+
+
+@router.get("/{book_id}/related", response_model=list[ScoredBookRead])
+async def get_related_books(
+    book_id: int,
+    limit: int = Query(default=10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+) -> list[ScoredBookRead]:
+    """Books with a similar title, author and genre (content-based, no reviews needed)."""
+    return await RecommendationService(db).related_books(book_id=book_id, limit=limit)
 
 
 @router.post("/refresh-books")
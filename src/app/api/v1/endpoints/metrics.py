@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Depends
+from app.api.deps import get_current_username
+from app.core.metrics import metrics
+
+router = APIRouter(dependencies=[Depends(get_current_username)])
+
+
+@router.get("/")
+async def get_metrics() -> dict:
+    """Snapshot of in-process counters, gauges and latency histograms."""
+    return metrics.snapshot()
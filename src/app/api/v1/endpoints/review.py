@@ -1,11 +1,63 @@
-from fastapi import APIRouter, Depends
+import json
+from typing import Any, List
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from app.api.deps import get_db, get_current_username
-from app.schemas.review import ReviewUpsertRequest, ReviewRead
+from app.core.config import settings
+from app.core.etag import etag_matches, not_modified, set_etag
+from app.core.json_stream import aiter_ndjson
+from app.core.pagination import NEXT_CURSOR_HEADER, TOTAL_COUNT_HEADER
+from app.schemas.review import (
+    ReviewBatchResult,
+    ReviewRead,
+    ReviewSort,
+    ReviewUpsertRequest,
+)
 from app.services.review_service import ReviewService
 
 router = APIRouter(dependencies=[Depends(get_current_username)])
 
+NDJSON_MEDIA_TYPES = {"application/x-ndjson", "application/ndjson", "application/jsonl"}
+
+
+@router.post("/batch", response_model=ReviewBatchResult)
+async def upsert_reviews_batch(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    username: str = Depends(get_current_username),
+) -> ReviewBatchResult:
+    """
+    Create or update up to REVIEWS_BATCH_MAX_ITEMS of the caller's reviews,
+    each `{"book_id", "rating", "review_text"}`: a JSON array, or NDJSON
+    (Content-Type application/x-ndjson) read line by line as it streams in.
+    """
+    records = await _read_batch(request, settings.REVIEWS_BATCH_MAX_ITEMS)
+    return await ReviewService(db).upsert_batch(username=username, records=records)
+
+
+async def _read_batch(request: Request, max_items: int) -> List[Any]:
+    """Raw batch items from the body; 400 if malformed, 413 past `max_items`."""
+    media_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    try:
+        if media_type in NDJSON_MEDIA_TYPES:
+            records: List[Any] = []
+            async for record in aiter_ndjson(request.stream()):
+                records.append(record)
+                if len(records) > max_items:
+                    break  # stop reading: the batch is rejected anyway
+        else:
+            records = json.loads(await request.body())
+            if not isinstance(records, list):
+                raise HTTPException(status_code=400, detail="Expected a JSON array")
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
+    if len(records) > max_items:
+        raise HTTPException(
+            status_code=413, detail=f"At most {max_items} reviews per batch"
+        )
+    return records
+
 
 @router.post("/{book_id}/reviews", response_model=ReviewRead)
 async def upsert_review(
@@ -21,6 +73,28 @@ async def upsert_review(
 
 @router.get("/{book_id}/reviews", response_model=list[ReviewRead])
 async def list_reviews(
-    book_id: int, db: AsyncSession = Depends(get_db)
+    book_id: int,
+    request: Request,
+    response: Response,
+    limit: int = Query(default=50, ge=1, le=500),
+    cursor: str = Query(
+        default=None,
+        description="Opaque cursor from the previous page's X-Next-Cursor header",
+    ),
+    sort: ReviewSort = Query(default="newest", description="newest or oldest first"),
+    db: AsyncSession = Depends(get_db),
 ) -> list[ReviewRead]:
-    return await ReviewService(db).list_for_book(book_id=book_id)
+    service = ReviewService(db)
+    etag = await service.listing_etag(
+        book_id=book_id, limit=limit, cursor=cursor, sort=sort
+    )
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified(etag)
+    page = await service.list_for_book_page(
+        book_id=book_id, limit=limit, cursor=cursor, sort=sort
+    )
+    set_etag(response, etag)
+    response.headers[TOTAL_COUNT_HEADER] = str(page.total)
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
+    return page.items
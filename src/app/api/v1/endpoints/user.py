@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.api.deps import get_db, get_current_username
+from app.schemas.recommendation import ScoredBookRead
+from app.services.recommendation_service import RecommendationService
+
+router = APIRouter(dependencies=[Depends(get_current_username)])
+
+
+@router.get("/me/recommendations", response_model=list[ScoredBookRead])
+async def get_my_recommendations(
+    limit: int = Query(default=10, ge=1, le=100),
+    db: AsyncSession = Depends(get_db),
+    username: str = Depends(get_current_username),
+) -> list[ScoredBookRead]:
+    return await RecommendationService(db).for_user(username=username, limit=limit)
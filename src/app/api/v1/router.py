@@ -1,7 +1,9 @@
 from fastapi import APIRouter
-from .endpoints import auth, book, review
+from .endpoints import auth, book, metrics, review, user
 
 api_router = APIRouter()
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(book.router, prefix="/books", tags=["books"])
 api_router.include_router(review.router, prefix="/reviews", tags=["reviews"])
+api_router.include_router(user.router, prefix="/users", tags=["users"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["metrics"])
@@ -1,11 +1,18 @@
 from celery import Celery
+from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
 from app.core.config import settings
+from app.task import runner
 
 celery_app = Celery(
     "basf_bookrec",
     broker=settings.REDIS_URL,
     backend=settings.CELERY_RESULT_BACKEND or settings.REDIS_URL,
-    include=["app.task.books"],  # auto-discover tasks in the specified module
+    include=[
+        "app.task.books",
+        "app.task.ratings",
+        "app.task.catalog",
+        "app.task.recommendations",
+    ],  # auto-discover tasks in the specified modules
 )
 
 celery_app.conf.update(
@@ -21,5 +28,35 @@ celery_app.conf.beat_schedule = {
         "task": "app.task.books.refresh_books",
         "schedule": 60 * 60 * 12,  # every 12 hours
         "args": ["Harry Potter", 10],  # default params: query, limit
-    }
+    },
+    # Multi-query sync over CATALOG_SYNC_QUERIES / CATALOG_SYNC_QUERIES_FILE
+    "sync-catalog": {
+        "task": "app.task.catalog.sync_catalog",
+        "schedule": settings.CATALOG_SYNC_INTERVAL_SECONDS,
+    },
+    "build-recommendations": {
+        "task": "app.task.recommendations.build_recommendations",
+        "schedule": settings.RECOMMENDER_REBUILD_INTERVAL_SECONDS,
+    },
+    "apply-review-events": {
+        "task": "app.task.recommendations.apply_review_events",
+        "schedule": settings.RECOMMENDER_EVENTS_INTERVAL_SECONDS,
+    },
+    "build-content-index": {
+        "task": "app.task.recommendations.build_content_index",
+        "schedule": settings.CONTENT_INDEX_REBUILD_INTERVAL_SECONDS,
+    },
 }
+
+
+# Long-lived event loop per worker process (see app.task.runner). Prefork
+# children get it at fork; solo/threads pools start it lazily on first task.
+@worker_process_init.connect
+def _init_worker_process(**_kwargs) -> None:
+    runner.init_worker_process()
+
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def _shutdown_worker_process(**_kwargs) -> None:
+    runner.shutdown_worker_process()
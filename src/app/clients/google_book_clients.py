@@ -1,9 +1,23 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import asyncio
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
 
 import httpx
 
+from app.clients.response_cache import CachedResponse, ResponseCache
+from app.core.config import settings
+from app.core.logging import setup_logger
+from app.core.rate_limit import RateLimiter
+
+logger = setup_logger(__name__)
+
+# Shared by every client in the process so concurrent queries (startup seed,
+# Celery refreshes) together stay under the API quota.
+_rate_limiter = RateLimiter(
+    settings.GOOGLE_BOOKS_REQUESTS_PER_SECOND, burst=settings.GOOGLE_BOOKS_RATE_BURST
+)
+
 
 class GoogleBooksClient:
     """
@@ -12,10 +26,33 @@ class GoogleBooksClient:
     """
 
     BASE_URL = "https://www.googleapis.com/books/v1/volumes"
+    PAGE_SIZE = 40  # API maximum for maxResults
 
-    def __init__(self, timeout: int = 10) -> None:
-        # Keep the same default timeout and client lifecycle.
-        self.client = httpx.AsyncClient(timeout=timeout)
+    def __init__(
+        self,
+        timeout: int = 10,
+        client: Optional[httpx.AsyncClient] = None,
+        *,
+        page_concurrency: Optional[int] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+        prefer_cache: bool = False,
+    ) -> None:
+        # An injected (shared, pooled) client is borrowed and never closed here;
+        # otherwise keep the original private client with the same timeout.
+        self._owns_client = client is None
+        self.client = (
+            client if client is not None else httpx.AsyncClient(timeout=timeout)
+        )
+        self.page_concurrency = max(
+            1, page_concurrency or settings.GOOGLE_BOOKS_PAGE_CONCURRENCY
+        )
+        self.rate_limiter = rate_limiter if rate_limiter is not None else _rate_limiter
+        # With a cache, fresh pages cost no request and stale ones are
+        # revalidated; `prefer_cache` serves any stored page (even stale)
+        # without touching the network, e.g. for startup seeding.
+        self.cache = cache
+        self.prefer_cache = prefer_cache
 
     # -------------------------------------------------------------------------
     # Public API
@@ -24,29 +61,166 @@ class GoogleBooksClient:
         self, query: str, max_results: int = 20
     ) -> List[Dict[str, Any]]:
         """
-        Fetch books for a query.
+        Fetch up to `max_results` books for a query.
+        - Pages through `startIndex` concurrently (the API caps a page at 40).
         - Raises for non-2xx responses (same as original via raise_for_status()).
-        - Returns a list of dicts with keys: title, author, genre.
+        - Returns a list of dicts with keys: title, author, genre, in API order
+          and without duplicate (title, author) pairs.
         """
-        params = self._build_search_params(query=query, max_results=max_results)
-        response = await self.client.get(self.BASE_URL, params=params)
-        response.raise_for_status()
+        pages: Dict[int, List[Dict[str, Any]]] = {}
+        async for start, books in self._fetch_pages(query, max_results):
+            pages[start] = books
 
-        data = response.json()
-        items = data.get("items", [])
-        return self._parse_items(items)
+        seen: Set[Tuple[str, str]] = set()
+        results: List[Dict[str, Any]] = []
+        for start in sorted(pages):
+            results.extend(self._dedupe(pages[start], seen))
+        return results
+
+    async def iter_pages(
+        self, query: str, max_results: int = 20
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Like `search_books`, but yield each parsed, de-duplicated page as soon
+        as it arrives (completion order), so callers can ingest while the
+        remaining pages are still in flight.
+        """
+        seen: Set[Tuple[str, str]] = set()
+        async for _start, books in self._fetch_pages(query, max_results):
+            fresh = self._dedupe(books, seen)
+            if fresh:
+                yield fresh
 
     async def close(self) -> None:
-        """Close the underlying HTTP client."""
-        await self.client.aclose()
+        """Close the underlying HTTP client if this instance created it."""
+        if self._owns_client:
+            await self.client.aclose()
 
     # -------------------------------------------------------------------------
     # Internal helpers
     # -------------------------------------------------------------------------
+    async def _fetch_pages(
+        self, query: str, max_results: int
+    ) -> AsyncIterator[Tuple[int, List[Dict[str, Any]]]]:
+        """
+        Request every page concurrently (bounded by `page_concurrency` and the
+        rate limiter) and yield `(start_index, books)` in completion order.
+        Pages past the reported `totalItems` are skipped without a request.
+        On error or early exit the outstanding requests are cancelled.
+        """
+        semaphore = asyncio.Semaphore(self.page_concurrency)
+        total_items: Optional[int] = None
+
+        async def fetch(start: int, size: int) -> Tuple[int, List[Dict[str, Any]]]:
+            nonlocal total_items
+            async with semaphore:
+                if total_items is not None and start >= total_items:
+                    return start, []
+                params = self._build_search_params(
+                    query=query, max_results=size, start_index=start
+                )
+                data = await self._get_json(params)
+                if isinstance(data.get("totalItems"), int):
+                    total_items = data["totalItems"]
+                return start, self._parse_items(data.get("items", []))
+
+        tasks = [
+            asyncio.ensure_future(fetch(start, size))
+            for start, size in self._page_plan(max_results)
+        ]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _get_json(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """GET one page, going through the response cache when configured."""
+        if self.cache is None:
+            await self.rate_limiter.acquire()
+            response = await self.client.get(self.BASE_URL, params=params)
+            response.raise_for_status()
+            return response.json()
+
+        cache = self.cache
+        entry = await asyncio.to_thread(cache.get, self.BASE_URL, params)
+        if entry is not None and (self.prefer_cache or cache.is_fresh(entry)):
+            return entry.body
+        return await self._revalidate(cache, params, entry)
+
+    async def _revalidate(
+        self,
+        cache: ResponseCache,
+        params: Dict[str, Any],
+        entry: Optional[CachedResponse],
+    ) -> Dict[str, Any]:
+        """
+        Conditional GET for a missing or stale page. A 304 refreshes the
+        stored copy; if the API errors or exceeds the (shorter) revalidation
+        timeout, the stale copy is served instead.
+        """
+        kwargs: Dict[str, Any] = {}
+        if entry is not None:
+            kwargs["headers"] = entry.conditional_headers()
+            kwargs["timeout"] = settings.GOOGLE_BOOKS_CACHE_REVALIDATE_TIMEOUT_SECONDS
+
+        await self.rate_limiter.acquire()
+        try:
+            response = await self.client.get(self.BASE_URL, params=params, **kwargs)
+            if entry is not None and response.status_code == 304:
+                await asyncio.to_thread(cache.refresh, entry)
+                return entry.body
+            response.raise_for_status()
+        except httpx.HTTPError as exc:
+            if entry is None:
+                raise
+            logger.warning(
+                "Google Books request failed (%s); serving cached page from %.0fs ago",
+                exc,
+                entry.age(),
+            )
+            return entry.body
+
+        data = response.json()
+        await asyncio.to_thread(
+            cache.put,
+            self.BASE_URL,
+            params,
+            data,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
+        return data
+
+    @classmethod
+    def _page_plan(cls, max_results: int) -> List[Tuple[int, int]]:
+        """(startIndex, maxResults) for each page needed to cover `max_results`."""
+        return [
+            (start, min(cls.PAGE_SIZE, max_results - start))
+            for start in range(0, max(max_results, 0), cls.PAGE_SIZE)
+        ]
+
     @staticmethod
-    def _build_search_params(*, query: str, max_results: int) -> Dict[str, Any]:
-        """Keep parameter names and semantics identical to the original."""
-        return {"q": query, "maxResults": max_results}
+    def _build_search_params(
+        *, query: str, max_results: int, start_index: int = 0
+    ) -> Dict[str, Any]:
+        """Original parameter names, plus `startIndex` for paging."""
+        return {"q": query, "maxResults": max_results, "startIndex": start_index}
+
+    @staticmethod
+    def _dedupe(
+        books: List[Dict[str, Any]], seen: Set[Tuple[str, str]]
+    ) -> List[Dict[str, Any]]:
+        """Drop books whose (title, author) was already returned."""
+        fresh = []
+        for book in books:
+            key = (book["title"], book["author"])
+            if key not in seen:
+                seen.add(key)
+                fresh.append(book)
+        return fresh
 
     def _parse_items(self, items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+# One connection-pooled client per process (API worker or Celery worker),
+# opened at startup and closed at shutdown.
+_shared_client: Optional[httpx.AsyncClient] = None
+
+
+def _http2_enabled() -> bool:
+    """HTTP/2 needs the optional `h2` package; fall back to HTTP/1.1 without it."""
+    if not settings.HTTP_CLIENT_HTTP2:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        logger.warning(
+            "HTTP_CLIENT_HTTP2 is set but 'h2' is not installed; using HTTP/1.1"
+        )
+        return False
+    return True
+
+
+def build_http_client(
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> httpx.AsyncClient:
+    """Create a keep-alive AsyncClient with the configured pool limits."""
+    return httpx.AsyncClient(
+        timeout=settings.HTTP_CLIENT_TIMEOUT_SECONDS,
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE,
+            keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS,
+        ),
+        http2=_http2_enabled(),
+        transport=transport,
+    )
+
+
+def get_shared_http_client() -> Optional[httpx.AsyncClient]:
+    """The process-wide client, or None when none has been opened."""
+    return _shared_client
+
+
+async def open_shared_http_client(
+    transport: Optional[httpx.AsyncBaseTransport] = None,
+) -> httpx.AsyncClient:
+    """Open the process-wide client (idempotent)."""
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = build_http_client(transport)
+    return _shared_client
+
+
+async def close_shared_http_client() -> None:
+    """Close the process-wide client and drop its pooled connections."""
+    global _shared_client
+    client, _shared_client = _shared_client, None
+    if client is not None:
+        await client.aclose()
+
+
+@asynccontextmanager
+async def shared_http_client_scope() -> AsyncIterator[httpx.AsyncClient]:
+    """
+    Use the process-wide client if one is open; otherwise open one for the
+    duration of the block (e.g. a single background job) and close it after.
+    """
+    existing = get_shared_http_client()
+    if existing is not None and not existing.is_closed:
+        yield existing
+        return
+
+    client = await open_shared_http_client()
+    try:
+        yield client
+    finally:
+        await close_shared_http_client()
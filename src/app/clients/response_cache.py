@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional
+
+from app.core.config import settings
+from app.core.logging import setup_logger
+from app.core.metrics import metrics
+
+logger = setup_logger(__name__)
+
+
+@dataclass
+class CachedResponse:
+    """A stored JSON response plus the validators needed to revalidate it."""
+
+    key: str
+    body: Any
+    stored_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (time.time() if now is None else now) - self.stored_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since for a revalidation request."""
+        headers: Dict[str, str] = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """
+    On-disk cache of JSON API responses, one file per (url, params).
+
+    - Entries younger than `ttl_seconds` are fresh and served without a
+      request; older ones are revalidated (ETag / Last-Modified) or served
+      stale when the remote fails. Entries stale for longer than
+      `max_stale_seconds` are dropped.
+    - The directory is kept under `max_bytes` by evicting the least recently
+      used files (file mtime is bumped on every hit).
+    - Writes go through a unique temp file + rename, so several threads and
+      processes (API workers, Celery workers) can share one directory.
+
+    Methods do blocking file I/O; async callers run them in a thread.
+    """
+
+    SUFFIX = ".json"
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        *,
+        ttl_seconds: float,
+        max_stale_seconds: float,
+        max_bytes: int,
+    ) -> None:
+        self.directory = Path(directory)
+        self.ttl_seconds = ttl_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self.max_bytes = max_bytes
+        self._approx_bytes: Optional[int] = None
+
+    # -------------------------------------------------------------------------
+    # Public API
+    # -------------------------------------------------------------------------
+    @staticmethod
+    def key_for(url: str, params: Mapping[str, Any]) -> str:
+        canonical = json.dumps([url, sorted((k, str(v)) for k, v in params.items())])
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def is_fresh(self, entry: CachedResponse, now: Optional[float] = None) -> bool:
+        return entry.age(now) < self.ttl_seconds
+
+    def get(self, url: str, params: Mapping[str, Any]) -> Optional[CachedResponse]:
+        """Return the stored entry (fresh or stale), or None."""
+        key = self.key_for(url, params)
+        path = self._path(key)
+        try:
+            raw = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            metrics.counter("http_cache.misses").inc()
+            return None
+        except (OSError, ValueError):
+            logger.warning("Dropping unreadable cache entry %s", path.name)
+            self._remove(path)
+            metrics.counter("http_cache.misses").inc()
+            return None
+
+        entry = CachedResponse(
+            key=key,
+            body=raw.get("body"),
+            stored_at=float(raw.get("stored_at", 0)),
+            etag=raw.get("etag"),
+            last_modified=raw.get("last_modified"),
+        )
+        if entry.age() >= self.ttl_seconds + self.max_stale_seconds:
+            self._remove(path)
+            metrics.counter("http_cache.misses").inc()
+            return None
+        self._touch(path)
+        metrics.counter("http_cache.hits").inc()
+        return entry
+
+    def put(
+        self,
+        url: str,
+        params: Mapping[str, Any],
+        body: Any,
+        *,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> CachedResponse:
+        """Store a response body with its validators, then enforce `max_bytes`."""
+        entry = CachedResponse(
+            key=self.key_for(url, params),
+            body=body,
+            stored_at=time.time(),
+            etag=etag,
+            last_modified=last_modified,
+        )
+        self._write(entry)
+        return entry
+
+    def refresh(self, entry: CachedResponse) -> CachedResponse:
+        """Mark an entry fresh again after a 304 Not Modified."""
+        entry.stored_at = time.time()
+        self._write(entry)
+        return entry
+
+    def clear(self) -> None:
+        for path in self._entries():
+            self._remove(path)
+        self._approx_bytes = 0
+
+    # -------------------------------------------------------------------------
+    # Internal helpers
+    # -------------------------------------------------------------------------
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}{self.SUFFIX}"
+
+    def _entries(self) -> list[Path]:
+        if not self.directory.is_dir():
+            return []
+        return [p for p in self.directory.iterdir() if p.suffix == self.SUFFIX]
+
+    def _write(self, entry: CachedResponse) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        payload = json.dumps(
+            {
+                "stored_at": entry.stored_at,
+                "etag": entry.etag,
+                "last_modified": entry.last_modified,
+                "body": entry.body,
+            },
+            separators=(",", ":"),
+        ).encode("utf-8")
+        path = self._path(entry.key)
+        try:
+            replaced = path.stat().st_size  # a refresh or re-put overwrites it
+        except FileNotFoundError:
+            replaced = 0
+        # A unique temp file per write: threads of one process may write
+        # the same key concurrently.
+        fd, tmp = tempfile.mkstemp(
+            dir=self.directory, prefix=f"{entry.key}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp, path)
+        except BaseException:
+            self._remove(Path(tmp))
+            raise
+
+        if self._approx_bytes is None:
+            self._approx_bytes = self._disk_usage()
+        else:
+            self._approx_bytes += len(payload) - replaced
+        if self._approx_bytes > self.max_bytes:
+            self._evict()
+
+    def _disk_usage(self) -> int:
+        total = 0
+        for path in self._entries():
+            try:
+                total += path.stat().st_size
+            except FileNotFoundError:
+                pass
+        return total
+
+    def _evict(self) -> None:
+        """Delete least recently used entries until usage is under 90% of `max_bytes`."""
+        stats = []
+        for path in self._entries():
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            stats.append((st.st_mtime, st.st_size, path))
+        stats.sort()
+
+        total = sum(size for _, size, _ in stats)
+        target = int(self.max_bytes * 0.9)
+        evicted = 0
+        for _, size, path in stats:
+            if total <= target:
+                break
+            self._remove(path)
+            total -= size
+            evicted += 1
+        self._approx_bytes = total
+        if evicted:
+            metrics.counter("http_cache.evictions").inc(evicted)
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    @staticmethod
+    def _remove(path: Path) -> None:
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """The process-wide Google Books cache, or None when GOOGLE_BOOKS_CACHE_DIR is empty."""
+    global _response_cache
+    if not settings.GOOGLE_BOOKS_CACHE_DIR:
+        return None
+    if _response_cache is None:
+        _response_cache = ResponseCache(
+            settings.GOOGLE_BOOKS_CACHE_DIR,
+            ttl_seconds=settings.GOOGLE_BOOKS_CACHE_TTL_SECONDS,
+            max_stale_seconds=settings.GOOGLE_BOOKS_CACHE_MAX_STALE_SECONDS,
+            max_bytes=settings.GOOGLE_BOOKS_CACHE_MAX_BYTES,
+        )
+    return _response_cache
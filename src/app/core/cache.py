@@ -0,0 +1,287 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+import time
+from collections import OrderedDict
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Optional,
+    Protocol,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from app.core.config import settings
+from app.core.logging import setup_logger
+from app.core.metrics import metrics
+
+logger = setup_logger(__name__)
+
+# Tags of the book listing cache: every page carries BOOKS_TAG plus one
+# book_tag() per book on it. A new book can shift any page, so inserts drop
+# BOOKS_TAG; a changed rating only drops the pages that show that book.
+BOOKS_TAG = "books"
+
+
+def book_tag(book_id: int) -> str:
+    return f"book:{book_id}"
+
+
+def cache_key(namespace: str, *parts: Any) -> str:
+    """Short, stable key for arbitrary JSON-able request parameters."""
+    digest = hashlib.sha1(json.dumps(parts, default=str).encode("utf-8")).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+class CacheBackend(Protocol):
+    """Storage for tagged byte values; TTLs are in seconds."""
+
+    async def get(self, key: str) -> Optional[bytes]: ...
+
+    async def set(
+        self, key: str, value: bytes, *, ttl: float, tags: Sequence[str]
+    ) -> None: ...
+
+    async def invalidate_tags(self, tags: Sequence[str]) -> int: ...
+
+    async def clear(self) -> None: ...
+
+
+# -----------------------------------------------------------------------------
+# Backends
+# -----------------------------------------------------------------------------
+class MemoryBackend:
+    """
+    In-process LRU with per-entry TTL and a tag -> keys index. Cheapest
+    option, but each process has its own copy and invalidations made by
+    another process (a Celery worker, another uvicorn worker) do not reach
+    it, so callers must put a shared version in their keys (the book
+    listing uses the DB "books" catalog version).
+    """
+
+    def __init__(
+        self, max_entries: int, *, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, bytes, Tuple[str, ...]]]" = (
+            OrderedDict()
+        )
+        self._tags: Dict[str, Set[str]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value, _ = entry
+        if expires_at <= self._clock():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(
+        self, key: str, value: bytes, *, ttl: float, tags: Sequence[str]
+    ) -> None:
+        if self.max_entries <= 0:
+            return
+        self._remove(key)
+        self._entries[key] = (self._clock() + ttl, value, tuple(tags))
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+            metrics.counter("cache.memory.evictions").inc()
+
+    async def invalidate_tags(self, tags: Sequence[str]) -> int:
+        keys: Set[str] = set()
+        for tag in tags:
+            keys |= self._tags.get(tag, set())
+        for key in keys:
+            self._remove(key)
+        return len(keys)
+
+    async def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisBackend:
+    """
+    Redis-backed cache shared by all processes. Values are plain keys with
+    an expiry; each tag is a set of the keys carrying it, expiring no earlier
+    than its newest member, so invalidation is SMEMBERS plus a DEL.
+    """
+
+    def __init__(self, client: Any, *, prefix: str = "cache:") -> None:
+        self.client = client
+        self.prefix = prefix
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}k:{key}"
+
+    def _tag(self, tag: str) -> str:
+        return f"{self.prefix}t:{tag}"
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self._key(key))
+
+    async def set(
+        self, key: str, value: bytes, *, ttl: float, tags: Sequence[str]
+    ) -> None:
+        seconds = max(1, math.ceil(ttl))
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.set(self._key(key), value, ex=seconds)
+            for tag in tags:
+                pipe.sadd(self._tag(tag), self._key(key))
+                pipe.expire(self._tag(tag), seconds)
+            await pipe.execute()
+
+    async def invalidate_tags(self, tags: Sequence[str]) -> int:
+        keys: Set[Any] = set()
+        for tag in tags:
+            keys |= set(await self.client.smembers(self._tag(tag)))
+        async with self.client.pipeline(transaction=True) as pipe:
+            if keys:
+                pipe.delete(*keys)
+            pipe.delete(*(self._tag(tag) for tag in tags))
+            results = await pipe.execute()
+        # Tag sets may list keys that already expired or were dropped via
+        # another tag, so report what DEL actually removed.
+        return results[0] if keys else 0
+
+    async def clear(self) -> None:
+        keys = [key async for key in self.client.scan_iter(match=f"{self.prefix}*")]
+        if keys:
+            await self.client.delete(*keys)
+
+
+# -----------------------------------------------------------------------------
+# Front end
+# -----------------------------------------------------------------------------
+class TaggedCache:
+    """
+    Cache front end: backend errors degrade to misses (a cache outage must
+    not fail requests), and hits/misses are counted per cache name as
+    `cache.<name>.hits` / `.misses` with the running `.hit_ratio` gauge.
+
+    `epoch` guards the read-then-fill race within a process: a caller reads
+    it before loading from the DB and passes it to `set`, which then skips
+    the write if an invalidation happened while the load was running.
+    """
+
+    def __init__(self, backend: CacheBackend, *, name: str, ttl_seconds: float) -> None:
+        self.backend = backend
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.epoch = 0
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:  # noqa: BLE001 – treat an unavailable cache as a miss
+            logger.warning("Cache %s get failed: %s", self.name, e)
+            value = None
+        self._count(hit=value is not None)
+        return value
+
+    async def set(
+        self,
+        key: str,
+        value: bytes,
+        *,
+        tags: Iterable[str],
+        epoch: Optional[int] = None,
+    ) -> None:
+        if epoch is not None and epoch != self.epoch:
+            return  # invalidated while the value was being computed
+        try:
+            await self.backend.set(key, value, ttl=self.ttl_seconds, tags=list(tags))
+        except Exception as e:  # noqa: BLE001
+            logger.warning("Cache %s set failed: %s", self.name, e)
+
+    async def invalidate(self, tags: Iterable[str]) -> int:
+        self.epoch += 1
+        tags = list(tags)
+        if not tags:
+            return 0
+        try:
+            dropped = await self.backend.invalidate_tags(tags)
+        except Exception as e:  # noqa: BLE001 – entries then live out their TTL
+            logger.error("Cache %s invalidation failed: %s", self.name, e)
+            return 0
+        metrics.counter(f"cache.{self.name}.invalidated").inc(dropped)
+        return dropped
+
+    async def clear(self) -> None:
+        self.epoch += 1
+        await self.backend.clear()
+
+    def _count(self, *, hit: bool) -> None:
+        hits = metrics.counter(f"cache.{self.name}.hits")
+        misses = metrics.counter(f"cache.{self.name}.misses")
+        (hits if hit else misses).inc()
+        total = hits.value + misses.value
+        metrics.gauge(f"cache.{self.name}.hit_ratio").set(hits.value / total)
+
+
+_book_list_cache: Optional[TaggedCache] = None
+
+
+def get_book_list_cache() -> Optional[TaggedCache]:
+    """The process-wide cache of GET /books pages, or None when disabled."""
+    global _book_list_cache
+    backend_name = settings.BOOK_LIST_CACHE_BACKEND
+    if backend_name == "none":
+        return None
+    if _book_list_cache is None:
+        if backend_name == "redis":
+            from redis import asyncio as aioredis
+
+            backend: CacheBackend = RedisBackend(
+                aioredis.from_url(
+                    settings.BOOK_LIST_CACHE_REDIS_URL or settings.REDIS_URL
+                )
+            )
+        elif backend_name == "memory":
+            backend = MemoryBackend(settings.BOOK_LIST_CACHE_MAX_ENTRIES)
+        else:
+            raise ValueError(f"Unknown BOOK_LIST_CACHE_BACKEND {backend_name!r}")
+        _book_list_cache = TaggedCache(
+            backend, name="books", ttl_seconds=settings.BOOK_LIST_CACHE_TTL_SECONDS
+        )
+    return _book_list_cache
+
+
+async def invalidate_books(book_ids: Iterable[int]) -> None:
+    """Drop cached listing pages showing any of `book_ids` (e.g. a rating changed)."""
+    cache = get_book_list_cache()
+    if cache is not None:
+        await cache.invalidate(book_tag(book_id) for book_id in book_ids)
+
+
+async def invalidate_book_listing() -> None:
+    """Drop every cached listing page (books were added)."""
+    cache = get_book_list_cache()
+    if cache is not None:
+        await cache.invalidate([BOOKS_TAG])
@@ -13,10 +13,70 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
+    AUTH_VERIFY_WORKERS: int = 4  # threads verifying login passwords
+    AUTH_VERIFY_QUEUE_SIZE: int = 32  # waiting logins before 503
+    TOKEN_CACHE_SIZE: int = 10000  # verified JWTs kept in memory; 0 disables
     GOOGLE_BOOKS_ENABLED: bool = True
     GOOGLE_BOOKS_DEFAULT_QUERY: str = "python programming"
     GOOGLE_BOOKS_MAX_RESULTS: int = 20
+    GOOGLE_BOOKS_PAGE_CONCURRENCY: int = 4  # volume pages fetched at once
+    GOOGLE_BOOKS_REQUESTS_PER_SECOND: float = 5.0  # per process, across queries
+    GOOGLE_BOOKS_RATE_BURST: int = 4
+    GOOGLE_BOOKS_CACHE_DIR: str = ".cache/google_books"  # empty disables the cache
+    GOOGLE_BOOKS_CACHE_TTL_SECONDS: float = 12 * 3600  # fresh: served without a request
+    # Kept this long past the TTL for revalidation, or as a fallback
+    GOOGLE_BOOKS_CACHE_MAX_STALE_SECONDS: float = 30 * 86400
+    GOOGLE_BOOKS_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    GOOGLE_BOOKS_CACHE_REVALIDATE_TIMEOUT_SECONDS: float = 3.0  # then serve stale
+    # Catalog sync: queries from the list and/or a file (one per line, '#' comments)
+    CATALOG_SYNC_QUERIES: list[str] = []
+    CATALOG_SYNC_QUERIES_FILE: str = ""
+    CATALOG_SYNC_CHUNK_SIZE: int = 50  # queries per Celery task
+    CATALOG_SYNC_CONCURRENCY: int = 8  # queries in flight within one task
+    CATALOG_SYNC_INTERVAL_SECONDS: int = 60 * 60 * 12
+    HTTP_CLIENT_TIMEOUT_SECONDS: float = 10.0
+    HTTP_CLIENT_MAX_CONNECTIONS: int = 20
+    HTTP_CLIENT_MAX_KEEPALIVE: int = 10
+    HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS: float = 30.0
+    HTTP_CLIENT_HTTP2: bool = False  # requires the optional `h2` package
     DATABASE_URL: str
+    # "auto" = FTS5 on SQLite / tsvector on Postgres; "like" = unindexed LIKE scan
+    SEARCH_BACKEND: str = "auto"
+    BOOKS_BULK_CHUNK_SIZE: int = 1000
+    BOOKS_STALE_AFTER_SECONDS: int = 30 * 86400  # unseen this long by syncs = stale
+    BOOKS_BATCH_MAX_IDS: int = 500  # ids per GET /books/batch request
+    REVIEWS_BATCH_MAX_ITEMS: int = 1000  # reviews per POST /reviews/batch request
+    REVIEWS_BATCH_CHUNK_SIZE: int = 500  # rows per multi-row upsert + commit
+    # Group commit of review POSTs: buffered in-process, flushed in one transaction
+    REVIEW_WRITE_BEHIND: bool = False
+    REVIEW_WRITE_BEHIND_MAX_ITEMS: int = 200  # flush as soon as this many are pending
+    REVIEW_WRITE_BEHIND_INTERVAL_MS: float = 10.0  # ... or this long after the first
+    SEED_BATCH_SIZE: int = 5000  # rows per batch streamed from seed files
+    SEED_HASH_WORKERS: int = 0  # password-hashing processes; 0 = CPU count
+    SEED_HASH_CHUNK_SIZE: int = 64  # passwords per process-pool task
+    RECOMMENDER_TOP_K: int = 20  # neighbours stored per book
+    RECOMMENDER_USER_TOP_N: int = 20  # recommendations stored per user
+    RECOMMENDER_ADJUSTED_COSINE: bool = True  # subtract each user's mean rating
+    RECOMMENDER_BLOCK_MEMORY_MB: int = 64  # dense scratch per similarity block
+    RECOMMENDER_REBUILD_INTERVAL_SECONDS: int = 60 * 60 * 6
+    # Fold review upserts into the model between rebuilds (review_events outbox)
+    RECOMMENDER_INCREMENTAL: bool = True
+    RECOMMENDER_EVENTS_BATCH_SIZE: int = 1000  # events consumed per transaction
+    # Batches per task run; the rest waits for the next run
+    RECOMMENDER_EVENTS_MAX_BATCHES: int = 20
+    RECOMMENDER_EVENTS_INTERVAL_SECONDS: int = 60
+    # Content-based "related books" index ("" disables it)
+    CONTENT_INDEX_DIR: str = ".cache/content_index"
+    CONTENT_INDEX_DIM: int = 1 << 18  # hashed TF-IDF buckets
+    CONTENT_INDEX_BLOCK_ROWS: int = 65536  # rows scored per block in a search
+    CONTENT_INDEX_REBUILD_INTERVAL_SECONDS: int = 60 * 60 * 24  # refits the IDF
+    # GET /books page cache: "memory" (per process), "redis" (shared) or "none"
+    BOOK_LIST_CACHE_BACKEND: str = "memory"
+    BOOK_LIST_CACHE_TTL_SECONDS: float = 30.0
+    BOOK_LIST_CACHE_MAX_ENTRIES: int = 10_000  # memory backend only
+    BOOK_LIST_CACHE_REDIS_URL: str = ""  # defaults to REDIS_URL
+    # Share one query among identical concurrent requests
+    BOOK_LIST_COALESCE: bool = True
     REDIS_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/1"
     model_config = SettingsConfigDict(
@@ -0,0 +1,72 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+
+class PoolSaturatedError(RuntimeError):
+    """Raised instead of queueing when a BoundedExecutor is full."""
+
+
+class BoundedExecutor:
+    """
+    Thread pool with a bounded backlog for CPU-heavy calls made from async
+    code. At most `max_workers` calls run while `max_queue` more wait; any
+    call beyond that fails fast with PoolSaturatedError.
+
+    Metrics (prefixed with `name`): `in_flight` and `queue_depth` gauges,
+    `rejected` counter, `queue_wait_seconds` and `run_seconds` histograms.
+    """
+
+    def __init__(self, name: str, *, max_workers: int, max_queue: int) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self.capacity = max_workers + max_queue
+        self._pending = 0  # only touched from the event loop thread
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix=name
+        )
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+        if self._pending >= self.capacity:
+            metrics.counter(f"{self.name}.rejected").inc()
+            raise PoolSaturatedError(f"{self.name} pool is saturated")
+
+        self._set_pending(self._pending + 1)
+        submitted = time.perf_counter()
+
+        def timed_call() -> T:
+            started = time.perf_counter()
+            metrics.histogram(f"{self.name}.queue_wait_seconds").observe(
+                started - submitted
+            )
+            try:
+                return fn(*args)
+            finally:
+                metrics.histogram(f"{self.name}.run_seconds").observe(
+                    time.perf_counter() - started
+                )
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, timed_call)
+        finally:
+            self._set_pending(self._pending - 1)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _set_pending(self, value: int) -> None:
+        self._pending = value
+        metrics.gauge(f"{self.name}.in_flight").set(value)
+        metrics.gauge(f"{self.name}.queue_depth").set(max(0, value - self.max_workers))
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Optional
+
+from fastapi import Response
+
+ETAG_HEADER = "ETag"
+# Authenticated, per-user responses: browsers may store them but must
+# revalidate every time, which is what the ETag makes cheap.
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(prefix: str, version: int, *params: Any) -> str:
+    """
+    Strong ETag from a change counter plus the request parameters, so each
+    page of a listing has its own tag. No response body is needed to build it.
+    """
+    digest = hashlib.sha1(json.dumps(params, default=str).encode("utf-8")).hexdigest()
+    return f'"{prefix}{version}-{digest[:16]}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match check (RFC 9110 weak comparison: W/ prefixes are ignored)."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in candidates)
+
+
+def set_etag(response: Response, etag: str) -> None:
+    response.headers[ETAG_HEADER] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    """Bodiless 304 carrying the same validators as the full response."""
+    response = Response(status_code=304)
+    set_etag(response, etag)
+    return response
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import asyncio
+import gzip
+import io
+import json
+import re
+import time
+from itertools import islice
+from pathlib import Path
+from typing import (
+    Any,
+    AsyncIterable,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    TextIO,
+)
+
+from app.core.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+READ_CHUNK_CHARS = 64 * 1024
+PROGRESS_LOG_SECONDS = 5.0
+NDJSON_SUFFIXES = {".ndjson", ".jsonl"}
+
+_WS = re.compile(r"[ \t\n\r]*")
+
+Validator = Callable[[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+class SeedFileError(ValueError):
+    """Raised when a seed file (or another JSON stream) is not a JSON array / NDJSON."""
+
+
+def open_text(path: Path) -> TextIO:
+    """Open a (possibly gzip-compressed) UTF-8 text file for streaming reads."""
+    with path.open("rb") as probe:
+        magic = probe.read(2)
+    if magic == b"\x1f\x8b":
+        return io.TextIOWrapper(gzip.open(path, "rb"), encoding="utf-8")
+    return path.open("r", encoding="utf-8")
+
+
+def _is_ndjson(path: Path) -> bool:
+    """NDJSON by suffix (`rows.ndjson`, `rows.jsonl.gz`), else by first character."""
+    suffixes = [s.lower() for s in path.suffixes if s.lower() != ".gz"]
+    if suffixes and suffixes[-1] in NDJSON_SUFFIXES:
+        return True
+    with open_text(path) as fh:
+        head = fh.read(1024).lstrip()
+    return not head.startswith("[")
+
+
+def iter_json_records(path: Path, chunk_chars: int = READ_CHUNK_CHARS) -> Iterator[Any]:
+    """
+    Stream the elements of a JSON array file or the lines of an NDJSON file,
+    one at a time, reading `chunk_chars` characters at a time. Only the
+    current element is ever held in memory.
+
+    Raises:
+        SeedFileError on malformed content (rows already yielded stay yielded).
+    """
+    with open_text(path) as fh:
+        if _is_ndjson(path):
+            yield from _iter_ndjson(fh)
+        else:
+            yield from _iter_json_array(fh, chunk_chars)
+
+
+def _iter_ndjson(fh: TextIO) -> Iterator[Any]:
+    """One JSON document per non-blank line."""
+    for lineno, line in enumerate(fh, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise SeedFileError(f"Invalid JSON on line {lineno}: {exc}") from exc
+
+
+async def aiter_ndjson(chunks: AsyncIterable[bytes]) -> AsyncIterator[Any]:
+    """
+    Decode NDJSON from a byte stream (e.g. a request body) one line at a
+    time, as the bytes arrive; blank lines are skipped.
+
+    Raises:
+        SeedFileError on a line that is not valid JSON.
+    """
+    buf, lineno = b"", 0
+    async for chunk in chunks:
+        buf += chunk
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            lineno += 1
+            if line.strip():
+                yield _decode_line(line, lineno)
+    if buf.strip():
+        yield _decode_line(buf, lineno + 1)
+
+
+def _decode_line(line: bytes, lineno: int) -> Any:
+    try:
+        return json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+        raise SeedFileError(f"Invalid JSON on line {lineno}: {exc}") from exc
+
+
+def _iter_json_array(fh: TextIO, chunk_chars: int) -> Iterator[Any]:
+    """Incrementally decode a top-level JSON array with `raw_decode`."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+    state = "start"  # start -> first (after '[') -> comma (after value) -> value
+
+    while True:
+        # Make sure the next significant character is buffered.
+        pos = _WS.match(buf, pos).end()
+        while pos >= len(buf) and not eof:
+            data = fh.read(chunk_chars)
+            eof = not data
+            buf, pos = buf[pos:] + data, 0
+            pos = _WS.match(buf, pos).end()
+        if pos >= len(buf):
+            raise SeedFileError("Unexpected end of file inside JSON array")
+
+        char = buf[pos]
+        if state == "start":
+            if char != "[":
+                raise SeedFileError("Seed file must contain a JSON array")
+            pos, state = pos + 1, "first"
+            continue
+        if char == "]" and state in ("first", "comma"):
+            return
+        if state == "comma":
+            if char != ",":
+                raise SeedFileError(f"Expected ',' or ']' but found {char!r}")
+            pos, state = pos + 1, "value"
+            continue
+
+        # Decode one element, pulling more input until it is complete.
+        while True:
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError as exc:
+                if eof:
+                    raise SeedFileError(f"Invalid JSON in array: {exc}") from exc
+                end = None
+            # A value touching the buffer end (e.g. a number) may continue.
+            if end is not None and (end < len(buf) or eof):
+                break
+            data = fh.read(chunk_chars)
+            eof = not data
+            buf, pos = buf[pos:] + data, 0
+
+        yield value
+        pos, state = end, "comma"
+
+
+def iter_batches(
+    records: Iterable[Any],
+    *,
+    batch_size: int,
+    validate: Optional[Validator] = None,
+    label: str = "rows",
+) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Group streamed records into lists of at most `batch_size` valid rows.
+    Non-object records and rows rejected by `validate` (returns None) are
+    dropped and counted. Progress and rows/second are logged periodically.
+    """
+    progress = _Progress(label)
+    valid_rows = _validated(records, validate, progress)
+    while batch := list(islice(valid_rows, batch_size)):
+        yield batch
+    progress.finish()
+
+
+def _validated(
+    records: Iterable[Any], validate: Optional[Validator], progress: "_Progress"
+) -> Iterator[Dict[str, Any]]:
+    for record in records:
+        row = record if isinstance(record, dict) else None
+        if row is not None and validate is not None:
+            row = validate(row)
+        progress.tick(valid=row is not None)
+        if row is not None:
+            yield row
+
+
+async def aiter_batches(
+    batches: Iterator[List[Dict[str, Any]]],
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """
+    Pull each batch from a blocking batch iterator in the default executor,
+    so file reading and JSON decoding do not stall the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    sentinel: List[Dict[str, Any]] = []
+    while True:
+        batch = await loop.run_in_executor(None, next, batches, sentinel)
+        if batch is sentinel:
+            return
+        yield batch
+
+
+class _Progress:
+    """Periodic progress logging for long-running loads."""
+
+    def __init__(self, label: str) -> None:
+        self.label = label
+        self.rows = 0
+        self.invalid = 0
+        self.started = self.last_log = time.monotonic()
+
+    def tick(self, *, valid: bool) -> None:
+        self.rows += 1
+        if not valid:
+            self.invalid += 1
+        now = time.monotonic()
+        if now - self.last_log >= PROGRESS_LOG_SECONDS:
+            self.last_log = now
+            self._log("Loading", now)
+
+    def finish(self) -> None:
+        self._log("Loaded", time.monotonic())
+
+    def _log(self, verb: str, now: float) -> None:
+        elapsed = max(now - self.started, 1e-9)
+        logger.info(
+            "%s %s: %d read, %d invalid (%.0f rows/s)",
+            verb,
+            self.label,
+            self.rows,
+            self.invalid,
+            self.rows / elapsed,
+        )
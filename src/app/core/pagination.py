@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import base64
+import json
+from typing import Any, List, Optional
+
+# Response header carrying the cursor for the next page of a listing.
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+# Response header carrying the total number of items across all pages.
+TOTAL_COUNT_HEADER = "X-Total-Count"
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Encode the sort-key values of the last row on a page into an opaque,
+    URL-safe cursor string.
+    """
+    raw = json.dumps(list(values), separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str, size: Optional[int] = None) -> List[Any]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+    `size`, when given, is the exact number of keys the cursor must hold.
+
+    Raises:
+        ValueError if the cursor is malformed or holds the wrong number of keys.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (ValueError, UnicodeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+    if not isinstance(values, list) or not values:
+        raise ValueError("Invalid cursor")
+    if size is not None and len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+
+class RateLimiter:
+    """
+    Async rate limiter (GCRA / leaky bucket): at most `rate` acquisitions per
+    second on average, with up to `burst` allowed back to back.
+
+    It holds no asyncio primitives, so one instance can be shared by every
+    coroutine in the process, across event loops.
+    """
+
+    def __init__(self, rate: float, burst: int = 1) -> None:
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.interval = 1.0 / rate
+        self.burst = max(1, burst)
+        self._tat = 0.0  # theoretical arrival time of the next request
+
+    async def acquire(self) -> None:
+        now = time.monotonic()
+        tat = max(self._tat, now)
+        self._tat = tat + self.interval
+        delay = tat - now - (self.burst - 1) * self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
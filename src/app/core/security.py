@@ -1,20 +1,65 @@
+import time
 from datetime import datetime, timedelta, timezone
+from typing import List, Optional
 from jose import jwt
 from passlib.context import CryptContext
 from app.core.config import settings
+from app.core.cpu_pool import BoundedExecutor
+from app.core.metrics import metrics
 
 pwd = CryptContext(schemes=["pbkdf2_sha256"], deprecated="auto")
 
+# pbkdf2 runs in hashlib with the GIL released, so threads verify in parallel.
+_verify_pool: Optional[BoundedExecutor] = None
+
 
 def verify_password(plain: str, hashed: str) -> bool:
     return pwd.verify(plain, hashed)
 
 
+def get_verify_pool() -> BoundedExecutor:
+    """Lazily create the bounded pool used for login password checks."""
+    global _verify_pool
+    if _verify_pool is None:
+        _verify_pool = BoundedExecutor(
+            "auth.verify",
+            max_workers=settings.AUTH_VERIFY_WORKERS,
+            max_queue=settings.AUTH_VERIFY_QUEUE_SIZE,
+        )
+    return _verify_pool
+
+
+def shutdown_verify_pool() -> None:
+    global _verify_pool
+    if _verify_pool is not None:
+        _verify_pool.shutdown(wait=False)
+        _verify_pool = None
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    """
+    Verify off the event loop on the bounded pool.
+    Raises PoolSaturatedError when the pool's backlog is full.
+    """
+    started = time.perf_counter()
+    try:
+        return await get_verify_pool().run(verify_password, plain, hashed)
+    finally:
+        metrics.histogram("auth.verify_latency_seconds").observe(
+            time.perf_counter() - started
+        )
+
+
 def hash_password(plain: str) -> str:
     hashed = pwd.hash(plain)
     return hashed
 
 
+def hash_passwords(plains: List[str]) -> List[str]:
+    """Hash a chunk of passwords; module-level so process pools can pickle it."""
+    return [hash_password(plain) for plain in plains]
+
+
 def create_access_token(subject: str) -> str:
     expire = datetime.now(timezone.utc) + timedelta(
         minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+
+from app.core.metrics import metrics
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical calls: while a call for `key` is in flight,
+    further callers await its future instead of running `fn` again.
+
+    - The first caller (the leader) runs `fn` itself, on its own resources
+      (e.g. its DB session); followers only receive the result.
+    - An exception raised by `fn` is re-raised in every waiter.
+    - A follower that is cancelled stops waiting without affecting the
+      others. If the leader is cancelled, its followers do not inherit the
+      cancellation: one of them retries as the new leader.
+    - Nothing is cached: the key is forgotten as soon as the call finishes.
+
+    Results are shared objects, so they should be immutable or treated as such.
+    Counts go to `singleflight.<name>.leaders` / `.coalesced`.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        while (future := self._calls.get(key)) is not None:
+            metrics.counter(f"singleflight.{self.name}.coalesced").inc()
+            try:
+                # shield: a cancelled follower must not cancel the shared future.
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if future.cancelled() and not _cancelling_current_task():
+                    continue  # the leader went away, not us: take over
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        metrics.counter(f"singleflight.{self.name}.leaders").inc()
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()  # mark retrieved: there may be no followers
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+
+def _cancelling_current_task() -> bool:
+    """
+    Whether the running task itself has a pending cancel() request. Task.
+    cancelling() is Python 3.11+; before that a follower cancelled at the
+    same time as its leader cannot tell the two apart and retries as well.
+    """
+    cancelling = getattr(asyncio.current_task(), "cancelling", None)
+    return bool(cancelling and cancelling())
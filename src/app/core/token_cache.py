@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+
+class TokenCache:
+    """
+    LRU cache of already-verified JWTs: sha256(token) -> (subject, exp).
+
+    Only tokens that passed signature/claims verification are stored, and an
+    entry is served only until the token's own `exp`, so a cache hit never
+    accepts anything the decoder would reject. Hits and misses are counted
+    in `auth.token_cache.hits` / `auth.token_cache.misses`.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self._entries: "OrderedDict[bytes, Tuple[str, float]]" = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode("utf-8")).digest()
+
+    def get(self, token: str, now: Optional[float] = None) -> Optional[str]:
+        """Return the cached subject for a still-valid token, else None."""
+        if self.max_size <= 0:
+            return None
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is not None:
+            subject, exp = entry
+            if exp > (time.time() if now is None else now):
+                self._entries.move_to_end(key)
+                metrics.counter("auth.token_cache.hits").inc()
+                return subject
+            del self._entries[key]
+        metrics.counter("auth.token_cache.misses").inc()
+        return None
+
+    def put(self, token: str, subject: str, exp: Optional[float]) -> None:
+        """Remember a verified token; tokens without `exp` are never cached."""
+        if self.max_size <= 0 or exp is None:
+            return
+        key = self._key(token)
+        self._entries[key] = (subject, float(exp))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
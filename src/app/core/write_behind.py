@@ -0,0 +1,195 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import (
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    List,
+    Optional,
+    TypeVar,
+    Union,
+)
+
+from app.core.logging import setup_logger
+from app.core.metrics import metrics
+
+logger = setup_logger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+R = TypeVar("R")
+
+# Histogram buckets for items per flush.
+BATCH_SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+# Per key: the caller's result, or the exception to raise in the caller.
+Outcome = Union[R, BaseException]
+FlushFn = Callable[[Dict[K, V]], Awaitable[Dict[K, Outcome[R]]]]
+
+
+class WriteBehindBuffer(Generic[K, V, R]):
+    """
+    Group commit for independent writes: callers `submit` a keyed value and
+    wait while a background task drains the buffer with one `flush` call
+    (one transaction) per batch. A batch is flushed when `max_items` are
+    pending or `interval_seconds` after it started filling, whichever
+    comes first.
+
+    - Values with the same key are merged, last write wins; the callers
+      whose write was replaced resolve with the outcome of the last one.
+    - `flush(batch)` returns {key: result or exception} so one bad write
+      fails only its own callers; an exception raised by `flush` itself
+      fails every caller of the batch.
+    - A cancelled caller stops waiting, but its write still happens.
+    - If the background task is cancelled, callers still waiting fail with
+      RuntimeError; a batch cancelled mid-flush may or may not have committed.
+    - The task starts on the first `submit`, on that event loop (again on
+      a `submit` from another loop); `close()` flushes what is pending and
+      stops it.
+
+    Counts go to `write_behind.<name>.batch_size` / `.flush_seconds`
+    (histograms), `.merged` / `.failed_batches` (counters) and `.pending`.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        flush: FlushFn,
+        *,
+        max_items: int,
+        interval_seconds: float,
+    ) -> None:
+        self.name = name
+        self.max_items = max(1, max_items)
+        self.interval_seconds = interval_seconds
+        self._flush = flush
+        self._pending: Dict[K, V] = {}
+        self._waiters: Dict[K, List[asyncio.Future]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._has_items: Optional[asyncio.Event] = None
+        self._full: Optional[asyncio.Event] = None
+        self._closing = False
+
+    async def submit(self, key: K, value: V) -> R:
+        """Queue `value` under `key`; returns once the batch holding it committed."""
+        if self._closing:
+            raise RuntimeError(f"Write-behind buffer {self.name!r} is closing")
+        self._ensure_task()
+        future = asyncio.get_running_loop().create_future()
+        if key in self._pending:
+            metrics.counter(f"write_behind.{self.name}.merged").inc()
+        self._pending[key] = value
+        self._waiters.setdefault(key, []).append(future)
+        metrics.gauge(f"write_behind.{self.name}.pending").set(len(self._pending))
+        self._has_items.set()
+        if len(self._pending) >= self.max_items:
+            self._full.set()
+        return await future
+
+    async def close(self) -> None:
+        """Flush everything still pending and stop the background task."""
+        task = self._task
+        if task is None:
+            return
+        self._closing = True
+        self._has_items.set()
+        self._full.set()
+        try:
+            await task
+        finally:
+            self._task = None
+            self._closing = False
+
+    def pending(self) -> int:
+        return len(self._pending)
+
+    # -------------------------------------------------------------------------
+    # Internal helpers
+    # -------------------------------------------------------------------------
+    def _ensure_task(self) -> None:
+        if self._task is not None and not self._task.done():
+            if self._task.get_loop() is asyncio.get_running_loop():
+                return
+            # Started on a loop that has since gone (a new Celery runner
+            # loop): whatever was pending there cannot be served any more.
+            self._pending, self._waiters = {}, {}
+        self._has_items, self._full = asyncio.Event(), asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(
+            self._run(), name=f"write-behind-{self.name}"
+        )
+
+    async def _run(self) -> None:
+        try:
+            while self._pending or not self._closing:
+                if not self._pending:
+                    self._has_items.clear()
+                    await self._has_items.wait()  # close() sets it too
+                    continue
+                if not self._closing and len(self._pending) < self.max_items:
+                    self._full.clear()
+                    try:
+                        await asyncio.wait_for(self._full.wait(), self.interval_seconds)
+                    except asyncio.TimeoutError:
+                        pass
+                await self._flush_pending()
+        finally:
+            # Cancelled: writes queued since the last flush never will be.
+            waiters, self._pending, self._waiters = self._waiters, {}, {}
+            self._fail(waiters, RuntimeError(f"Write-behind {self.name} stopped"))
+
+    async def _flush_pending(self) -> None:
+        batch, waiters = self._pending, self._waiters
+        self._pending, self._waiters = {}, {}
+        metrics.gauge(f"write_behind.{self.name}.pending").set(0)
+        metrics.histogram(
+            f"write_behind.{self.name}.batch_size", BATCH_SIZE_BUCKETS
+        ).observe(len(batch))
+
+        started = time.perf_counter()
+        results: Optional[Dict[K, Outcome[R]]] = None
+        try:
+            results = await self._flush(batch)
+        except Exception as e:  # noqa: BLE001 – delivered to the batch's callers
+            logger.exception(
+                "Write-behind %s flush of %d items failed", self.name, len(batch)
+            )
+            metrics.counter(f"write_behind.{self.name}.failed_batches").inc()
+            results = dict.fromkeys(batch, e)
+        finally:
+            if results is None:
+                # Cancelled mid-flush: whether the batch committed is
+                # unknown, but its callers must not wait forever.
+                self._fail(
+                    waiters,
+                    RuntimeError(f"Write-behind {self.name} flush was cancelled"),
+                )
+        metrics.histogram(f"write_behind.{self.name}.flush_seconds").observe(
+            time.perf_counter() - started
+        )
+
+        for key, futures in waiters.items():
+            outcome = results.get(key)
+            if key not in results:
+                outcome = RuntimeError(
+                    f"Write-behind {self.name} flush dropped {key!r}"
+                )
+            for future in futures:
+                if future.done():  # the caller was cancelled
+                    continue
+                if isinstance(outcome, BaseException):
+                    future.set_exception(outcome)
+                    future.exception()  # mark retrieved: the caller may be gone
+                else:
+                    future.set_result(outcome)
+
+    @staticmethod
+    def _fail(waiters: Dict[K, List[asyncio.Future]], exc: BaseException) -> None:
+        for futures in waiters.values():
+            for future in futures:
+                if not future.done():
+                    future.set_exception(exc)
+                    future.exception()
@@ -0,0 +1,45 @@
+from typing import Any
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+
+def dialect_name(session: AsyncSession) -> str:
+    """Name of the SQL dialect the session is bound to (e.g. 'sqlite', 'postgresql')."""
+    return session.bind.dialect.name
+
+
+def insert_for(session: AsyncSession, table: Any):
+    """
+    Dialect-specific INSERT construct supporting ON CONFLICT clauses.
+    Only SQLite and Postgres are supported for conflict-aware writes.
+    """
+    name = dialect_name(session)
+    if name == "postgresql":
+        return postgresql.insert(table)
+    if name == "sqlite":
+        return sqlite.insert(table)
+    raise NotImplementedError(f"ON CONFLICT inserts are not supported for {name!r}")
+
+
+def enforce_foreign_keys(engine: AsyncEngine) -> None:
+    """
+    Turn on SQLite's FOREIGN KEY checks (off by default, per connection) so
+    writes can rely on the constraint instead of a separate existence query.
+    """
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection: Any, _record: Any) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+def is_foreign_key_violation(exc: IntegrityError) -> bool:
+    """Whether an IntegrityError was raised by a FOREIGN KEY constraint."""
+    orig = exc.orig
+    if getattr(orig, "sqlstate", None) == "23503":  # Postgres foreign_key_violation
+        return True
+    return "foreign key constraint failed" in str(orig).lower()  # SQLite
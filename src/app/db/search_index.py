@@ -0,0 +1,96 @@
+"""
+Full-text index DDL for the books catalog.
+
+- SQLite: an external-content FTS5 table (`books_fts`) kept in sync with
+  `books` by triggers, so every insert path (seed file, Google refresh,
+  bulk ingest) is indexed without application code.
+- Postgres: a generated `tsvector` column with a GIN index; the database
+  maintains it on every write.
+
+`install_search_index` is idempotent and is hooked to `Base.metadata`
+`after_create`, so both `init_db()` and the test schema setup install it,
+including on databases created before the index existed.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+SQLITE_FTS_TABLE = "books_fts"
+
+_SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+        title, author,
+        content='books', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_ai AFTER INSERT ON books BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, author)
+        VALUES (new.id, new.title, new.author);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_ad AFTER DELETE ON books BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS books_fts_au AFTER UPDATE OF title, author ON books
+    BEGIN
+        INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, title, author)
+        VALUES ('delete', old.id, old.title, old.author);
+        INSERT INTO {SQLITE_FTS_TABLE}(rowid, title, author)
+        VALUES (new.id, new.title, new.author);
+    END
+    """,
+]
+
+_POSTGRES_DDL = [
+    """
+    ALTER TABLE books ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        to_tsvector('simple', coalesce(title, '') || ' ' || coalesce(author, ''))
+    ) STORED
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_books_search_vector
+    ON books USING GIN (search_vector)
+    """,
+]
+
+
+def install_search_index(target: Any, connection: Connection, **kw: Any) -> None:
+    """
+    Create the dialect's full-text index structures if they are missing.
+    Signature matches a SQLAlchemy DDL event listener.
+    """
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        _install_sqlite(connection)
+    elif dialect == "postgresql":
+        for ddl in _POSTGRES_DDL:
+            connection.execute(text(ddl))
+
+
+def _install_sqlite(connection: Connection) -> None:
+    """Create the FTS5 table + triggers; backfill when the table is new."""
+    existed = connection.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": SQLITE_FTS_TABLE},
+    ).first()
+    for ddl in _SQLITE_DDL:
+        connection.execute(text(ddl))
+    if not existed:
+        # Index rows that were inserted before the FTS table existed.
+        connection.execute(
+            text(
+                f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')"
+            )
+        )
@@ -5,6 +5,7 @@ from sqlalchemy.ext.asyncio import (
 )
 from sqlalchemy.pool import StaticPool
 from app.core.config import settings
+from app.db.dialect import enforce_foreign_keys
 
 _engine = None
 _SessionLocal = None
@@ -13,13 +14,16 @@ _SessionLocal = None
 def _make_engine(url: str):
     if url.startswith("sqlite+aiosqlite"):
         # single in-memory DB shared across sessions
-        return create_async_engine(
+        engine = create_async_engine(
             url,
             echo=False,
             future=True,
             connect_args={"check_same_thread": False},
             poolclass=StaticPool,
         )
+        # review writes rely on reviews.book_id -> books.id being checked
+        enforce_foreign_keys(engine)
+        return engine
     # default (Postgres etc.)
     return create_async_engine(url, echo=False, future=True, pool_pre_ping=True)
 
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
 from pathlib import Path
-import json
-from typing import Any, Dict, Iterable, List
+from typing import Any, Dict, Iterable, Iterator, List, Optional
 
 from fastapi import FastAPI
 from starlette.middleware.cors import CORSMiddleware
@@ -14,9 +17,18 @@ from app.db.base import Base
 from app.db.session import engine, AsyncSessionLocal
 
 from app.repositories.user_repo import UserRepository
-from app.core.security import hash_password
+from app.core.security import hash_passwords, shutdown_verify_pool
 from app.core.logging import setup_logger
+from app.core.json_stream import (
+    SeedFileError,
+    aiter_batches,
+    iter_batches,
+    iter_json_records,
+)
 from app.services.book_service import BookService
+from app.services.review_service import close_review_write_buffer
+from app.repositories.version_repo import close_catalog_bumps
+from app.clients.http import close_shared_http_client, open_shared_http_client
 
 
 # --- Logging -----------------------------------------------------------------
@@ -63,30 +75,6 @@ _configure_cors(app)
 _register_routes(app)
 
 
-# --- Utility helpers ---------------------------------------------------------
-def _read_json_array(path: Path) -> List[Dict[str, Any]]:
-    """
-    Read a JSON file expected to contain an array of objects.
-    Returns [] on missing file or invalid JSON/shape.
-    """
-    if not path.exists():
-        logger.info("Seed file %s does not exist. Skipping.", path)
-        return []
-
-    try:
-        content = path.read_text(encoding="utf-8")
-        data = json.loads(content)
-    except json.JSONDecodeError as exc:
-        logger.error("Failed to parse JSON from %s: %s", path, exc)
-        return []
-
-    if not isinstance(data, list):
-        logger.error("Seed file %s must contain a JSON array. Skipping.", path)
-        return []
-
-    return data
-
-
 # --- DB schema init ----------------------------------------------------------
 async def init_db() -> None:
     """Create database schema (idempotent)."""
@@ -102,62 +90,132 @@ def _users_seed_path() -> Path:
     return Path(settings.USERS_SEED_FILE).resolve()
 
 
-def _load_raw_user_rows(path: Path) -> List[Dict[str, Any]]:
+def _user_row_batches(path: Path) -> Iterator[List[Dict[str, Any]]]:
     """
-    Load raw user rows from seed JSON, with logging consistent to original intent.
+    Stream validated user rows from the seed file (JSON array or NDJSON,
+    optionally gzip) in fixed-size batches, so memory stays flat.
     """
-    logger.info("Attempting to seed users from %s", path)
-    rows = _read_json_array(path)
-    if not rows:
-        logger.info("No users to seed. Skipping.")
-    return rows
+    return iter_batches(
+        iter_json_records(path),
+        batch_size=settings.SEED_BATCH_SIZE,
+        validate=_validate_user_row,
+        label=f"users from {path.name}",
+    )
 
 
-def _validate_user_row(row: Dict[str, Any]) -> bool:
+def _validate_user_row(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
     """
     Ensure required fields exist; keeps logic permissive (no extra validation).
     """
-    return "username" in row and "password" in row
+    return row if "username" in row and "password" in row else None
+
+
+def _new_user_rows(
+    rows: Iterable[Dict[str, Any]], existing: set[str]
+) -> List[Dict[str, Any]]:
+    """
+    Keep rows whose username is not stored yet, first occurrence wins,
+    so nothing already present is ever hashed.
+    """
+    seen = set(existing)
+    fresh = []
+    for row in rows:
+        if row["username"] not in seen:
+            seen.add(row["username"])
+            fresh.append(row)
+    return fresh
 
 
-def _hash_user_rows(rows: Iterable[Dict[str, Any]]) -> List[Dict[str, Any]]:
+async def _hash_user_rows(
+    rows: List[Dict[str, Any]], executor: Executor
+) -> List[Dict[str, Any]]:
     """
-    Prepare rows for upsert: hash passwords and keep keys unchanged otherwise.
+    Prepare rows for upsert: hash passwords in chunks spread across the
+    executor (CPU-bound work off the event loop), preserving row order.
     """
-    prepared = [
-        {
-            "username": row["username"],
-            "password": hash_password(row["password"]),
-        }
-        for row in rows
-        if _validate_user_row(row)
+    size = settings.SEED_HASH_CHUNK_SIZE
+    chunks = [rows[i : i + size] for i in range(0, len(rows), size)]
+    loop = asyncio.get_running_loop()
+    hashed_chunks = await asyncio.gather(
+        *(
+            loop.run_in_executor(
+                executor, hash_passwords, [row["password"] for row in chunk]
+            )
+            for chunk in chunks
+        )
+    )
+    return [
+        {"username": row["username"], "password": hashed}
+        for chunk, hashes in zip(chunks, hashed_chunks)
+        for row, hashed in zip(chunk, hashes)
     ]
-    if not prepared:
-        logger.info("No valid user rows found in seed file. Skipping.")
-    return prepared
 
 
-async def _upsert_users(rows: List[Dict[str, Any]]) -> None:
+async def _existing_usernames(rows: List[Dict[str, Any]]) -> set[str]:
+    """Ask the repository which usernames of this batch are already stored."""
+    async with AsyncSessionLocal() as session:
+        repo = UserRepository(session)
+        return await repo.existing_usernames(row["username"] for row in rows)
+
+
+async def _upsert_users(rows: List[Dict[str, Any]]) -> int:
     """
-    Upsert users through repository and log count (same behavior).
+    Upsert users through repository; returns the number of new users.
     """
     if not rows:
-        return
+        return 0
 
     async with AsyncSessionLocal() as session:
         repo = UserRepository(session)
-        inserted = await repo.bulk_upsert(rows)
-        logger.info("Seeded %s users.", inserted)
+        return await repo.bulk_upsert(rows)
+
+
+async def _seed_user_batch(batch: List[Dict[str, Any]], executor: Executor) -> int:
+    """Skip known usernames, hash the rest in parallel, then bulk upsert."""
+    fresh = _new_user_rows(batch, await _existing_usernames(batch))
+    if not fresh:
+        return 0
+    return await _upsert_users(await _hash_user_rows(fresh, executor))
+
+
+def _new_hash_executor() -> ProcessPoolExecutor:
+    """
+    Process pool for pbkdf2 hashing. `spawn` keeps workers independent of the
+    parent's threads (aiosqlite, event loop); processes start on first use.
+    """
+    workers = settings.SEED_HASH_WORKERS or os.cpu_count() or 1
+    return ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    )
 
 
-async def seed_users() -> None:
+async def seed_users(executor: Optional[Executor] = None) -> None:
     """
-    Orchestrate user seeding using small helpers (logic unchanged).
+    Stream the user seed file batch by batch: skip existing usernames,
+    hash the new passwords across a process pool, then upsert each batch.
     """
     seed_path = _users_seed_path()
-    raw_rows = _load_raw_user_rows(seed_path)
-    prepared_rows = _hash_user_rows(raw_rows)
-    await _upsert_users(prepared_rows)
+    logger.info("Attempting to seed users from %s", seed_path)
+    if not seed_path.exists():
+        logger.info("Seed file %s does not exist. Skipping.", seed_path)
+        return
+
+    owns_executor = executor is None
+    executor = executor or _new_hash_executor()
+    inserted = 0
+    try:
+        async for batch in aiter_batches(_user_row_batches(seed_path)):
+            inserted += await _seed_user_batch(batch, executor)
+    except SeedFileError as exc:
+        logger.error("Failed to parse JSON from %s: %s", seed_path, exc)
+    finally:
+        if owns_executor:
+            executor.shutdown(wait=True)
+
+    if inserted:
+        logger.info("Seeded %s users.", inserted)
+    else:
+        logger.info("No users to seed. Skipping.")
 
 
 # --- Book seeding (split into focused steps) ---------------------------------
@@ -187,8 +245,9 @@ async def _create_book_service() -> BookService:
 async def _seed_books_via_service(service: BookService, query: str, limit: int) -> bool:
     """
     Execute the seeding via Google through the service; return success flag.
+    Startup serves cached pages without revalidating; the beat refresh does that.
     """
-    return await service.seed_from_google(query=query, limit=limit)
+    return await service.seed_from_google(query=query, limit=limit, prefer_cache=True)
 
 
 async def seed_books() -> None:
@@ -210,7 +269,9 @@ async def seed_books() -> None:
 async def _run_startup_steps() -> None:
     """
     Keep the original order exactly: init DB -> seed users -> seed books.
+    The pooled HTTP client is opened first so book seeding already uses it.
     """
+    await open_shared_http_client()
     await init_db()
     await seed_users()
     await seed_books()
@@ -221,3 +282,13 @@ async def on_startup() -> None:
     """FastAPI startup hook."""
     await _run_startup_steps()
     logger.info("Application startup complete.")
+
+
+@app.on_event("shutdown")
+async def on_shutdown() -> None:
+    """FastAPI shutdown hook: release worker pools and pooled connections."""
+    await close_review_write_buffer()
+    await close_catalog_bumps()
+    shutdown_verify_pool()
+    await close_shared_http_client()
+    logger.info("Application shutdown complete.")
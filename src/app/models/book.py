@@ -1,13 +1,54 @@
-from sqlalchemy import String, UniqueConstraint
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Index, String, UniqueConstraint, event
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.base import Base
+from app.db.search_index import install_search_index
 
 
 class Book(Base):
     __tablename__ = "books"
-    __table_args__ = (UniqueConstraint("title", "author", name="uq_title_author"),)
+    __table_args__ = (
+        UniqueConstraint("title", "author", name="uq_title_author"),
+        # Serves ORDER BY title, id and the keyset (title, id) > (...) seek.
+        Index("ix_books_title_id", "title", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     title: Mapped[str] = mapped_column(String(255), index=True)
     author: Mapped[str] = mapped_column(String(255), index=True)
     genre: Mapped[str] = mapped_column(String(100), index=True)
+
+    # Materialized rating aggregates, maintained by ReviewRepository.upsert
+    # in the same transaction as the review write.
+    rating_sum: Mapped[int] = mapped_column(default=0, server_default="0")
+    rating_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    average_rating: Mapped[Optional[float]] = mapped_column(nullable=True)
+
+    # Change detection for catalog syncs (see BookRepository.sync_books):
+    # sha256 of the synced fields, and when an import last contained the book.
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    last_seen_at: Mapped[Optional[datetime]] = mapped_column(
+        DateTime, nullable=True, index=True
+    )
+
+    # Bumped with every review write on this book; the reviews listing ETag.
+    version: Mapped[int] = mapped_column(default=0, server_default="0")
+
+
+class CatalogVersion(Base):
+    """
+    Named change counters shared by all API workers. "books" is bumped in
+    the same transaction as any write that changes GET /books (new or
+    updated books, rating aggregates), so it can serve as that listing's ETag.
+    """
+
+    __tablename__ = "catalog_versions"
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    version: Mapped[int] = mapped_column(default=0)
+
+
+# Full-text index (FTS5 / tsvector) is installed whenever the schema is created.
+event.listen(Base.metadata, "after_create", install_search_index)
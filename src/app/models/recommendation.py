@@ -0,0 +1,75 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String, func
+from sqlalchemy.orm import Mapped, mapped_column
+from app.db.base import Base
+
+
+class BookSimilarity(Base):
+    """
+    Precomputed top-K neighbours per book (item-item collaborative filtering).
+    The (book_id, rank) primary key makes a lookup one index range scan.
+    """
+
+    __tablename__ = "book_similarities"
+
+    book_id: Mapped[int] = mapped_column(
+        ForeignKey("books.id", ondelete="CASCADE"), primary_key=True
+    )
+    rank: Mapped[int] = mapped_column(Integer, primary_key=True)
+    similar_book_id: Mapped[int] = mapped_column(
+        ForeignKey("books.id", ondelete="CASCADE")
+    )
+    score: Mapped[float] = mapped_column(Float)
+
+
+class UserRecommendation(Base):
+    """Precomputed top-N unseen books per user, ranked by predicted interest."""
+
+    __tablename__ = "user_recommendations"
+
+    username: Mapped[str] = mapped_column(String(100), primary_key=True)
+    rank: Mapped[int] = mapped_column(Integer, primary_key=True)
+    book_id: Mapped[int] = mapped_column(ForeignKey("books.id", ondelete="CASCADE"))
+    score: Mapped[float] = mapped_column(Float)
+
+
+class BookPairStat(Base):
+    """
+    Co-rating statistic per book pair (book_a < book_b): the dot product of
+    the two books' (optionally user-mean-centered) rating vectors. Kept up to
+    date from review events so similarities can be refreshed incrementally.
+    """
+
+    __tablename__ = "book_pair_stats"
+    __table_args__ = (Index("ix_book_pair_stats_book_b", "book_b"),)
+
+    book_a: Mapped[int] = mapped_column(Integer, primary_key=True)
+    book_b: Mapped[int] = mapped_column(Integer, primary_key=True)
+    dot: Mapped[float] = mapped_column(Float)
+
+
+class BookNorm(Base):
+    """Squared norm of a book's rating vector (the pair statistic's diagonal)."""
+
+    __tablename__ = "book_norms"
+
+    book_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    sum_sq: Mapped[float] = mapped_column(Float)
+
+
+class ReviewEvent(Base):
+    """
+    Outbox of rating changes, written in the review upsert's transaction and
+    drained in batches by the recommendation consumer task.
+    """
+
+    __tablename__ = "review_events"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    book_id: Mapped[int] = mapped_column(Integer)
+    username: Mapped[str] = mapped_column(String(100))
+    old_rating: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    new_rating: Mapped[int] = mapped_column(Integer)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
@@ -1,21 +1,46 @@
 from datetime import datetime
-from sqlalchemy import ForeignKey, String, UniqueConstraint, func
+from typing import Optional
+from sqlalchemy import DateTime, ForeignKey, Index, String, UniqueConstraint, func
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db.base import Base
 
+# SQLite's CURRENT_TIMESTAMP has no fractional seconds; bind parameters must
+# use the same text format so (created_at, id) keyset comparisons line up.
+Timestamp = DateTime().with_variant(
+    sqlite.DATETIME(
+        storage_format="%(year)04d-%(month)02d-%(day)02d "
+        "%(hour)02d:%(minute)02d:%(second)02d"
+    ),
+    "sqlite",
+)
+
 
 class Review(Base):
     __tablename__ = "reviews"
     __table_args__ = (UniqueConstraint("book_id", "username", name="uq_book_user"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    book_id: Mapped[int] = mapped_column(
-        ForeignKey("books.id", ondelete="CASCADE"), index=True
-    )
+    # No index of its own: ix_reviews_book_created_id (and uq_book_user)
+    # lead with book_id.
+    book_id: Mapped[int] = mapped_column(ForeignKey("books.id", ondelete="CASCADE"))
     username: Mapped[str] = mapped_column(String(100), index=True)
     rating: Mapped[int] = mapped_column()
     review_text: Mapped[str] = mapped_column(String(2048))
-    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
+    # Rating before the latest upsert, NULL right after an insert: lets the
+    # single ON CONFLICT ... RETURNING write report the rating it replaced.
+    previous_rating: Mapped[Optional[int]] = mapped_column(nullable=True)
+    created_at: Mapped[datetime] = mapped_column(Timestamp, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
-        server_default=func.now(), onupdate=func.now()
+        Timestamp, server_default=func.now(), onupdate=func.now()
     )
+
+
+# Serves the reviews listing in both orders plus its keyset seek: scanned
+# forward for newest first, backward for oldest first.
+Index(
+    "ix_reviews_book_created_id",
+    Review.book_id,
+    Review.created_at.desc(),
+    Review.id.desc(),
+)
@@ -1,98 +1,393 @@
 from __future__ import annotations
 
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from itertools import islice
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
 
-import json
-from sqlalchemy import Select, func, select, and_
+from sqlalchemy import (
+    Float,
+    Row,
+    Select,
+    case,
+    cast,
+    func,
+    or_,
+    select,
+    tuple_,
+    update,
+)
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.cache import invalidate_book_listing, invalidate_books
 from app.core.config import settings
+from app.core.json_stream import (
+    SeedFileError,
+    aiter_batches,
+    iter_batches,
+    iter_json_records,
+)
 from app.core.logging import setup_logger
+from app.db.dialect import dialect_name, insert_for
 from app.models.book import Book
 from app.models.review import Review
+from app.repositories.search import SearchBackend, get_search_backend
+from app.repositories.version_repo import VersionRepository
 
 logger = setup_logger(__name__)
 
+BOOK_FIELDS = ("title", "author", "genre")
+BOOK_KEY = ("title", "author")  # natural key, uq_title_author
+
+# What a by-id lookup returns (BookSummary): plain rows, no ORM objects.
+SUMMARY_COLUMNS = (
+    Book.id,
+    Book.title,
+    Book.author,
+    Book.genre,
+    Book.average_rating,
+    Book.rating_count,
+)
+
+
+def book_content_hash(values: Dict[str, Any]) -> str:
+    """Stable digest of the synced fields; a changed hash means a changed row."""
+    payload = "\x1f".join(str(values[key]) for key in BOOK_FIELDS)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass
+class IngestResult:
+    """Outcome of a bulk ingest: exact counts plus the ids of new rows."""
+
+    inserted: int = 0
+    skipped: int = 0  # already present (title, author) or duplicated in input
+    invalid: int = 0  # missing one of BOOK_FIELDS
+    inserted_ids: List[int] = field(default_factory=list)
+
+    def merge(self, other: "IngestResult") -> None:
+        self.inserted += other.inserted
+        self.skipped += other.skipped
+        self.invalid += other.invalid
+        self.inserted_ids.extend(other.inserted_ids)
+
+
+@dataclass
+class SyncResult:
+    """
+    Delta of an incremental sync: which books were created or changed (so
+    caches can invalidate exactly those), plus counts for the rest.
+    """
+
+    inserted_ids: List[int] = field(default_factory=list)
+    updated_ids: List[int] = field(default_factory=list)
+    unchanged: int = 0  # same content hash: only last_seen_at was touched
+    duplicates: int = 0  # repeated (title, author) within the input
+    invalid: int = 0  # missing one of BOOK_FIELDS
+    stale: int = 0  # set by the caller from `report_stale` at the end of a run
+
+    @property
+    def inserted(self) -> int:
+        return len(self.inserted_ids)
+
+    @property
+    def updated(self) -> int:
+        return len(self.updated_ids)
+
+    @property
+    def affected_ids(self) -> List[int]:
+        return self.inserted_ids + self.updated_ids
+
+    def merge(self, other: "SyncResult") -> None:
+        self.inserted_ids.extend(other.inserted_ids)
+        self.updated_ids.extend(other.updated_ids)
+        self.unchanged += other.unchanged
+        self.duplicates += other.duplicates
+        self.invalid += other.invalid
+        self.stale = max(self.stale, other.stale)
+
 
 class BookRepository:
-    def __init__(self, session: AsyncSession) -> None:
+    def __init__(
+        self, session: AsyncSession, search_backend: Optional[SearchBackend] = None
+    ) -> None:
         self.session = session
+        self.versions = VersionRepository(session)
+        self.search = search_backend or get_search_backend(
+            dialect_name(session), settings.SEARCH_BACKEND
+        )
 
     # -------------------------------------------------------------------------
     # Seeding
     # -------------------------------------------------------------------------
     async def seed_books(self, books: Optional[List[Dict[str, Any]]] = None) -> bool:
         """
-        Seed books into the database. If 'books' is None or empty, try the seed file.
-        Returns True if the method ran without hard failure (matching original intent).
+        Seed books into the database. If 'books' is None or empty, stream the
+        seed file (JSON array or NDJSON, optionally gzip) in bounded batches.
+        Returns True if any rows were read and ingested without hard failure.
         """
-        rows = books if books else self._load_seed_file()
-        if not rows:
+        if books:
+            result = await self.ingest_books(books)
+        else:
+            result = await self._ingest_seed_file()
+        if result is None:
             return False  # No data at all
 
-        inserted = await self._insert_missing_books(rows)
-        if inserted:
-            await self.session.commit()
+        logger.info(
+            "Book seed: %d inserted, %d skipped, %d invalid.",
+            result.inserted,
+            result.skipped,
+            result.invalid,
+        )
         return True
 
-    def _load_seed_file(self) -> List[Dict[str, Any]]:
+    async def _ingest_seed_file(self) -> Optional[IngestResult]:
         """
-        Load a JSON array of book rows from the configured seed file.
-        Returns [] on any issue (missing file, bad JSON, wrong shape).
+        Stream the configured seed file into the bulk insert path.
+        Returns None when the file is missing, empty or malformed before any
+        row was read; rows ingested before a parse error are kept.
         """
         seed_path = Path(settings.BOOKS_SEED_FILE).resolve()
         if not seed_path.exists():
-            return []
+            return None
 
+        batches = iter_batches(
+            iter_json_records(seed_path),
+            batch_size=settings.SEED_BATCH_SIZE,
+            validate=self._book_values,
+            label=f"books from {seed_path.name}",
+        )
+        total, seen = IngestResult(), False
         try:
-            data = json.loads(seed_path.read_text(encoding="utf-8"))
-        except json.JSONDecodeError as exc:
+            async for batch in aiter_batches(batches):
+                seen = True
+                total.merge(await self.ingest_books(batch))
+        except SeedFileError as exc:
             # Keep logging lightweight and human-friendly.
-            logger.error("Invalid JSON in seed file %s: %s", seed_path, exc)
-            return []
-
-        if not isinstance(data, list):
-            logger.error("Seed file %s must contain a JSON array.", seed_path)
-            return []
+            logger.error("Invalid seed file %s: %s", seed_path, exc)
+        return total if seen else None
 
-        return data
-
-    async def _insert_missing_books(self, rows: Iterable[Dict[str, Any]]) -> int:
+    async def ingest_books(
+        self, rows: Iterable[Dict[str, Any]], *, chunk_size: Optional[int] = None
+    ) -> IngestResult:
         """
-        Insert rows that don't already exist (same title + author).
-        Returns the count of rows added to the session.
+        Set-based insert of book rows, skipping (title, author) pairs that
+        already exist. Each chunk is one multi-row
+        `INSERT ... ON CONFLICT (title, author) DO NOTHING RETURNING id`
+        followed by a commit, so memory and lock time stay bounded. New rows
+        invalidate the cached GET /books pages.
         """
-        inserted = 0
-        for row in rows:
-            title = row["title"]
-            author = row["author"]
+        size = chunk_size or settings.BOOKS_BULK_CHUNK_SIZE
+        total = IngestResult()
+        for chunk in self._chunks(rows, size):
+            chunk_result = await self._insert_chunk(chunk)
+            if chunk_result.inserted:
+                await self.versions.bump_catalog()
+            await self.session.commit()
+            total.merge(chunk_result)
+        if total.inserted:
+            await invalidate_book_listing()
+        return total
 
-            if not await self._book_exists(title, author):
-                self.session.add(Book(**row))
-                inserted += 1
+    async def _insert_chunk(
+        self, chunk: List[Dict[str, Any]], seen_at: Optional[datetime] = None
+    ) -> IngestResult:
+        """Insert one chunk; rows rejected by the unique constraint count as skipped."""
+        values = [self._book_values(row) for row in chunk]
+        valid = [v for v in values if v is not None]
+        result = IngestResult(invalid=len(values) - len(valid))
+        if not valid:
+            return result
+        seen_at = seen_at or _utcnow()
+        for v in valid:
+            v["content_hash"] = book_content_hash(v)
+            v["last_seen_at"] = seen_at
 
-        return inserted
+        stmt = (
+            insert_for(self.session, Book)
+            .on_conflict_do_nothing(index_elements=["title", "author"])
+            .returning(Book.id)
+        )
+        # executemany form: SQLAlchemy batches it into multi-row VALUES
+        # statements ("insertmanyvalues") with a cached compiled statement.
+        ids = list((await self.session.execute(stmt, valid)).scalars().all())
+        result.inserted = len(ids)
+        result.skipped = len(valid) - len(ids)
+        result.inserted_ids = ids
+        return result
 
-    async def _book_exists(self, title: str, author: str) -> bool:
+    # -------------------------------------------------------------------------
+    # Incremental sync (insert new, update changed, skip unchanged)
+    # -------------------------------------------------------------------------
+    async def sync_books(
+        self,
+        rows: Iterable[Dict[str, Any]],
+        *,
+        seen_at: Optional[datetime] = None,
+        chunk_size: Optional[int] = None,
+    ) -> SyncResult:
         """
-        Check if a book with the same (title, author) already exists.
+        Upsert book rows by (title, author), writing only what changed.
+
+        Per chunk: one SELECT fetches the stored content hashes of every
+        incoming key; new keys go through the bulk INSERT path, changed ones
+        through one executemany UPDATE by primary key, and unchanged ones
+        only get `last_seen_at` bumped in a single set-based UPDATE. Each
+        chunk commits on its own. Cached GET /books pages are dropped: all of
+        them if books were inserted, otherwise only the pages showing an
+        updated book. Stale books are left to `report_stale`, which callers
+        run once at the end of a whole sync run.
         """
-        stmt = select(Book).where(and_(Book.title == title, Book.author == author))
-        result = await self.session.execute(stmt)
-        return result.scalar_one_or_none() is not None
+        seen_at = seen_at or _utcnow()
+        size = chunk_size or settings.BOOKS_BULK_CHUNK_SIZE
+        total = SyncResult()
+        for chunk in self._chunks(rows, size):
+            chunk_result = await self._sync_chunk(chunk, seen_at)
+            if chunk_result.affected_ids:
+                await self.versions.bump_catalog()
+            await self.session.commit()
+            total.merge(chunk_result)
+        if total.inserted:
+            await invalidate_book_listing()
+        elif total.updated:
+            await invalidate_books(total.updated_ids)
+        return total
+
+    async def report_stale(self, run_started: datetime) -> int:
+        """
+        Count and log the books no sync has seen for BOOKS_STALE_AFTER_SECONDS
+        before `run_started`. This is a full COUNT, so it runs once per sync
+        run rather than once per `sync_books` call.
+        """
+        stale = await self.count_stale(
+            run_started - timedelta(seconds=settings.BOOKS_STALE_AFTER_SECONDS)
+        )
+        if stale:
+            logger.info("Book sync: %d books not seen since the stale cutoff.", stale)
+        return stale
+
+    async def count_stale(self, cutoff: datetime) -> int:
+        """Books no sync has seen since `cutoff` (never-synced rows included)."""
+        stmt = select(func.count()).where(
+            or_(Book.last_seen_at.is_(None), Book.last_seen_at < cutoff)
+        )
+        return int(await self.session.scalar(stmt) or 0)
+
+    async def _sync_chunk(
+        self, chunk: List[Dict[str, Any]], seen_at: datetime
+    ) -> SyncResult:
+        values = [self._book_values(row) for row in chunk]
+        incoming: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for v in values:
+            if v is not None:
+                v["content_hash"] = book_content_hash(v)
+                v["last_seen_at"] = seen_at
+                incoming[(v["title"], v["author"])] = v  # last occurrence wins
+        valid = sum(v is not None for v in values)
+        result = SyncResult(
+            invalid=len(values) - valid, duplicates=valid - len(incoming)
+        )
+        if not incoming:
+            return result
+
+        stored = await self.session.execute(
+            select(Book.id, Book.title, Book.author, Book.content_hash).where(
+                tuple_(Book.title, Book.author).in_(list(incoming))
+            )
+        )
+        changed: List[Dict[str, Any]] = []
+        unchanged_ids: List[int] = []
+        for book_id, title, author, stored_hash in stored:
+            v = incoming.pop((title, author))
+            if stored_hash == v["content_hash"]:
+                unchanged_ids.append(book_id)
+            else:
+                changed.append(
+                    {
+                        "id": book_id,
+                        **{k: val for k, val in v.items() if k not in BOOK_KEY},
+                    }
+                )
+
+        if incoming:  # keys not in the table yet
+            inserted = await self._insert_chunk(list(incoming.values()), seen_at)
+            result.inserted_ids = inserted.inserted_ids
+            result.unchanged += inserted.skipped  # inserted concurrently meanwhile
+        if changed:
+            # ORM bulk UPDATE by primary key: one executemany statement.
+            await self.session.execute(update(Book), changed)
+            result.updated_ids = [row["id"] for row in changed]
+        if unchanged_ids:
+            await self.session.execute(
+                update(Book)
+                .where(Book.id.in_(unchanged_ids))
+                .values(last_seen_at=seen_at)
+                .execution_options(synchronize_session=False)
+            )
+            result.unchanged += len(unchanged_ids)
+        return result
+
+    @staticmethod
+    def _book_values(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Keep only the Book columns; None if a required field is missing/empty."""
+        if not all(row.get(key) for key in BOOK_FIELDS):
+            return None
+        return {key: row[key] for key in BOOK_FIELDS}
+
+    @staticmethod
+    def _chunks(
+        rows: Iterable[Dict[str, Any]], size: int
+    ) -> Iterator[List[Dict[str, Any]]]:
+        """Yield lists of at most `size` rows without materializing the input."""
+        iterator = iter(rows)
+        while chunk := list(islice(iterator, size)):
+            yield chunk
 
     # -------------------------------------------------------------------------
     # Listing with average rating
     # -------------------------------------------------------------------------
     async def list_with_avg(
-        self, *, search: Optional[str] = None, limit: int = 10, offset: int = 0
+        self,
+        *,
+        search: Optional[str] = None,
+        limit: int = 10,
+        offset: int = 0,
+        after: Optional[Tuple[str, int]] = None,
     ) -> List[Dict[str, Any]]:
         """
         Return a list of dicts: {"book": Book, "average_rating": float|None}
-        Ordered by title ASC, with optional case-insensitive search on title/author.
+        Ordered by (title, id) ASC, with optional search on title/author.
+        A ranked search backend (full-text index) orders matches by relevance
+        instead. The average comes from the book's stored aggregate columns
+        (no join).
+
+        When `after` is a (title, id) pair, the page starts right after that
+        row via a seek predicate and `offset` is ignored. Seeking only applies
+        to title order, so it cannot be combined with a ranked search.
         """
-        stmt = self._base_list_stmt(limit=limit, offset=offset)
+        if after is not None and search and self.search.ranked:
+            raise ValueError("Keyset paging is not available for ranked search")
+        if after is not None:
+            stmt = self._base_list_stmt(limit=limit, offset=0)
+            stmt = self._apply_seek(stmt, after)
+        else:
+            stmt = self._base_list_stmt(limit=limit, offset=offset)
         if search:
             stmt = self._apply_search_filter(stmt, search)
 
@@ -101,27 +396,31 @@ class BookRepository:
 
     def _base_list_stmt(self, *, limit: int, offset: int) -> Select:
         """
-        Build the base SELECT joining reviews (LEFT OUTER) and averaging ratings.
+        Build the base SELECT over books only; the average rating is read from
+        the materialized `average_rating` column.
         """
-        avg_rating = func.avg(Review.rating).label("average_rating")
         return (
-            select(Book, avg_rating)
-            .join(Review, Review.book_id == Book.id, isouter=True)
-            .group_by(Book.id)
-            .order_by(Book.title.asc())
+            select(Book)
+            .order_by(Book.title.asc(), Book.id.asc())
             .limit(limit)
             .offset(offset)
+            # Aggregates change underneath identity-mapped Book instances.
+            .execution_options(populate_existing=True)
         )
 
+    @staticmethod
+    def _apply_seek(stmt: Select, after: Tuple[str, int]) -> Select:
+        """
+        Keyset predicate: only rows strictly after (title, id) in list order.
+        """
+        title, book_id = after
+        return stmt.where(tuple_(Book.title, Book.id) > (title, book_id))
+
     def _apply_search_filter(self, stmt: Select, search: str) -> Select:
         """
-        Apply a case-insensitive LIKE filter on title or author.
+        Delegate title/author matching (and ranking) to the search backend.
         """
-        like_pattern = f"%{search.lower()}%"
-        return stmt.where(
-            func.lower(Book.title).like(like_pattern)
-            | func.lower(Book.author).like(like_pattern)
-        )
+        return self.search.apply(stmt, search)
 
     @staticmethod
     def _rows_to_book_avg_list(rows: List[Any]) -> List[Dict[str, Any]]:
@@ -129,9 +428,71 @@ class BookRepository:
         Convert SQLAlchemy row objects to the expected dict shape.
         """
         return [
-            {"book": row.Book, "average_rating": row.average_rating} for row in rows
+            {"book": row.Book, "average_rating": row.Book.average_rating}
+            for row in rows
         ]
 
+    # -------------------------------------------------------------------------
+    # Rating aggregates
+    # -------------------------------------------------------------------------
+    async def rebuild_rating_aggregates(self) -> int:
+        """
+        Recompute every book's stored rating aggregates from the reviews table.
+        Only rows that drifted from the truth are written; returns their count.
+        Used for backfills and periodic reconciliation.
+        """
+        actual_sum = (
+            select(func.coalesce(func.sum(Review.rating), 0))
+            .where(Review.book_id == Book.id)
+            .scalar_subquery()
+        )
+        actual_count = (
+            select(func.count(Review.id))
+            .where(Review.book_id == Book.id)
+            .scalar_subquery()
+        )
+        # Same expression the review writes store, so a correct row compares equal.
+        actual_avg = case(
+            (actual_count > 0, cast(actual_sum, Float) / actual_count), else_=None
+        )
+        stmt = (
+            update(Book)
+            .where(
+                or_(
+                    Book.rating_sum != actual_sum,
+                    Book.rating_count != actual_count,
+                    Book.average_rating.is_distinct_from(actual_avg),
+                )
+            )
+            .values(
+                rating_sum=actual_sum,
+                rating_count=actual_count,
+                average_rating=actual_avg,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        if result.rowcount:
+            await self.versions.bump_catalog()
+        await self.session.commit()
+        if result.rowcount:
+            await invalidate_book_listing()
+        return result.rowcount
+
+    # -------------------------------------------------------------------------
+    # Content index input
+    # -------------------------------------------------------------------------
+    async def iter_texts(
+        self, ids: Optional[List[int]] = None, batch_size: int = 50_000
+    ) -> AsyncIterator[List[Tuple[int, str, str, str]]]:
+        """Stream (id, title, author, genre) of all books, or of `ids`, in batches."""
+        stmt = select(Book.id, Book.title, Book.author, Book.genre).order_by(Book.id)
+        if ids is not None:
+            stmt = stmt.where(Book.id.in_(ids))
+        result = await self.session.stream(stmt.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield [tuple(row) for row in rows]
+
     # -------------------------------------------------------------------------
     # Single fetch
     # -------------------------------------------------------------------------
@@ -140,3 +501,33 @@ class BookRepository:
         Fetch a book by primary key.
         """
         return await self.session.get(Book, book_id)
+
+    async def summaries_by_ids(self, book_ids: Iterable[int]) -> List[Row]:
+        """
+        Rows of SUMMARY_COLUMNS for the given ids in one IN query, in no
+        particular order; unknown ids are simply absent.
+        """
+        ids = set(book_ids)
+        if not ids:
+            return []
+        res = await self.session.execute(
+            select(*SUMMARY_COLUMNS).where(Book.id.in_(ids))
+        )
+        return list(res.all())
+
+    async def existing_ids(self, book_ids: Iterable[int]) -> Set[int]:
+        """The subset of `book_ids` that exist, in one IN query."""
+        ids = set(book_ids)
+        if not ids:
+            return set()
+        res = await self.session.execute(select(Book.id).where(Book.id.in_(ids)))
+        return set(res.scalars().all())
+
+    async def rating_count(self, book_id: int) -> Optional[int]:
+        """
+        The stored number of ratings (= reviews) of a book, None if it does
+        not exist. Read from the row, never from a possibly stale identity map.
+        """
+        return await self.session.scalar(
+            select(Book.rating_count).where(Book.id == book_id)
+        )
@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+from itertools import islice
+from typing import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Sequence,
+    Set,
+    Tuple,
+)
+
+from sqlalchemy import delete, func, insert, null, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.dialect import dialect_name, insert_for
+from app.models.book import Book
+from app.models.recommendation import (
+    BookNorm,
+    BookPairStat,
+    BookSimilarity,
+    ReviewEvent,
+    UserRecommendation,
+)
+from app.models.review import Review
+
+# pg_advisory_xact_lock key shared by the recommender build and the event
+# consumer ("reco").
+MODEL_LOCK_KEY = 0x7265636F
+
+
+class RecommendationRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    # -------------------------------------------------------------------------
+    # Model input
+    # -------------------------------------------------------------------------
+    async def lock_model(self, *, wait: bool = True) -> bool:
+        """
+        Serialize the writers of the model tables, the full build and the
+        incremental event consumer, until the current transaction ends.
+        Without it a consumer running during a build applies events the
+        build has not read, and `replace_all` then overwrites that work.
+
+        On Postgres this is a transaction-scoped advisory lock; with
+        `wait=False` False is returned instead of waiting while it is held.
+        Other databases have no such lock and always get True.
+        """
+        if dialect_name(self.session) != "postgresql":
+            return True
+        if wait:
+            await self.session.execute(
+                select(func.pg_advisory_xact_lock(MODEL_LOCK_KEY))
+            )
+            return True
+        return bool(
+            await self.session.scalar(
+                select(func.pg_try_advisory_xact_lock(MODEL_LOCK_KEY))
+            )
+        )
+
+    async def iter_ratings(
+        self, batch_size: int = 50_000
+    ) -> AsyncIterator[Tuple[List[Tuple[str, int, int]], List[int]]]:
+        """
+        Stream (username, book_id, rating) from reviews in bounded batches,
+        each paired with ids of queued review events. Both come from one
+        statement, hence one snapshot: over the whole stream the ids are
+        exactly the events the streamed ratings already reflect. (A max-id
+        watermark is not enough: Postgres can commit sequence values out of
+        order, so a lower id may become visible later.)
+        """
+        ratings = select(
+            Review.username,
+            Review.book_id,
+            Review.rating,
+            null().label("event_id"),
+        )
+        events = select(null(), null(), null(), ReviewEvent.id)
+        result = await self.session.stream(
+            union_all(ratings, events).execution_options(yield_per=batch_size)
+        )
+        async for rows in result.partitions():
+            event_ids = [row[3] for row in rows if row[3] is not None]
+            yield [row[:3] for row in rows if row[3] is None], event_ids
+
+    # -------------------------------------------------------------------------
+    # Persisting a build
+    # -------------------------------------------------------------------------
+    async def replace_all(
+        self,
+        similarities: Iterable[Dict[str, Any]],
+        user_recommendations: Iterable[Dict[str, Any]],
+        *,
+        pair_stats: Iterable[Dict[str, Any]] = (),
+        norms: Iterable[Dict[str, Any]] = (),
+        events_read: Sequence[int] = (),
+    ) -> Dict[str, int]:
+        """
+        Swap in a freshly built model: clear the model tables and bulk insert
+        the new rows in one transaction, so readers see either model, never a
+        mix. The review events in `events_read` are already reflected in the
+        build and are dropped in the same transaction; any other event is
+        left for the consumer.
+        """
+        written: Dict[str, int] = {}
+        for model, rows in (
+            (BookSimilarity, similarities),
+            (UserRecommendation, user_recommendations),
+            (BookPairStat, pair_stats),
+            (BookNorm, norms),
+        ):
+            await self.session.execute(delete(model))
+            written[model.__tablename__] = await self._insert_chunks(model, rows)
+        await self.delete_events(events_read)
+        await self.session.commit()
+        return written
+
+    async def _insert_chunks(self, model: Any, rows: Iterable[Dict[str, Any]]) -> int:
+        written, iterator = 0, iter(rows)
+        while chunk := list(islice(iterator, settings.BOOKS_BULK_CHUNK_SIZE)):
+            await self.session.execute(insert(model), chunk)  # executemany
+            written += len(chunk)
+        return written
+
+    # -------------------------------------------------------------------------
+    # Lookups (one index range scan each)
+    # -------------------------------------------------------------------------
+    async def similar_to(self, book_id: int, limit: int) -> List[Tuple[Book, float]]:
+        stmt = (
+            select(Book, BookSimilarity.score)
+            .join(BookSimilarity, BookSimilarity.similar_book_id == Book.id)
+            .where(BookSimilarity.book_id == book_id)
+            .order_by(BookSimilarity.rank)
+            .limit(limit)
+        )
+        return [(book, score) for book, score in await self.session.execute(stmt)]
+
+    async def for_user(self, username: str, limit: int) -> List[Tuple[Book, float]]:
+        stmt = (
+            select(Book, UserRecommendation.score)
+            .join(UserRecommendation, UserRecommendation.book_id == Book.id)
+            .where(UserRecommendation.username == username)
+            .order_by(UserRecommendation.rank)
+            .limit(limit)
+        )
+        return [(book, score) for book, score in await self.session.execute(stmt)]
+
+    async def books_by_ids(self, book_ids: Sequence[int]) -> Dict[int, Book]:
+        if not book_ids:
+            return {}
+        stmt = select(Book).where(Book.id.in_(book_ids))
+        return {book.id: book for book in (await self.session.execute(stmt)).scalars()}
+
+    # -------------------------------------------------------------------------
+    # Review events (outbox) and incremental updates
+    # -------------------------------------------------------------------------
+    async def pending_events(self, limit: int) -> List[ReviewEvent]:
+        """Oldest unprocessed events; on Postgres rows locked by another consumer are skipped."""
+        stmt = select(ReviewEvent).order_by(ReviewEvent.id).limit(limit)
+        if dialect_name(self.session) == "postgresql":
+            stmt = stmt.with_for_update(skip_locked=True)
+        return list((await self.session.execute(stmt)).scalars())
+
+    async def pending_events_for_users(
+        self, usernames: Sequence[str], *, from_id: int
+    ) -> List[ReviewEvent]:
+        stmt = (
+            select(ReviewEvent)
+            .where(ReviewEvent.username.in_(usernames), ReviewEvent.id >= from_id)
+            .order_by(ReviewEvent.id)
+        )
+        return list((await self.session.execute(stmt)).scalars())
+
+    async def delete_events(self, ids: Sequence[int]) -> None:
+        for chunk in _chunks(ids):
+            await self.session.execute(
+                delete(ReviewEvent).where(ReviewEvent.id.in_(chunk))
+            )
+
+    async def user_ratings(self, usernames: Sequence[str]) -> Dict[str, Dict[int, int]]:
+        """Current ratings (book_id -> rating) of each given user."""
+        stmt = select(Review.username, Review.book_id, Review.rating).where(
+            Review.username.in_(usernames)
+        )
+        ratings: Dict[str, Dict[int, int]] = {name: {} for name in usernames}
+        for username, book_id, rating in await self.session.execute(stmt):
+            ratings[username][book_id] = rating
+        return ratings
+
+    async def add_to_norms(self, deltas: Dict[int, float]) -> None:
+        """norm += delta per book, inserting missing rows (one executemany)."""
+        if not deltas:
+            return
+        stmt = insert_for(self.session, BookNorm)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[BookNorm.book_id],
+            set_={"sum_sq": BookNorm.sum_sq + stmt.excluded.sum_sq},
+        )
+        await self.session.execute(
+            stmt, [{"book_id": b, "sum_sq": d} for b, d in deltas.items()]
+        )
+
+    async def add_to_pairs(self, deltas: Dict[Tuple[int, int], float]) -> None:
+        """dot += delta per (book_a < book_b) pair, inserting missing rows."""
+        if not deltas:
+            return
+        stmt = insert_for(self.session, BookPairStat)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[BookPairStat.book_a, BookPairStat.book_b],
+            set_={"dot": BookPairStat.dot + stmt.excluded.dot},
+        )
+        rows = [{"book_a": a, "book_b": b, "dot": d} for (a, b), d in deltas.items()]
+        for start in range(0, len(rows), settings.BOOKS_BULK_CHUNK_SIZE):
+            await self.session.execute(
+                stmt, rows[start : start + settings.BOOKS_BULK_CHUNK_SIZE]
+            )
+
+    async def norms_of(self, book_ids: Iterable[int]) -> Dict[int, float]:
+        norms: Dict[int, float] = {}
+        for chunk in _chunks(list(book_ids)):
+            stmt = select(BookNorm.book_id, BookNorm.sum_sq).where(
+                BookNorm.book_id.in_(chunk)
+            )
+            norms.update((await self.session.execute(stmt)).all())
+        return norms
+
+    async def pair_neighbours(
+        self, book_ids: Sequence[int]
+    ) -> Dict[int, List[Tuple[int, float, float]]]:
+        """
+        (other_book, dot, other_norm) for every pair statistic involving each
+        of `book_ids`; one pairs query per chunk of ids, plus the norms.
+        """
+        neighbours: Dict[int, List[Tuple[int, float]]] = {b: [] for b in book_ids}
+        seen: Set[Tuple[int, int]] = set()
+        for chunk in _chunks(book_ids):
+            stmt = select(
+                BookPairStat.book_a, BookPairStat.book_b, BookPairStat.dot
+            ).where(or_(BookPairStat.book_a.in_(chunk), BookPairStat.book_b.in_(chunk)))
+            for a, b, dot in await self.session.execute(stmt):
+                if (a, b) in seen:  # both books requested, in different chunks
+                    continue
+                seen.add((a, b))
+                if a in neighbours:
+                    neighbours[a].append((b, dot))
+                if b in neighbours:
+                    neighbours[b].append((a, dot))
+        norms = await self.norms_of(
+            sorted({o for pairs in neighbours.values() for o, _ in pairs})
+        )
+        return {
+            book_id: [(o, dot, norms.get(o, 0.0)) for o, dot in pairs]
+            for book_id, pairs in neighbours.items()
+        }
+
+    async def replace_book_similarities(
+        self, neighbours: Dict[int, List[Tuple[int, float]]]
+    ) -> None:
+        """Replace the neighbour lists of the given books (one DELETE and one INSERT per chunk)."""
+        for chunk in _chunks(sorted(neighbours)):
+            await self.session.execute(
+                delete(BookSimilarity).where(BookSimilarity.book_id.in_(chunk))
+            )
+        rows = [
+            {"book_id": book_id, "rank": rank, "similar_book_id": o, "score": sc}
+            for book_id in sorted(neighbours)
+            for rank, (o, sc) in enumerate(neighbours[book_id])
+        ]
+        await self._insert_chunks(BookSimilarity, rows)
+
+    async def books_listing(self, book_ids: Iterable[int]) -> set[int]:
+        """Books that currently have one of `book_ids` among their neighbours."""
+        stmt = (
+            select(BookSimilarity.book_id)
+            .where(BookSimilarity.similar_book_id.in_(list(book_ids)))
+            .distinct()
+        )
+        return set((await self.session.execute(stmt)).scalars())
+
+    async def similarities_from(
+        self, book_ids: Iterable[int]
+    ) -> List[Tuple[int, int, float]]:
+        """(book_id, similar_book_id, score) rows of the given books' neighbour lists."""
+        stmt = select(
+            BookSimilarity.book_id, BookSimilarity.similar_book_id, BookSimilarity.score
+        ).where(BookSimilarity.book_id.in_(list(book_ids)))
+        return [tuple(row) for row in await self.session.execute(stmt)]
+
+    async def replace_user_recommendations(
+        self, username: str, books: List[Tuple[int, float]]
+    ) -> None:
+        await self.session.execute(
+            delete(UserRecommendation).where(UserRecommendation.username == username)
+        )
+        if books:
+            await self.session.execute(
+                insert(UserRecommendation),
+                [
+                    {"username": username, "rank": rank, "book_id": b, "score": sc}
+                    for rank, (b, sc) in enumerate(books)
+                ],
+            )
+
+
+def _chunks(ids: Sequence[int]) -> Iterator[List[int]]:
+    """`ids` in lists of at most BOOKS_BULK_CHUNK_SIZE (bound parameter limits)."""
+    ids = list(ids)
+    for start in range(0, len(ids), settings.BOOKS_BULK_CHUNK_SIZE):
+        yield ids[start : start + settings.BOOKS_BULK_CHUNK_SIZE]
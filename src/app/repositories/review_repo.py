@@ -1,12 +1,38 @@
 from __future__ import annotations
 
-from typing import Optional, List
+from datetime import datetime
+from typing import Any, Dict, Optional, List, Sequence, Set, Tuple
 
-from sqlalchemy import Select, select
+from sqlalchemy import Float, Row, case, cast, func, select, tuple_, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import IntegrityError
 
+from app.core.cache import invalidate_books
+from app.core.config import settings
+from app.core.logging import setup_logger
+from app.db.dialect import dialect_name, insert_for, is_foreign_key_violation
+from app.models.book import Book
+from app.models.recommendation import ReviewEvent
 from app.models.review import Review
+from app.repositories.version_repo import VersionRepository, bump_catalog_after_commit
+
+logger = setup_logger(__name__)
+
+
+# What a reviews listing needs (ReviewRead plus the cursor's created_at):
+# skips updated_at and the ORM identity map / object construction.
+LIST_COLUMNS = (
+    Review.id,
+    Review.book_id,
+    Review.username,
+    Review.rating,
+    Review.review_text,
+    Review.created_at,
+)
+
+
+class BookNotFoundError(LookupError):
+    """A review was written for a book id that does not exist."""
 
 
 class ReviewRepository:
@@ -25,102 +51,292 @@ class ReviewRepository:
         self, *, book_id: int, username: str, rating: int, review_text: str
     ) -> Review:
         """
-        Create/update a user's review for a given book.
+        Create/update a user's review for a given book in one statement:
+        INSERT ... ON CONFLICT (book_id, username) DO UPDATE ... RETURNING.
+
+        - Concurrent writers of the same (book, user) serialize on the unique
+          constraint; there is no SELECT-then-INSERT race to recover from.
+        - The reviews.book_id foreign key replaces a separate existence
+          query: an unknown book raises BookNotFoundError.
+        - The returned row carries `previous_rating` (NULL for an insert),
+          from which the book's stored rating aggregates are adjusted in the
+          same transaction; with RECOMMENDER_INCREMENTAL a rating change is
+          also queued for the recommender as a `review_events` row.
+        - A rating change bumps the "books" catalog version (see
+          `_bump_catalog_inline`).
+        """
+        stmt = (
+            self._upsert_stmt()
+            .values(
+                book_id=book_id,
+                username=username,
+                rating=rating,
+                review_text=review_text,
+            )
+            .returning(Review)
+        )
+        try:
+            # populate_existing: a Review already in this session gets the new values.
+            result = await self.session.scalars(
+                stmt, execution_options={"populate_existing": True}
+            )
+            review = result.one()
+            rating_changed = await self._apply_upsert_effects(review)
+            if rating_changed and self._bump_catalog_inline():
+                await VersionRepository(self.session).bump_catalog()
+            await self.session.commit()
+        except IntegrityError as exc:
+            await self.session.rollback()
+            if is_foreign_key_violation(exc):
+                raise BookNotFoundError(book_id) from exc
+            raise
+
+        if rating_changed:
+            await self._after_rating_change([book_id])
+        return review
 
-        Logic preserved:
-        1) Try to find an existing (book_id, username) review and update it.
-        2) Otherwise insert a new review.
-        3) If insert hits IntegrityError (race), reload existing and update it.
+    async def upsert_many(
+        self,
+        *,
+        rows: Sequence[Dict[str, Any]],
+        username: Optional[str] = None,
+        chunk_size: Optional[int] = None,
+    ) -> Dict[Tuple[int, str], Tuple[int, bool]]:
         """
-        stmt = self._select_user_review_stmt(book_id=book_id, username=username)
+        Create/update many reviews (`rows` of book_id, rating, review_text
+        and username, which defaults to `username`) with multi-row upserts
+        of `chunk_size` rows, each followed by a commit so lock time stays
+        bounded.
 
-        existing = await self._find_existing(stmt)
-        if existing:
-            self._apply_updates(existing, rating=rating, review_text=review_text)
-            return await self._commit_and_refresh(existing)
+        - Each (book, user) may appear only once: one statement cannot
+          update the same row twice. Rows sorted by that key keep lock
+          order stable.
+        - Per chunk, a book's aggregates move in one UPDATE. The catalog
+          version is bumped once per chunk on SQLite, otherwise once after
+          the last commit (or the failed chunk), when cached listing pages
+          are also invalidated for all books whose rating changed.
+        - An unknown book fails its chunk with BookNotFoundError; earlier
+          chunks stay committed.
 
-        # No existing review: attempt insert
-        new_review = self._build_new_review(
-            book_id=book_id, username=username, rating=rating, review_text=review_text
+        Returns {(book_id, username): (review id, created)}.
+        """
+        size = chunk_size or settings.REVIEWS_BATCH_CHUNK_SIZE
+        stmt = self._upsert_stmt().returning(
+            Review.id,
+            Review.book_id,
+            Review.username,
+            Review.rating,
+            Review.previous_rating,
         )
-        self.session.add(new_review)
+        written: Dict[Tuple[int, str], Tuple[int, bool]] = {}
+        rating_changed: Set[int] = set()
+        try:
+            for start in range(0, len(rows), size):
+                chunk = [
+                    {
+                        "book_id": row["book_id"],
+                        "username": row.get("username", username),
+                        "rating": row["rating"],
+                        "review_text": row["review_text"],
+                    }
+                    for row in rows[start : start + size]
+                ]
+                returned, changed = await self._upsert_chunk(stmt, chunk)
+                rating_changed.update(changed)
+                written.update(
+                    ((r.book_id, r.username), (r.id, r.previous_rating is None))
+                    for r in returned
+                )
+        finally:
+            if rating_changed:
+                await self._after_rating_change(sorted(rating_changed))
+        return written
 
+    async def _upsert_chunk(
+        self, stmt: Any, chunk: List[Dict[str, Any]]
+    ) -> Tuple[List[Row], List[int]]:
+        """
+        One upsert_many chunk in its own transaction; returns the RETURNING
+        rows and the ids of the books whose rating changed.
+        """
         try:
+            # executemany form: batched into multi-row VALUES ("insertmanyvalues").
+            returned = (await self.session.execute(stmt, chunk)).all()
+            deltas: Dict[int, List[int]] = {}
+            for r in returned:
+                sum_delta, count_delta = self._upsert_delta(r)
+                book_delta = deltas.setdefault(r.book_id, [0, 0])
+                book_delta[0] += sum_delta
+                book_delta[1] += count_delta
+            # One UPDATE per book however many users rated it in the
+            # chunk; a hot book's row is written once per transaction.
+            for book_id in sorted(deltas):
+                sum_delta, count_delta = deltas[book_id]
+                await self._apply_rating_delta(
+                    book_id, sum_delta=sum_delta, count_delta=count_delta
+                )
+            changed = [book_id for book_id, (sd, cd) in deltas.items() if sd or cd]
+            if changed and self._bump_catalog_inline():
+                await VersionRepository(self.session).bump_catalog()
             await self.session.commit()
-        except IntegrityError:
-            # Race condition: someone inserted concurrently. Roll back and update.
+        except IntegrityError as exc:
             await self.session.rollback()
-            return await self._handle_integrity_race(
-                stmt=stmt, rating=rating, review_text=review_text
-            )
-
-        await self.session.refresh(new_review)
-        return new_review
+            if is_foreign_key_violation(exc):
+                raise BookNotFoundError("A review refers to an unknown book") from exc
+            raise
+        return returned, changed
 
-    async def for_book(self, book_id: int) -> List[Review]:
+    async def for_book(
+        self,
+        book_id: int,
+        *,
+        limit: Optional[int] = None,
+        after: Optional[Tuple[datetime, int]] = None,
+        newest_first: bool = True,
+    ) -> List[Row]:
         """
-        Return all reviews for a book, newest first (created_at DESC).
+        Return a book's reviews as lightweight rows of LIST_COLUMNS, ordered
+        by (created_at, id), newest first unless `newest_first` is False.
+
+        - `limit` caps the page size (None keeps the old "return all" behavior).
+        - `after` is the (created_at, id) of the previous page's last row; only
+          rows past it in the listing order are returned (keyset seek, no OFFSET).
+        Both orders are one range scan of ix_reviews_book_created_id.
         """
-        res = await self.session.execute(
-            select(Review)
-            .where(Review.book_id == book_id)
-            .order_by(Review.created_at.desc())
-        )
-        return list(res.scalars().all())
+        if newest_first:
+            order = (Review.created_at.desc(), Review.id.desc())
+        else:
+            order = (Review.created_at.asc(), Review.id.asc())
+        stmt = select(*LIST_COLUMNS).where(Review.book_id == book_id).order_by(*order)
+        if after is not None:
+            created_at, review_id = after
+            # Plain tuple on the right so binds take the column types.
+            position = tuple_(Review.created_at, Review.id)
+            stmt = stmt.where(
+                position < (created_at, review_id)
+                if newest_first
+                else position > (created_at, review_id)
+            )
+        if limit is not None:
+            stmt = stmt.limit(limit)
+
+        res = await self.session.execute(stmt)
+        return list(res.all())
 
     # -------------------------------------------------------------------------
     # Internal helpers
     # -------------------------------------------------------------------------
-    @staticmethod
-    def _select_user_review_stmt(*, book_id: int, username: str) -> Select:
-        """Query for a user's review on a specific book."""
-        return select(Review).where(
-            Review.book_id == book_id,
-            Review.username == username,
+    def _upsert_stmt(self):
+        """
+        The dialect's ON CONFLICT (book_id, username) upsert of reviews,
+        values bound at execution. On conflict the old rating is kept in
+        `previous_rating` (SET reads the pre-update row), so RETURNING tells
+        the caller what changed without a SELECT.
+        """
+        stmt = insert_for(self.session, Review)
+        return stmt.on_conflict_do_update(
+            index_elements=[Review.book_id, Review.username],
+            set_={
+                "rating": stmt.excluded.rating,
+                "review_text": stmt.excluded.review_text,
+                "previous_rating": Review.rating,
+                # onupdate= only fires for ORM flushes
+                "updated_at": func.now(),
+            },
         )
 
-    async def _find_existing(self, stmt: Select) -> Optional[Review]:
-        """Execute statement and return first matching Review or None."""
-        result = await self.session.execute(stmt)
-        return result.scalars().first()
-
-    @staticmethod
-    def _apply_updates(review: Review, *, rating: int, review_text: str) -> None:
-        """Mutate existing review fields (no extra validation to preserve behavior)."""
-        review.rating = rating
-        review.review_text = review_text
-
-    async def _commit_and_refresh(self, review: Review) -> Review:
-        """Commit current transaction and refresh the instance."""
-        self.session.add(review)
-        await self.session.commit()
-        await self.session.refresh(review)
-        return review
+    async def _apply_upsert_effects(self, review: Review) -> bool:
+        """
+        Shift the aggregates by what the upsert changed and queue the
+        recommender event; returns whether the book's rating changed.
+        """
+        sum_delta, count_delta = self._upsert_delta(review)
+        # Runs even for a text-only edit: it also bumps the book's version.
+        await self._apply_rating_delta(
+            review.book_id, sum_delta=sum_delta, count_delta=count_delta
+        )
+        return bool(sum_delta or count_delta)
 
-    @staticmethod
-    def _build_new_review(
-        *, book_id: int, username: str, rating: int, review_text: str
-    ) -> Review:
-        """Construct a new Review instance."""
-        return Review(
-            book_id=book_id,
-            username=username,
-            rating=rating,
-            review_text=review_text,
+    def _upsert_delta(self, review: Review) -> Tuple[int, int]:
+        """
+        (sum_delta, count_delta) of one upsert: a new rating, or the
+        difference to `previous_rating`. Queues the recommender event when
+        the rating changed. `review` may be any row with the Review columns
+        RETURNING produced.
+        """
+        inserted = review.previous_rating is None
+        old_rating = review.previous_rating
+        sum_delta = review.rating - (old_rating or 0)
+        if inserted or sum_delta:
+            self._record_event(
+                book_id=review.book_id,
+                username=review.username,
+                old_rating=old_rating,
+                new_rating=review.rating,
+            )
+        return sum_delta, int(inserted)
+
+    def _record_event(
+        self, *, book_id: int, username: str, old_rating: Optional[int], new_rating: int
+    ) -> None:
+        """Queue a rating change for the incremental recommender (same transaction)."""
+        if settings.RECOMMENDER_INCREMENTAL:
+            self.session.add(
+                ReviewEvent(
+                    book_id=book_id,
+                    username=username,
+                    old_rating=old_rating,
+                    new_rating=new_rating,
+                )
+            )
+
+    async def _apply_rating_delta(
+        self, book_id: int, *, sum_delta: int, count_delta: int
+    ) -> None:
+        """
+        Shift the book's stored rating sum/count and recompute the average
+        in a single UPDATE, relative to the values currently in the row.
+        The same UPDATE bumps the book's version (reviews listing ETag).
+        """
+        new_sum = Book.rating_sum + sum_delta
+        new_count = Book.rating_count + count_delta
+        stmt = (
+            update(Book)
+            .where(Book.id == book_id)
+            .values(
+                rating_sum=new_sum,
+                rating_count=new_count,
+                average_rating=case(
+                    (new_count > 0, cast(new_sum, Float) / new_count),
+                    else_=None,
+                ),
+                version=Book.version + 1,
+            )
+            .execution_options(synchronize_session=False)
         )
+        await self.session.execute(stmt)
 
-    async def _handle_integrity_race(
-        self, *, stmt: Select, rating: int, review_text: str
-    ) -> Review:
+    def _bump_catalog_inline(self) -> bool:
         """
-        Handle concurrent insert race:
-        - Re-select existing, update, commit, refresh.
-        - If still not found, re-raise (same as original behavior).
+        Whether rating changes bump the "books" catalog version inside their
+        own transaction. SQLite runs one writer at a time anyway, so that
+        saves a commit. Elsewhere the counter row would serialize all
+        concurrent review writers, so it is bumped after the commit instead,
+        once for all writers waiting (bump_catalog_after_commit).
         """
-        existing = await self._find_existing(stmt)
-        if not existing:
-            # Preserve the original control flow: bubble up IntegrityError if truly unexpected.
-            raise
+        return dialect_name(self.session) == "sqlite"
 
-        self._apply_updates(existing, rating=rating, review_text=review_text)
-        return await self._commit_and_refresh(existing)
+    async def _after_rating_change(self, book_ids: List[int]) -> None:
+        """
+        After the commit of rating changes: move the shared catalog version
+        past them unless that happened inline (other processes' cached
+        pages and listing ETags), then drop this process's cached pages
+        showing the books.
+        """
+        if not self._bump_catalog_inline():
+            try:
+                await bump_catalog_after_commit(self.session)
+            except Exception:
+                # The write is committed; other workers' pages expire by TTL.
+                logger.exception("Catalog version bump failed after a review write")
+        await invalidate_books(book_ids)
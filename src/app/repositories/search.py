@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import re
+from typing import List, Optional, Union
+
+from sqlalchemy import Select, column, func, literal_column, table
+
+from app.db.search_index import SQLITE_FTS_TABLE
+from app.models.book import Book
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _tokens(search: str) -> List[str]:
+    """Split user input into lowercase word tokens (drops FTS operators/quotes)."""
+    return _TOKEN_RE.findall(search.lower())
+
+
+class LikeSearchBackend:
+    """
+    Portable fallback: case-insensitive substring match on title/author.
+    Unranked (keeps the listing's title order) and cannot use an index.
+    """
+
+    name = "like"
+    ranked = False
+
+    def apply(self, stmt: Select, search: str) -> Select:
+        like_pattern = f"%{search.lower()}%"
+        return stmt.where(
+            func.lower(Book.title).like(like_pattern)
+            | func.lower(Book.author).like(like_pattern)
+        )
+
+
+class SqliteFtsSearchBackend:
+    """
+    SQLite FTS5 lookup through the `books_fts` index, ordered by bm25 rank.
+    Every input word must match a word prefix in title or author.
+    """
+
+    name = "sqlite-fts5"
+    ranked = True
+
+    _fts = table(SQLITE_FTS_TABLE, column("rowid"), column("rank"))
+
+    def apply(self, stmt: Select, search: str) -> Select:
+        tokens = _tokens(search)
+        if not tokens:
+            return LikeSearchBackend().apply(stmt, search)
+
+        match = " ".join(f'"{token}"*' for token in tokens)
+        return (
+            stmt.join(self._fts, self._fts.c.rowid == Book.id)
+            .where(literal_column(SQLITE_FTS_TABLE).op("MATCH")(match))
+            .order_by(None)
+            .order_by(self._fts.c.rank, Book.id)
+        )
+
+
+class PostgresFtsSearchBackend:
+    """
+    Postgres full-text lookup on the GIN-indexed `search_vector` column,
+    ordered by ts_rank. Every input word is matched as a prefix.
+    """
+
+    name = "postgres-tsvector"
+    ranked = True
+
+    _vector = literal_column("books.search_vector")
+
+    def apply(self, stmt: Select, search: str) -> Select:
+        tokens = _tokens(search)
+        if not tokens:
+            return LikeSearchBackend().apply(stmt, search)
+
+        query = func.to_tsquery("simple", " & ".join(f"{t}:*" for t in tokens))
+        return (
+            stmt.where(self._vector.op("@@")(query))
+            .order_by(None)
+            .order_by(func.ts_rank(self._vector, query).desc(), Book.id)
+        )
+
+
+SearchBackend = Union[
+    LikeSearchBackend, SqliteFtsSearchBackend, PostgresFtsSearchBackend
+]
+
+_BACKENDS = {
+    "like": LikeSearchBackend,
+    "sqlite": SqliteFtsSearchBackend,
+    "postgresql": PostgresFtsSearchBackend,
+}
+
+
+def get_search_backend(
+    dialect: str, preferred: Optional[str] = "auto"
+) -> SearchBackend:
+    """
+    Pick the search backend for a dialect.
+    `preferred="like"` forces the unindexed LIKE path (benchmarks, exotic DBs).
+    """
+    if preferred == "like":
+        return LikeSearchBackend()
+    return _BACKENDS.get(dialect, LikeSearchBackend)()
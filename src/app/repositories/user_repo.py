@@ -6,7 +6,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
-from app.core.security import verify_password
+from app.core.security import verify_password_async
 from app.core.logging import setup_logger
 
 logger = setup_logger(__name__)
@@ -27,10 +27,12 @@ class UserRepository:
     async def validate_credentials(self, username: str, password: str) -> bool:
         """
         Return True iff the user exists and the password is valid.
+        The hash check runs on the bounded verify pool, off the event loop;
+        PoolSaturatedError propagates when that pool is full.
         """
         user = await self.get_by_username(username)
-        # No extra branching or side effects; same truth table as original.
-        return bool(user and verify_password(password, user.password))
+        # No extra branching; same truth table as original.
+        return bool(user and await verify_password_async(password, user.password))
 
     async def get_by_username(self, username: str) -> Optional[User]:
         """
@@ -65,6 +67,13 @@ class UserRepository:
 
         return len(new_users)
 
+    async def existing_usernames(self, usernames: Iterable[str]) -> set[str]:
+        """
+        Return which of `usernames` are already stored (one IN query), so
+        callers can skip expensive work such as hashing for them.
+        """
+        return await self._fetch_existing_usernames(usernames)
+
     # -- internal pieces -------------------------------------------------------
     @staticmethod
     def _extract_usernames(users: Iterable[Dict[str, Any]]) -> List[str]:
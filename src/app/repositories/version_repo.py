@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from functools import partial
+from typing import Dict, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from app.core.write_behind import WriteBehindBuffer
+from app.db.dialect import insert_for
+from app.models.book import Book, CatalogVersion
+
+BOOKS_CATALOG = "books"
+
+
+class VersionRepository:
+    """Change counters behind the ETags; bumps join the caller's transaction."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.session = session
+
+    async def catalog(self, name: str = BOOKS_CATALOG) -> int:
+        """Current value of a catalog counter (0 before its first bump)."""
+        stmt = select(CatalogVersion.version).where(CatalogVersion.name == name)
+        return int(await self.session.scalar(stmt) or 0)
+
+    async def bump_catalog(self, name: str = BOOKS_CATALOG) -> None:
+        """Increment a catalog counter in one upsert (no read-modify-write race)."""
+        stmt = insert_for(self.session, CatalogVersion).values(name=name, version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CatalogVersion.name],
+            set_={"version": CatalogVersion.version + 1},
+        )
+        await self.session.execute(stmt)
+
+    async def book(self, book_id: int) -> Optional[int]:
+        """A book's version, or None if the book does not exist."""
+        return await self.session.scalar(select(Book.version).where(Book.id == book_id))
+
+
+# -----------------------------------------------------------------------------
+# Shared bumps for concurrent writers
+# -----------------------------------------------------------------------------
+# One buffer per engine, so the bump lands in the database the writer used.
+_catalog_bumps: Dict[AsyncEngine, WriteBehindBuffer[str, None, None]] = {}
+
+
+async def bump_catalog_after_commit(
+    session: AsyncSession, name: str = BOOKS_CATALOG
+) -> None:
+    """
+    Bump a catalog counter once `session`'s transaction has committed, in a
+    short transaction shared by every writer of that database waiting for a
+    bump.
+
+    Review writes use this rather than `bump_catalog` in their own
+    transaction: the counter row is then locked once per flush and never for
+    the length of a writer's transaction, so concurrent writers do not
+    serialize on it. Returns once a bump started after the call committed,
+    so pages cached from a read older than the caller's commit are no longer
+    reachable under the current version.
+    """
+    engine = session.bind
+    buffer = _catalog_bumps.get(engine)
+    if buffer is None:
+        buffer = _catalog_bumps[engine] = WriteBehindBuffer(
+            "catalog",
+            partial(_flush_catalog_bumps, engine),
+            max_items=1,
+            interval_seconds=0,
+        )
+    await buffer.submit(name, None)
+
+
+async def close_catalog_bumps() -> None:
+    """Run the bumps still pending (on shutdown) and drop the buffers."""
+    while _catalog_bumps:
+        _, buffer = _catalog_bumps.popitem()
+        await buffer.close()
+
+
+async def _flush_catalog_bumps(
+    engine: AsyncEngine, batch: Dict[str, None]
+) -> Dict[str, None]:
+    async with AsyncSession(engine) as session:
+        versions = VersionRepository(session)
+        for name in sorted(batch):
+            await versions.bump_catalog(name)
+        await session.commit()
+    return dict.fromkeys(batch)
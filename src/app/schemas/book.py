@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 
 class BookBase(BaseModel):
@@ -9,4 +9,19 @@ class BookBase(BaseModel):
 
 
 class BookRead(BookBase):
+    id: int
     average_rating: Optional[float] = None
+
+
+class BookSummary(BookRead):
+    review_count: int = 0  # the stored rating count: one review = one rating
+
+
+class BookBatch(BaseModel):
+    items: List[BookSummary]  # in the requested order, repeats included
+    missing: List[int] = []  # requested ids with no book, in first-seen order
+
+
+class BookPage(BaseModel):
+    items: List[BookRead]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,14 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ScoredBookRead(BaseModel):
+    """A recommended or similar book with the score it was ranked by."""
+
+    id: int
+    title: str
+    author: str
+    genre: str
+    average_rating: Optional[float] = None
+    score: float
@@ -1,3 +1,5 @@
+from typing import List, Literal, Optional
+
 from pydantic import BaseModel, Field, conint
 
 
@@ -6,6 +8,36 @@ class ReviewUpsertRequest(BaseModel):
     review_text: str = Field(default=None, max_length=2048)
 
 
+class ReviewBatchItem(ReviewUpsertRequest):
+    book_id: int
+
+
+# Outcome of one POST /reviews/batch item; "superseded" = a later item in the
+# same batch wrote that book's review (last write wins).
+ReviewBatchStatus = Literal[
+    "created", "updated", "superseded", "invalid", "book_not_found"
+]
+
+
+class ReviewBatchItemResult(BaseModel):
+    index: int  # position in the request
+    status: ReviewBatchStatus
+    book_id: Optional[int] = None
+    review_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class ReviewBatchResult(BaseModel):
+    items: List[ReviewBatchItemResult]
+    created: int = 0
+    updated: int = 0
+    failed: int = 0  # invalid + book_not_found
+
+
+# Order of a reviews listing by creation time.
+ReviewSort = Literal["newest", "oldest"]
+
+
 class ReviewRead(BaseModel):
     id: int
     book_id: int
@@ -13,3 +45,9 @@ class ReviewRead(BaseModel):
     rating: int
     review_text: str
     model_config = {"from_attributes": True}
+
+
+class ReviewPage(BaseModel):
+    items: List[ReviewRead]
+    next_cursor: Optional[str] = None
+    total: Optional[int] = None  # all reviews of the book, across pages
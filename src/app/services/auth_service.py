@@ -4,6 +4,7 @@ from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositories.user_repo import UserRepository
+from app.core.cpu_pool import PoolSaturatedError
 from app.core.security import create_access_token
 
 
@@ -25,8 +26,13 @@ class AuthUseCases:
 
         Raises:
             HTTPException(401) if credentials are invalid.
+            HTTPException(503) if the password-verification pool is saturated.
         """
-        if not await self._is_valid_user(username, password):
+        try:
+            is_valid = await self._is_valid_user(username, password)
+        except PoolSaturatedError:
+            self._raise_busy()
+        if not is_valid:
             self._raise_invalid_credentials()
 
         return self._generate_access_token(username)
@@ -46,6 +52,15 @@ class AuthUseCases:
             detail="Invalid credentials",
         )
 
+    @staticmethod
+    def _raise_busy() -> None:
+        """Fail fast under a login burst instead of queueing unboundedly."""
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent logins, retry shortly",
+            headers={"Retry-After": "1"},
+        )
+
     @staticmethod
     def _generate_access_token(username: str) -> str:
         """Generate a JWT token for the given username."""
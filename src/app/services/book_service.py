@@ -1,17 +1,62 @@
 from __future__ import annotations
 
-from typing import Any, Iterable, List
+import asyncio
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
 
+from fastapi import HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.repositories.book_repo import BookRepository
+from app.repositories.book_repo import BookRepository, SyncResult
 from app.repositories.review_repo import ReviewRepository
-from app.schemas.book import BookRead
+from app.services.recommendation_service import RecommendationService
+from app.schemas.book import BookBatch, BookPage, BookRead, BookSummary
 from app.clients.google_book_clients import GoogleBooksClient
+from app.clients.http import get_shared_http_client
+from app.clients.response_cache import get_response_cache
+from app.core.cache import BOOKS_TAG, book_tag, cache_key, get_book_list_cache
+from app.core.config import settings
+from app.core.etag import make_etag
 from app.core.logging import setup_logger
+from app.core.singleflight import SingleFlight
+from app.core.pagination import decode_cursor, encode_cursor
 
 logger = setup_logger(__name__)
 
+# Process-wide: coalescing only helps if concurrent requests share it.
+_book_list_flight = SingleFlight("books")
+
+# Shape of BookRead in cached pages and behind listing ETags; bump it when
+# the schema changes so neither serves bodies in the old shape.
+_LISTING_FORMAT = 2
+
+
+@dataclass
+class CatalogSyncResult:
+    """Counts for one catalog sync run; `merge` aggregates chunk results."""
+
+    queries: int = 0
+    failed_queries: int = 0
+    fetched: int = 0  # books returned by the API, duplicates included
+    unique: int = 0  # after de-duplicating on (title, author) across queries
+    inserted: int = 0
+    updated: int = 0  # genre (content hash) changed since the last sync
+    unchanged: int = 0
+    invalid: int = 0
+
+    def merge(self, other: "CatalogSyncResult") -> None:
+        for name, value in asdict(other).items():
+            setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self) -> Dict[str, int]:
+        return asdict(self)
+
+
+def _sync_clock() -> datetime:
+    """Start time of a sync run, naive UTC like `Book.last_seen_at`."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
 
 class BookService:
     """
@@ -22,6 +67,9 @@ class BookService:
     def __init__(self, session: AsyncSession) -> None:
         self.books = BookRepository(session)
         self.reviews = ReviewRepository(session)
+        # Per-request identity cache of by-id lookups (None = no such book);
+        # a service instance lives for one request.
+        self._summaries: Dict[int, Optional[BookSummary]] = {}
 
     # -------------------------------------------------------------------------
     # List books
@@ -33,8 +81,181 @@ class BookService:
         Return a paginated list of books enriched with their average rating.
         (Behavior unchanged: same repo call, same mapping semantics.)
         """
-        rows = await self.books.list_with_avg(search=search, limit=limit, offset=offset)
-        return self._rows_to_book_reads(rows)
+        page = await self.list_books_page(search=search, limit=limit, offset=offset)
+        return page.items
+
+    async def list_books_page(
+        self,
+        *,
+        search: Optional[str],
+        limit: int,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        version: Optional[int] = None,
+    ) -> BookPage:
+        """
+        Return one page of books plus an opaque `next_cursor`.
+        With a cursor the repository seeks past (title, id); without one the
+        legacy offset paging applies. Relevance-ranked search results have no
+        stable seek key, so their cursors carry the next offset instead.
+        `next_cursor` is None on the last page.
+
+        Pages are served from the book listing cache when enabled. Keys carry
+        the shared "books" catalog version (`version`, read here if the caller
+        has not), which every listing-visible write bumps: a page cached by
+        this process before a write made by another worker or Celery is never
+        read again, even though that write's invalidation only reached its
+        own process. Entries are also tagged with their books' ids, so local
+        invalidations free dead entries early (see app.core.cache).
+        """
+        cache = get_book_list_cache()
+        if cache is None:
+            page, _ = await self._coalesced_load(
+                search=search, limit=limit, offset=offset, cursor=cursor
+            )
+            return page
+
+        if version is None:
+            version = await self.books.versions.catalog()
+        key = cache_key(
+            "books", _LISTING_FORMAT, version, search, limit, offset, cursor
+        )
+        cached = await cache.get(key)
+        if cached is not None:
+            return BookPage.model_validate_json(cached)
+        epoch = cache.epoch
+        page, book_ids = await self._coalesced_load(
+            search=search, limit=limit, offset=offset, cursor=cursor, version=version
+        )
+        await cache.set(
+            key,
+            page.model_dump_json().encode("utf-8"),
+            tags=[BOOKS_TAG, *map(book_tag, book_ids)],
+            epoch=epoch,
+        )
+        return page
+
+    async def _coalesced_load(
+        self,
+        *,
+        search: Optional[str],
+        limit: int,
+        offset: int,
+        cursor: Optional[str],
+        version: Optional[int] = None,
+    ) -> Tuple[BookPage, List[int]]:
+        """
+        Run the listing query once for all concurrent identical requests
+        (cache expiry or a trending search would otherwise send a burst of
+        the same aggregate query to the DB). The leader's session runs it.
+        Callers that saw different catalog versions do not share a load: a
+        result started before a write must not be cached under the newer key.
+        """
+        params = {"search": search, "limit": limit, "offset": offset, "cursor": cursor}
+        if not settings.BOOK_LIST_COALESCE:
+            return await self._load_books_page(**params)
+        return await _book_list_flight.do(
+            (version, search, limit, offset, cursor),
+            lambda: self._load_books_page(**params),
+        )
+
+    async def _load_books_page(
+        self,
+        *,
+        search: Optional[str],
+        limit: int,
+        offset: int,
+        cursor: Optional[str],
+    ) -> Tuple[BookPage, List[int]]:
+        """Run the listing query; returns the page and the ids of its books."""
+        after = None
+        if cursor:
+            after, offset = self._decode_book_cursor(cursor)
+            if after is not None and self._is_ranked(search):
+                # A title-order cursor cannot resume a relevance-ordered listing.
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+        rows = await self.books.list_with_avg(
+            search=search, limit=limit, offset=offset, after=after
+        )
+        page = BookPage(
+            items=self._rows_to_book_reads(rows),
+            next_cursor=self._next_book_cursor(
+                rows, limit=limit, offset=offset, ranked=self._is_ranked(search)
+            ),
+        )
+        return page, [row["book"].id for row in rows]
+
+    async def get_books(self, book_ids: Sequence[int]) -> BookBatch:
+        """
+        Look books up by id, with their average rating and review count.
+        - Ids not resolved earlier in this request are fetched in one IN
+          query; repeated ids cost nothing.
+        - `items` follow the requested order (repeats included); unknown
+          ids are listed once each in `missing`.
+        """
+        unseen = [i for i in dict.fromkeys(book_ids) if i not in self._summaries]
+        if unseen:
+            rows = {row.id: row for row in await self.books.summaries_by_ids(unseen)}
+            for book_id in unseen:
+                row = rows.get(book_id)
+                self._summaries[book_id] = self._row_to_summary(row) if row else None
+
+        items = [self._summaries[i] for i in book_ids if self._summaries[i] is not None]
+        missing = [i for i in dict.fromkeys(book_ids) if self._summaries[i] is None]
+        return BookBatch(items=items, missing=missing)
+
+    async def catalog_version(self) -> int:
+        """The shared "books" catalog version (one primary-key read)."""
+        return await self.books.versions.catalog()
+
+    async def listing_etag(
+        self,
+        *,
+        search: Optional[str],
+        limit: int,
+        offset: int = 0,
+        cursor: Optional[str] = None,
+        version: Optional[int] = None,
+    ) -> str:
+        """
+        ETag of a GET /books page: the "books" catalog version plus the
+        request parameters; no listing query. Pass the same `version` to
+        list_books_page so the body served is the one the tag names.
+        """
+        if version is None:
+            version = await self.catalog_version()
+        return make_etag("b", version, _LISTING_FORMAT, search, limit, offset, cursor)
+
+    def _is_ranked(self, search: Optional[str]) -> bool:
+        """True when results come back in relevance order rather than title order."""
+        return bool(search) and self.books.search.ranked
+
+    @staticmethod
+    def _decode_book_cursor(cursor: str) -> Tuple[Optional[Tuple[str, int]], int]:
+        """
+        Turn a client cursor into (seek key, offset); 400 if malformed.
+        Two keys are a (title, id) seek position, a single key is an offset.
+        """
+        try:
+            values = decode_cursor(cursor)
+            if len(values) == 1:
+                return None, max(int(values[0]), 0)
+            title, book_id = values
+            return (str(title), int(book_id)), 0
+        except (TypeError, ValueError) as exc:
+            raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+    @staticmethod
+    def _next_book_cursor(
+        rows: List[dict[str, Any]], *, limit: int, offset: int, ranked: bool
+    ) -> Optional[str]:
+        """Encode where the next page starts when this page came back full."""
+        if len(rows) < limit:
+            return None
+        if ranked:
+            return encode_cursor(offset + limit)
+        last = rows[-1]["book"]
+        return encode_cursor(last.title, last.id)
 
     def _rows_to_book_reads(self, rows: Iterable[dict[str, Any]]) -> list[BookRead]:
         """
@@ -51,12 +272,25 @@ class BookService:
         book = row["book"]  # ORM Book object
         avg = row["average_rating"]  # float | None
         return BookRead(
+            id=book.id,
             title=book.title,
             author=book.author,
             genre=book.genre,
             average_rating=self._to_optional_float(avg),
         )
 
+    @classmethod
+    def _row_to_summary(cls, row: Any) -> BookSummary:
+        """Build `BookSummary` from a SUMMARY_COLUMNS row (typed columns, no re-validation)."""
+        return BookSummary.model_construct(
+            id=row.id,
+            title=row.title,
+            author=row.author,
+            genre=row.genre,
+            average_rating=cls._to_optional_float(row.average_rating),
+            review_count=row.rating_count,
+        )
+
     @staticmethod
     def _to_optional_float(value: Any) -> float | None:
         """Cast rating to float if present; otherwise None (unchanged semantics)."""
@@ -66,52 +300,149 @@ class BookService:
     # Seed from Google
     # -------------------------------------------------------------------------
     async def seed_from_google(
-        self, query: str = "python programming", limit: int = 20
+        self,
+        query: str = "python programming",
+        limit: int = 20,
+        *,
+        prefer_cache: bool = False,
     ) -> bool:
         """
         Fetch books from Google Books API and seed them into DB.
+        With `prefer_cache`, pages already in the response cache are used as-is
+        (no revalidation), so a warm startup makes no network calls.
 
         Returns:
             True if successful, False if any error occurs or nothing fetched.
         """
         # NOTE: Keep client creation outside the try-block to preserve original behavior.
-        client = self._new_google_client()
+        client = self._new_google_client(prefer_cache=prefer_cache)
+        started = _sync_clock()
 
         try:
-            fetched_books = await self._fetch_books(client, query=query, limit=limit)
-            if not fetched_books:
+            fetched, result = await self._fetch_and_ingest(
+                client, query=query, limit=limit, seen_at=started
+            )
+            if not fetched:
                 logger.warning(
                     "No books fetched from Google Books API for query='%s'", query
                 )
                 return False
 
-            await self._seed_books_in_repo(fetched_books)
             logger.info(
-                "Seeded %d books from Google API for query='%s'",
-                len(fetched_books),
+                "Seeded %d books from Google API for query='%s' "
+                "(%d inserted, %d updated, %d unchanged)",
+                fetched,
                 query,
+                result.inserted,
+                result.updated,
+                result.unchanged,
             )
+            result.stale = await self.books.report_stale(started)
+            await self._index_books(result.affected_ids)
             return True
 
-        except Exception as e:  # noqa: BLE001 – preserve original broad exception handling
-            logger.exception("Failed to seed books from Google API: %s", e)
+        except Exception:  # noqa: BLE001 – preserve original broad exception handling
+            logger.exception("Failed to seed books from Google API")
             return False
 
         finally:
             # Always close the client as in the original code.
             await client.close()
 
+    # -------------------------------------------------------------------------
+    # Catalog sync (many queries)
+    # -------------------------------------------------------------------------
+    async def sync_catalog(
+        self, queries: Sequence[str], *, limit: int, concurrency: int
+    ) -> CatalogSyncResult:
+        """
+        Fetch up to `limit` books for each query, `concurrency` queries at a
+        time, de-duplicate across all of them on (title, author) and ingest
+        the union in one bulk pass. A failing query is logged and counted,
+        not fatal for the rest.
+        """
+        client = self._new_google_client()
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        started = _sync_clock()
+
+        async def fetch(query: str) -> Optional[List[Dict[str, Any]]]:
+            async with semaphore:
+                try:
+                    return await client.search_books(query=query, max_results=limit)
+                except Exception as e:  # noqa: BLE001 – one bad query must not sink the chunk
+                    logger.warning("Catalog sync query '%s' failed: %s", query, e)
+                    return None
+
+        try:
+            pages = await asyncio.gather(*(fetch(q) for q in queries))
+        finally:
+            await client.close()
+
+        result = CatalogSyncResult(queries=len(queries))
+        unique: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for books in pages:
+            if books is None:
+                result.failed_queries += 1
+                continue
+            result.fetched += len(books)
+            for book in books:
+                unique.setdefault((book["title"], book["author"]), book)
+        result.unique = len(unique)
+
+        synced = await self._sync_books_in_repo(unique.values(), seen_at=started)
+        await self.books.report_stale(started)
+        await self._index_books(synced.affected_ids)
+        result.inserted, result.updated, result.unchanged, result.invalid = (
+            synced.inserted,
+            synced.updated,
+            synced.unchanged,
+            synced.invalid,
+        )
+        return result
+
     # -- helpers for seeding ---------------------------------------------------
-    def _new_google_client(self) -> GoogleBooksClient:
-        """Create a new Google Books API client (isolated for clarity/testing)."""
-        return GoogleBooksClient()
-
-    async def _fetch_books(
-        self, client: GoogleBooksClient, *, query: str, limit: int
-    ) -> List[Any]:
-        """Fetch raw book payloads from Google Books API."""
-        return await client.search_books(query=query, max_results=limit)
-
-    async def _seed_books_in_repo(self, books_payload: Iterable[Any]) -> None:
-        """Insert/merge fetched books via the repository (behavior unchanged)."""
-        await self.books.seed_books(books_payload)
+    def _new_google_client(self, *, prefer_cache: bool = False) -> GoogleBooksClient:
+        """
+        Google Books client on the process-wide pooled HTTP client when one is
+        open (keep-alive across refreshes), else a private one-off client,
+        backed by the on-disk response cache when enabled.
+        """
+        return GoogleBooksClient(
+            client=get_shared_http_client(),
+            cache=get_response_cache(),
+            prefer_cache=prefer_cache,
+        )
+
+    async def _fetch_and_ingest(
+        self, client: GoogleBooksClient, *, query: str, limit: int, seen_at: datetime
+    ) -> Tuple[int, SyncResult]:
+        """
+        Ingest each page from Google Books API as it arrives, so the inserts
+        overlap with the requests still in flight. Returns (fetched, result).
+        """
+        fetched, result = 0, SyncResult()
+        async for page in client.iter_pages(query=query, max_results=limit):
+            fetched += len(page)
+            result.merge(await self._sync_books_in_repo(page, seen_at=seen_at))
+        return fetched, result
+
+    async def _index_books(self, book_ids: List[int]) -> None:
+        """Add new/changed books to the content index; a failure only costs freshness."""
+        if not book_ids:
+            return
+        try:
+            await RecommendationService(self.books.session).index_books(book_ids)
+        except Exception as e:  # noqa: BLE001 – the daily rebuild catches up
+            logger.warning(
+                "Content index update failed for %d books: %s", len(book_ids), e
+            )
+
+    async def _sync_books_in_repo(
+        self, books_payload: Iterable[Any], *, seen_at: datetime
+    ) -> SyncResult:
+        """
+        Upsert fetched books through the repository's change-detecting sync:
+        new books are inserted, changed ones updated, unchanged ones skipped.
+        Every page of one run is stamped with the same `seen_at`.
+        """
+        return await self.books.sync_books(books_payload, seen_at=seen_at)
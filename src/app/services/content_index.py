@@ -0,0 +1,363 @@
+"""
+Content-based "more like this" over a book's title, author and genre.
+
+Books become hashed TF-IDF vectors (hashing trick: no vocabulary to store or
+grow), L2-normalized, so cosine similarity is a dot product. The vectors
+live on disk as flat CSR arrays that readers memory-map, and a query is a
+blocked brute-force scan: one sparse matrix-vector product per block of
+rows, which is fast enough for catalogs of this size and needs no ANN index.
+
+Layout of the index directory:
+
+    CURRENT              name of the live generation (replaced atomically)
+    gen-<n>/meta.json    dim, rows, nnz, fitted_rows, version
+    gen-<n>/idf.f32      per-bucket IDF weights, frozen at the full build
+    gen-<n>/ids.i64      row -> books.id
+    gen-<n>/indptr.i64   CSR row pointers (rows + 1)
+    gen-<n>/indices.i32  CSR bucket indices
+    gen-<n>/data.f32     CSR weights
+
+A full build writes a new generation and switches CURRENT, so readers never
+see a half-written index. New or changed books are appended to the live
+generation with the frozen IDF; a book appended again supersedes its older
+row. Methods do blocking file I/O; async callers run them in a thread.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import shutil
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+
+from app.core.config import settings
+from app.core.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+# (book_id, title, author, genre)
+BookText = Tuple[int, str, str, str]
+
+
+def book_features(title: str, author: str, genre: str) -> List[str]:
+    """
+    Field-prefixed terms of one book: title words, author words plus the
+    full author name (so "same author" outweighs a shared first name), and
+    the genre as a single term.
+    """
+    features = [f"t:{word}" for word in _TOKEN.findall(title.lower())]
+    author = author.strip().lower()
+    features += [f"a:{word}" for word in _TOKEN.findall(author)]
+    if author:
+        features.append(f"A:{author}")
+    genre = genre.strip().lower()
+    if genre:
+        features.append(f"g:{genre}")
+    return features
+
+
+def hash_counts(books: Sequence[BookText], dim: int) -> sp.csr_matrix:
+    """books x dim term counts; crc32 buckets are stable across processes."""
+    rows: List[int] = []
+    cols: List[int] = []
+    for row, (_, title, author, genre) in enumerate(books):
+        for feature in book_features(title or "", author or "", genre or ""):
+            rows.append(row)
+            cols.append(zlib.crc32(feature.encode("utf-8")) % dim)
+    counts = sp.csr_matrix(
+        (
+            np.ones(len(rows), dtype=np.float32),
+            (np.asarray(rows, dtype=np.int32), np.asarray(cols, dtype=np.int32)),
+        ),
+        shape=(len(books), dim),
+    )
+    counts.sum_duplicates()
+    return counts
+
+
+def fit_idf(counts: sp.csr_matrix) -> np.ndarray:
+    """Smoothed IDF per bucket: log((1 + n) / (1 + df)) + 1."""
+    n_docs, dim = counts.shape
+    df = np.bincount(counts.indices, minlength=dim)
+    return (np.log((1.0 + n_docs) / (1.0 + df)) + 1.0).astype(np.float32)
+
+
+def tfidf(counts: sp.csr_matrix, idf: np.ndarray) -> sp.csr_matrix:
+    """Row-wise L2-normalized TF-IDF vectors (float32 CSR)."""
+    vectors = counts.astype(np.float32, copy=True).tocsr()
+    vectors.data *= idf[vectors.indices]
+    norms = np.sqrt(np.asarray(vectors.multiply(vectors).sum(axis=1)).ravel())
+    scale = np.divide(1.0, norms, out=np.zeros_like(norms), where=norms > 0)
+    vectors.data *= np.repeat(scale.astype(np.float32), np.diff(vectors.indptr))
+    return vectors
+
+
+@contextmanager
+def _file_lock(path: Path) -> Iterator[None]:
+    """Hold an exclusive OS lock on ``path``: flock on POSIX, msvcrt on Windows."""
+    with path.open("a+") as f:
+        try:
+            import fcntl
+        except ImportError:
+            import msvcrt
+
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+            return
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+@dataclass
+class _Generation:
+    """One memory-mapped generation of the index, as of its meta.json."""
+
+    path: Path
+    meta: Dict[str, Any]
+    idf: np.ndarray
+    ids: np.ndarray
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+    live: np.ndarray  # bool per row: the latest row of its book id
+
+    @classmethod
+    def load(cls, path: Path) -> "_Generation":
+        meta = json.loads((path / "meta.json").read_text())
+        rows, nnz, dim = meta["rows"], meta["nnz"], meta["dim"]
+
+        def mapped(name: str, dtype, length: int) -> np.ndarray:
+            if length == 0:
+                return np.empty(0, dtype=dtype)
+            return np.memmap(path / name, dtype=dtype, mode="r", shape=(length,))
+
+        ids = mapped("ids.i64", np.int64, rows)
+        # Appends make a book's newest row the live one.
+        _, last_from_end = np.unique(ids[::-1], return_index=True)
+        live = np.zeros(rows, dtype=bool)
+        live[rows - 1 - last_from_end] = True
+        return cls(
+            path=path,
+            meta=meta,
+            idf=mapped("idf.f32", np.float32, dim),
+            ids=ids,
+            indptr=mapped("indptr.i64", np.int64, rows + 1),
+            indices=mapped("indices.i32", np.int32, nnz),
+            data=mapped("data.f32", np.float32, nnz),
+            live=live,
+        )
+
+    def block(self, start: int, stop: int) -> sp.csr_matrix:
+        lo, hi = int(self.indptr[start]), int(self.indptr[stop])
+        return sp.csr_matrix(
+            (
+                self.data[lo:hi],
+                self.indices[lo:hi],
+                np.asarray(self.indptr[start : stop + 1]) - lo,
+            ),
+            shape=(stop - start, self.meta["dim"]),
+        )
+
+
+class ContentIndex:
+    """
+    The on-disk content index. `build` and `append` take an exclusive file
+    lock, so API processes and Celery workers can share one directory.
+    """
+
+    CURRENT = "CURRENT"
+
+    def __init__(
+        self,
+        directory: str | os.PathLike[str],
+        *,
+        dim: int = 1 << 18,
+        block_rows: int = 65536,
+    ) -> None:
+        self.directory = Path(directory)
+        self.dim = dim
+        self.block_rows = max(1, block_rows)
+        self._loaded: Optional[_Generation] = None
+        self._loaded_key: Optional[Tuple[str, Tuple[int, int]]] = None
+
+    # -------------------------------------------------------------------------
+    # Writing
+    # -------------------------------------------------------------------------
+    def build(self, books: Sequence[BookText]) -> Dict[str, Any]:
+        """Vectorize all `books` into a new generation and make it live."""
+        counts = hash_counts(books, self.dim)
+        idf = fit_idf(counts)
+        vectors = tfidf(counts, idf)
+        ids = np.fromiter((book[0] for book in books), dtype=np.int64, count=len(books))
+        with self._lock():
+            previous = self._current_name()
+            number = int(previous.split("-")[1]) + 1 if previous else 1
+            path = self.directory / f"gen-{number}"
+            shutil.rmtree(path, ignore_errors=True)
+            path.mkdir(parents=True)
+            idf.tofile(path / "idf.f32")
+            ids.tofile(path / "ids.i64")
+            vectors.indptr.astype(np.int64).tofile(path / "indptr.i64")
+            vectors.indices.astype(np.int32).tofile(path / "indices.i32")
+            vectors.data.astype(np.float32).tofile(path / "data.f32")
+            meta = {
+                "dim": self.dim,
+                "rows": len(books),
+                "nnz": int(vectors.nnz),
+                "fitted_rows": len(books),
+                "version": 1,
+            }
+            self._write_meta(path, meta)
+            self._replace_file(self.directory / self.CURRENT, path.name)
+            if previous:
+                # Readers that still map the old files keep them until they close.
+                shutil.rmtree(self.directory / previous, ignore_errors=True)
+        return meta
+
+    def append(self, books: Sequence[BookText]) -> Optional[Dict[str, Any]]:
+        """
+        Add (or supersede) `books` in the live generation using its frozen
+        IDF. Returns the new meta, or None when no index has been built yet.
+        """
+        if not books:
+            return None
+        with self._lock():
+            name = self._current_name()
+            if not name:
+                return None
+            path = self.directory / name
+            meta = json.loads((path / "meta.json").read_text())
+            idf = np.fromfile(path / "idf.f32", dtype=np.float32)
+            vectors = tfidf(hash_counts(books, meta["dim"]), idf)
+            ids = np.fromiter(
+                (book[0] for book in books), dtype=np.int64, count=len(books)
+            )
+            # Arrays first, meta last: readers only look at the prefix meta.json
+            # describes, so a crash mid-append leaves a consistent index.
+            self._append_array(path / "ids.i64", ids)
+            self._append_array(path / "indices.i32", vectors.indices.astype(np.int32))
+            self._append_array(path / "data.f32", vectors.data.astype(np.float32))
+            self._append_array(
+                path / "indptr.i64", vectors.indptr[1:].astype(np.int64) + meta["nnz"]
+            )
+            meta["rows"] += len(books)
+            meta["nnz"] += int(vectors.nnz)
+            meta["version"] += 1
+            self._write_meta(path, meta)
+        return meta
+
+    @staticmethod
+    def _append_array(path: Path, values: np.ndarray) -> None:
+        with path.open("ab") as f:
+            values.tofile(f)
+
+    @staticmethod
+    def _write_meta(path: Path, meta: Dict[str, Any]) -> None:
+        ContentIndex._replace_file(path / "meta.json", json.dumps(meta))
+
+    @staticmethod
+    def _replace_file(path: Path, text: str) -> None:
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp.write_text(text)
+        os.replace(tmp, path)
+
+    @contextmanager
+    def _lock(self) -> Iterator[None]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with _file_lock(self.directory / "lock"):
+            yield
+
+    def _current_name(self) -> Optional[str]:
+        try:
+            return (self.directory / self.CURRENT).read_text().strip() or None
+        except FileNotFoundError:
+            return None
+
+    # -------------------------------------------------------------------------
+    # Reading
+    # -------------------------------------------------------------------------
+    def _generation(self) -> Optional[_Generation]:
+        """The live generation, re-mapped only when a build or append changed it."""
+        name = self._current_name()
+        if not name:
+            return None
+        try:
+            # meta.json is replaced on every write, so its inode identifies the version.
+            stat = (self.directory / name / "meta.json").stat()
+        except FileNotFoundError:  # swapped out between the two reads
+            return None
+        version = (stat.st_ino, stat.st_mtime_ns)
+        if self._loaded_key != (name, version):
+            self._loaded = _Generation.load(self.directory / name)
+            self._loaded_key = (name, version)
+        return self._loaded
+
+    def related(self, book: BookText, k: int) -> List[Tuple[int, float]]:
+        """
+        Top-`k` (book_id, cosine) most similar to `book`, best first, excluding
+        the book itself. The query is vectorized from the given text, so a
+        book not indexed yet still gets results.
+        """
+        generation = self._generation()
+        if generation is None or k <= 0:
+            return []
+        query = tfidf(hash_counts([book], generation.meta["dim"]), generation.idf)
+        dense = np.zeros(generation.meta["dim"], dtype=np.float32)
+        dense[query.indices] = query.data
+
+        rows = generation.meta["rows"]
+        best_ids = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for start in range(0, rows, self.block_rows):
+            stop = min(rows, start + self.block_rows)
+            scores = generation.block(start, stop) @ dense
+            ids = generation.ids[start:stop]
+            keep = generation.live[start:stop] & (scores > 0) & (ids != book[0])
+            ids, scores = np.asarray(ids[keep]), scores[keep]
+            if scores.size > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+                ids, scores = ids[top], scores[top]
+            best_ids = np.concatenate([best_ids, ids])
+            best_scores = np.concatenate([best_scores, scores])
+            if best_scores.size > k:
+                top = np.argpartition(-best_scores, k - 1)[:k]
+                best_ids, best_scores = best_ids[top], best_scores[top]
+        order = np.lexsort((best_ids, -best_scores))
+        return [(int(best_ids[i]), float(best_scores[i])) for i in order]
+
+
+_content_index: Optional[ContentIndex] = None
+
+
+def get_content_index() -> Optional[ContentIndex]:
+    """The process-wide content index, or None when CONTENT_INDEX_DIR is empty."""
+    global _content_index
+    if not settings.CONTENT_INDEX_DIR:
+        return None
+    if _content_index is None or _content_index.directory != Path(
+        settings.CONTENT_INDEX_DIR
+    ):
+        _content_index = ContentIndex(
+            settings.CONTENT_INDEX_DIR,
+            dim=settings.CONTENT_INDEX_DIM,
+            block_rows=settings.CONTENT_INDEX_BLOCK_ROWS,
+        )
+    return _content_index
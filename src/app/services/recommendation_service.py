@@ -0,0 +1,378 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import asdict, dataclass
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+import scipy.sparse as sp
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.core.logging import setup_logger
+from app.models.book import Book
+from app.repositories.book_repo import BookRepository
+from app.repositories.recommendation_repo import RecommendationRepository
+from app.schemas.recommendation import ScoredBookRead
+from app.services.content_index import BookText, get_content_index
+from app.services.item_similarity import (
+    RatingMatrix,
+    RatingMatrixBuilder,
+    TopK,
+    item_similarities,
+    pair_statistics,
+    recommend_for_users,
+    top_k_from_pairs,
+    user_vector_delta,
+)
+
+logger = setup_logger(__name__)
+
+
+@dataclass
+class RecommenderBuildResult:
+    reviews: int = 0
+    users: int = 0
+    books: int = 0
+    similarities: int = 0  # book_similarities rows written
+    user_recommendations: int = 0  # user_recommendations rows written
+    pair_stats: int = 0  # book_pair_stats rows written (incremental mode only)
+    compute_seconds: float = 0.0
+    persist_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class RecommenderUpdateResult:
+    events: int = 0  # review events consumed
+    users: int = 0  # users whose recommendations were recomputed
+    books: int = 0  # books whose neighbour lists were recomputed
+    pair_updates: int = 0  # book_pair_stats rows touched
+
+    def merge(self, other: "RecommenderUpdateResult") -> None:
+        for name, value in asdict(other).items():
+            setattr(self, name, getattr(self, name) + value)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class RecommendationService:
+    """
+    Item-item collaborative filtering over reviews.
+
+    `build()` is the offline part (Celery / CLI): it streams ratings into a
+    sparse matrix, computes top-K neighbours per book and top-N books per
+    user off the event loop, and swaps the results into their tables.
+    Request-time lookups just read K precomputed rows. `related_books()` is
+    the content-based counterpart for books nobody has reviewed yet.
+
+    With RECOMMENDER_INCREMENTAL the build also stores the model's pair
+    statistics, and `apply_review_events()` folds review upserts (queued in
+    `review_events` by the review repository) into them between rebuilds.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.recommendations = RecommendationRepository(session)
+        self.books = BookRepository(session)
+
+    # -------------------------------------------------------------------------
+    # Offline build
+    # -------------------------------------------------------------------------
+    async def build(self) -> RecommenderBuildResult:
+        incremental = settings.RECOMMENDER_INCREMENTAL
+        builder = RatingMatrixBuilder()
+        result = RecommenderBuildResult()
+        # Held until replace_all commits: the event consumer waits (skips)
+        # meanwhile instead of applying events this build would overwrite.
+        await self.recommendations.lock_model()
+        # Events read with the ratings are reflected in this build; any
+        # other is left for `apply_review_events`.
+        events_read: List[int] = []
+        async for rows, event_ids in self.recommendations.iter_ratings():
+            builder.add(rows)
+            result.reviews += len(rows)
+            events_read.extend(event_ids)
+
+        t0 = time.perf_counter()
+        ratings, neighbours, user_top, stats = await asyncio.to_thread(
+            self._compute, builder, incremental
+        )
+        result.compute_seconds = time.perf_counter() - t0
+        result.users, result.books = ratings.matrix.shape
+
+        t0 = time.perf_counter()
+        written = await self.recommendations.replace_all(
+            self._similarity_rows(ratings, neighbours),
+            self._user_rows(ratings, user_top),
+            pair_stats=self._pair_rows(ratings, stats[1]) if stats else (),
+            norms=self._norm_rows(ratings, stats[0]) if stats else (),
+            events_read=events_read if incremental else (),
+        )
+        result.similarities = written["book_similarities"]
+        result.user_recommendations = written["user_recommendations"]
+        result.pair_stats = written["book_pair_stats"]
+        result.persist_seconds = time.perf_counter() - t0
+        logger.info("Recommender build finished: %s", result)
+        return result
+
+    @staticmethod
+    def _compute(
+        builder: RatingMatrixBuilder, incremental: bool = False
+    ) -> Tuple[RatingMatrix, TopK, TopK, Optional[Tuple[np.ndarray, sp.coo_matrix]]]:
+        """CPU-bound NumPy/SciPy part; runs in a worker thread."""
+        ratings = builder.build()
+        block_bytes = settings.RECOMMENDER_BLOCK_MEMORY_MB << 20
+        neighbours = item_similarities(
+            ratings.matrix,
+            k=settings.RECOMMENDER_TOP_K,
+            adjusted=settings.RECOMMENDER_ADJUSTED_COSINE,
+            block_bytes=block_bytes,
+        )
+        user_top = recommend_for_users(
+            ratings.matrix,
+            neighbours,
+            n=settings.RECOMMENDER_USER_TOP_N,
+            block_bytes=block_bytes,
+        )
+        stats = None
+        if incremental:
+            stats = pair_statistics(
+                ratings.matrix, adjusted=settings.RECOMMENDER_ADJUSTED_COSINE
+            )
+        return ratings, neighbours, user_top, stats
+
+    @staticmethod
+    def _similarity_rows(ratings: RatingMatrix, top: TopK) -> Iterator[Dict[str, Any]]:
+        book_ids = ratings.book_ids
+        for row, (cols, scores) in enumerate(zip(top.indices, top.scores)):
+            for rank, (col, score) in enumerate(zip(cols, scores)):
+                if col < 0:
+                    break
+                yield {
+                    "book_id": int(book_ids[row]),
+                    "rank": rank,
+                    "similar_book_id": int(book_ids[col]),
+                    "score": float(score),
+                }
+
+    @staticmethod
+    def _user_rows(ratings: RatingMatrix, top: TopK) -> Iterator[Dict[str, Any]]:
+        book_ids = ratings.book_ids
+        for row, (cols, scores) in enumerate(zip(top.indices, top.scores)):
+            for rank, (col, score) in enumerate(zip(cols, scores)):
+                if col < 0:
+                    break
+                yield {
+                    "username": ratings.usernames[row],
+                    "rank": rank,
+                    "book_id": int(book_ids[col]),
+                    "score": float(score),
+                }
+
+    @staticmethod
+    def _pair_rows(
+        ratings: RatingMatrix, pairs: sp.coo_matrix
+    ) -> Iterator[Dict[str, Any]]:
+        book_ids = ratings.book_ids
+        for row, col, dot in zip(pairs.row, pairs.col, pairs.data):
+            a, b = int(book_ids[row]), int(book_ids[col])
+            yield {"book_a": min(a, b), "book_b": max(a, b), "dot": float(dot)}
+
+    @staticmethod
+    def _norm_rows(
+        ratings: RatingMatrix, norms: np.ndarray
+    ) -> Iterator[Dict[str, Any]]:
+        for book_id, sum_sq in zip(ratings.book_ids, norms):
+            yield {"book_id": int(book_id), "sum_sq": float(sum_sq)}
+
+    # -------------------------------------------------------------------------
+    # Incremental updates
+    # -------------------------------------------------------------------------
+    async def apply_review_events(self, *, limit: int) -> RecommenderUpdateResult:
+        """
+        Consume up to `limit` queued review events in one transaction.
+
+        Per affected user the batch's rating changes become an exact delta of
+        the pair statistics (see `user_vector_delta`). Neighbour lists are
+        then recomputed for the books whose statistics moved, plus the books
+        currently listing one of them, and the changed users' recommendations
+        are re-scored from the updated lists. Other users' recommendations and
+        books that would newly enter a list through a changed norm catch up
+        at the next full rebuild. Nothing is consumed while a full build
+        holds the model lock.
+        """
+        repo = self.recommendations
+        result = RecommenderUpdateResult()
+        if not await repo.lock_model(wait=False):
+            # A full build is running; it or the next run takes these events.
+            return result
+        events = await repo.pending_events(limit)
+        if not events:
+            return result
+
+        usernames = sorted({event.username for event in events})
+        batch_ids = [event.id for event in events]
+        current = await repo.user_ratings(usernames)
+        # Later events of the same users (queued after this batch was read)
+        # are already in `current`; undo them too to recover the state the
+        # statistics were last updated to.
+        pending = await repo.pending_events_for_users(usernames, from_id=batch_ids[0])
+        in_batch = set(batch_ids)
+
+        norm_deltas: Dict[int, float] = defaultdict(float)
+        pair_deltas: Dict[Tuple[int, int], float] = defaultdict(float)
+        adjusted = settings.RECOMMENDER_ADJUSTED_COSINE
+        for username in usernames:
+            mine = [e for e in pending if e.username == username]
+            before = dict(current[username])
+            for event in reversed(mine):
+                if event.old_rating is None:
+                    before.pop(event.book_id, None)
+                else:
+                    before[event.book_id] = event.old_rating
+            after = dict(before)
+            for event in mine:
+                if event.id in in_batch:
+                    after[event.book_id] = event.new_rating
+            norms, pairs = user_vector_delta(before, after, adjusted=adjusted)
+            for book_id, delta in norms.items():
+                norm_deltas[book_id] += delta
+            for pair, delta in pairs.items():
+                pair_deltas[pair] += delta
+
+        await repo.add_to_norms(norm_deltas)
+        await repo.add_to_pairs(pair_deltas)
+        changed: Set[int] = set(norm_deltas)
+        for a, b in pair_deltas:
+            changed.update((a, b))
+        books = changed | await repo.books_listing(changed)
+        await self._refresh_neighbours(books)
+        await self._refresh_users(usernames)
+        await repo.delete_events(batch_ids)
+        await repo.session.commit()
+
+        result.events = len(events)
+        result.users = len(usernames)
+        result.books = len(books)
+        result.pair_updates = len(pair_deltas)
+        logger.info("Applied review events: %s", result)
+        return result
+
+    async def _refresh_neighbours(self, book_ids: Set[int]) -> None:
+        """Recompute the neighbour lists of `book_ids` from the pair statistics, in bulk."""
+        repo = self.recommendations
+        ordered = sorted(book_ids)
+        norms = await repo.norms_of(ordered)
+        pairs = await repo.pair_neighbours(ordered)
+        await repo.replace_book_similarities(
+            {
+                book_id: top_k_from_pairs(
+                    norms.get(book_id, 0.0), pairs[book_id], settings.RECOMMENDER_TOP_K
+                )
+                for book_id in ordered
+            }
+        )
+
+    async def _refresh_users(self, usernames: List[str]) -> None:
+        """Same scoring as `recommend_for_users`, for a handful of users."""
+        repo = self.recommendations
+        ratings = await repo.user_ratings(usernames)
+        rated_books = {book_id for rated in ratings.values() for book_id in rated}
+        similar: Dict[int, List[Tuple[int, float]]] = defaultdict(list)
+        for book_id, other, score in await repo.similarities_from(rated_books):
+            similar[book_id].append((other, score))
+        for username in usernames:
+            rated = ratings[username]
+            scores: Dict[int, float] = defaultdict(float)
+            for book_id, rating in rated.items():
+                for other, score in similar[book_id]:
+                    if other not in rated:
+                        scores[other] += rating * score
+            best = sorted(
+                ((b, sc) for b, sc in scores.items() if sc > 0),
+                key=lambda pair: (-pair[1], pair[0]),
+            )
+            await repo.replace_user_recommendations(
+                username, best[: settings.RECOMMENDER_USER_TOP_N]
+            )
+
+    # -------------------------------------------------------------------------
+    # Content-based index
+    # -------------------------------------------------------------------------
+    async def build_content_index(self) -> Dict[str, Any]:
+        """Re-vectorize the whole catalog (and refit the IDF) into a new index."""
+        index = get_content_index()
+        if index is None:
+            return {"rows": 0}
+        books: List[BookText] = []
+        async for rows in self.books.iter_texts():
+            books.extend(rows)
+        meta = await asyncio.to_thread(index.build, books)
+        logger.info("Content index built: %s", meta)
+        return meta
+
+    async def index_books(self, book_ids: List[int]) -> int:
+        """
+        Append new or changed books to the content index. Without an index yet
+        the whole catalog is built instead. Returns the number of books indexed.
+        """
+        index = get_content_index()
+        if index is None or not book_ids:
+            return 0
+        books: List[BookText] = []
+        for start in range(0, len(book_ids), settings.BOOKS_BULK_CHUNK_SIZE):
+            chunk = book_ids[start : start + settings.BOOKS_BULK_CHUNK_SIZE]
+            async for rows in self.books.iter_texts(ids=chunk):
+                books.extend(rows)
+        if await asyncio.to_thread(index.append, books) is None:
+            return (await self.build_content_index())["rows"]
+        return len(books)
+
+    # -------------------------------------------------------------------------
+    # Request-time lookups
+    # -------------------------------------------------------------------------
+    async def similar_books(self, *, book_id: int, limit: int) -> List[ScoredBookRead]:
+        """Precomputed neighbours of a book, best first; 404 if it does not exist."""
+        if not await self.books.get(book_id):
+            raise HTTPException(status_code=404, detail="Book not found")
+        return self._to_scored(await self.recommendations.similar_to(book_id, limit))
+
+    async def related_books(self, *, book_id: int, limit: int) -> List[ScoredBookRead]:
+        """Books with similar title, author and genre; 404 if it does not exist."""
+        book = await self.books.get(book_id)
+        if not book:
+            raise HTTPException(status_code=404, detail="Book not found")
+        index = get_content_index()
+        if index is None:
+            return []
+        related = await asyncio.to_thread(
+            index.related, (book.id, book.title, book.author, book.genre), limit
+        )
+        found = await self.recommendations.books_by_ids([other for other, _ in related])
+        return self._to_scored(
+            [(found[other], score) for other, score in related if other in found]
+        )
+
+    async def for_user(self, *, username: str, limit: int) -> List[ScoredBookRead]:
+        """Precomputed recommendations (empty until the user has rated something)."""
+        return self._to_scored(await self.recommendations.for_user(username, limit))
+
+    @staticmethod
+    def _to_scored(rows: List[Tuple[Book, float]]) -> List[ScoredBookRead]:
+        return [
+            ScoredBookRead(
+                id=book.id,
+                title=book.title,
+                author=book.author,
+                genre=book.genre,
+                average_rating=book.average_rating,
+                score=score,
+            )
+            for book, score in rows
+        ]
@@ -1,13 +1,30 @@
 from __future__ import annotations
 
-from typing import Any, Iterable, List
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from fastapi import HTTPException
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.repositories.review_repo import ReviewRepository
+from app.repositories.review_repo import BookNotFoundError, ReviewRepository
 from app.repositories.book_repo import BookRepository
-from app.schemas.review import ReviewUpsertRequest, ReviewRead
+from app.core.config import settings
+from app.core.etag import make_etag
+from app.core.pagination import decode_cursor, encode_cursor
+from app.core.write_behind import WriteBehindBuffer
+from app.db.session import AsyncSessionLocal
+from app.schemas.review import (
+    ReviewBatchItem,
+    ReviewBatchItemResult,
+    ReviewBatchResult,
+    ReviewPage,
+    ReviewRead,
+    ReviewSort,
+    ReviewUpsertRequest,
+)
 
 
 class ReviewService:
@@ -28,37 +45,216 @@ class ReviewService:
     ) -> ReviewRead:
         """
         Create or update a review for a given book and user.
-        - 404 if the book does not exist (kept identical).
+        - 404 if the book does not exist, detected by the write itself (the
+          reviews -> books foreign key), not by a separate lookup.
+        - With REVIEW_WRITE_BEHIND the write joins the next group commit of
+          the process-wide buffer; this returns once that batch committed.
         """
-        await self._ensure_book_exists(book_id)
-
-        saved = await self._save_review(
-            book_id=book_id,
-            username=username,
-            rating=data.rating,
-            review_text=data.review_text,
-        )
+        if settings.REVIEW_WRITE_BEHIND:
+            return await self._submit_buffered(
+                book_id=book_id, username=username, data=data
+            )
+        try:
+            saved = await self._save_review(
+                book_id=book_id,
+                username=username,
+                rating=data.rating,
+                review_text=data.review_text,
+            )
+        except BookNotFoundError:
+            self._raise_book_not_found()
         return self._to_review_read(saved)
 
+    async def upsert_batch(
+        self, *, username: str, records: Sequence[Any]
+    ) -> ReviewBatchResult:
+        """
+        Create or update many of the user's reviews in one call, reporting
+        a status per item (by its position in `records`).
+        - Every item is validated up front; invalid ones are reported and
+          do not stop the rest. A missing review_text is stored as "".
+        - A book reviewed more than once keeps its last item; the earlier
+          ones are "superseded" (last write wins).
+        - The referenced books are checked with one IN query, and the rest
+          is written in chunked multi-row upserts (aggregates and caches are
+          updated once per affected book, not once per review).
+        - 409 if a book vanished between the check and the write; retrying
+          the batch is safe (upserts are idempotent).
+        """
+        results: List[Optional[ReviewBatchItemResult]] = [None] * len(records)
+        latest: Dict[int, Tuple[int, ReviewBatchItem]] = {}
+        superseded: Dict[int, List[int]] = defaultdict(list)
+        for index, record in enumerate(records):
+            try:
+                item = ReviewBatchItem.model_validate(record)
+            except ValidationError as exc:
+                results[index] = ReviewBatchItemResult(
+                    index=index, status="invalid", error=self._validation_message(exc)
+                )
+                continue
+            if item.book_id in latest:
+                superseded[item.book_id].append(latest[item.book_id][0])
+            latest[item.book_id] = (index, item)
+
+        existing = await self.books.existing_ids(latest)
+        rows = [
+            {
+                "book_id": book_id,
+                "rating": item.rating,
+                "review_text": item.review_text or "",
+            }
+            for book_id, (_, item) in sorted(latest.items())
+            if book_id in existing
+        ]
+        try:
+            written = await self.reviews.upsert_many(rows=rows, username=username)
+        except BookNotFoundError as exc:
+            raise HTTPException(
+                status_code=409, detail="Books changed during the batch; retry it"
+            ) from exc
+
+        for book_id, (index, _) in latest.items():
+            if book_id not in existing:
+                for i in (*superseded[book_id], index):
+                    results[i] = ReviewBatchItemResult(
+                        index=i, status="book_not_found", book_id=book_id
+                    )
+                continue
+            review_id, created = written[(book_id, username)]
+            results[index] = ReviewBatchItemResult(
+                index=index,
+                status="created" if created else "updated",
+                book_id=book_id,
+                review_id=review_id,
+            )
+            for i in superseded[book_id]:
+                results[i] = ReviewBatchItemResult(
+                    index=i, status="superseded", book_id=book_id, review_id=review_id
+                )
+        return self._batch_result(results)
+
     async def list_for_book(self, *, book_id: int) -> list[ReviewRead]:
         """
         List all reviews for a given book.
         - 404 if the book does not exist (kept identical).
         """
-        await self._ensure_book_exists(book_id)
+        page = await self.list_for_book_page(book_id=book_id)
+        return page.items
 
-        rows = await self.reviews.for_book(book_id)
-        return self._to_review_reads(rows)
+    async def list_for_book_page(
+        self,
+        *,
+        book_id: int,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        sort: ReviewSort = "newest",
+    ) -> ReviewPage:
+        """
+        List reviews for a book one keyset page at a time, newest (or
+        oldest) first.
+        - 404 if the book does not exist.
+        - `next_cursor` is set only when `limit` is given and the page is full.
+        - `total` is the book's stored rating count (one review = one rating),
+          so no COUNT(*) runs over the reviews.
+        """
+        total = await self.books.rating_count(book_id)
+        if total is None:
+            self._raise_book_not_found()
+
+        after = self._decode_review_cursor(cursor, sort) if cursor else None
+        rows = await self.reviews.for_book(
+            book_id, limit=limit, after=after, newest_first=sort == "newest"
+        )
+        return ReviewPage(
+            items=[self._row_to_review_read(row) for row in rows],
+            next_cursor=self._next_review_cursor(rows, limit, sort),
+            total=total,
+        )
+
+    async def listing_etag(
+        self,
+        *,
+        book_id: int,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+        sort: ReviewSort = "newest",
+    ) -> str:
+        """
+        ETag of a reviews page: the book's version (bumped by every review
+        write) plus the request parameters. 404 if the book does not exist.
+        """
+        version = await self.books.versions.book(book_id)
+        if version is None:
+            self._raise_book_not_found()
+        return make_etag("r", version, book_id, limit, cursor, sort)
 
     # -------------------------------------------------------------------------
     # Internal helpers
     # -------------------------------------------------------------------------
-    async def _ensure_book_exists(self, book_id: int) -> None:
+    async def _submit_buffered(
+        self, *, book_id: int, username: str, data: ReviewUpsertRequest
+    ) -> ReviewRead:
+        """Hand the write to the write-behind buffer and wait for its commit."""
+        row = {
+            "book_id": book_id,
+            "username": username,
+            "rating": data.rating,
+            "review_text": data.review_text,
+        }
+        try:
+            return await get_review_write_buffer().submit((book_id, username), row)
+        except BookNotFoundError:
+            self._raise_book_not_found()
+
+    @staticmethod
+    def _decode_review_cursor(cursor: str, sort: ReviewSort) -> Tuple[datetime, int]:
         """
-        Validate that the target book exists; raise the same 404 as original.
+        Turn a client cursor into a (created_at, id) seek key; 400 if malformed
+        or issued for the other sort order. Two-key cursors predate `sort`
+        and are newest-first.
         """
-        if not await self.books.get(book_id):
-            self._raise_book_not_found()
+        try:
+            values = decode_cursor(cursor)
+            if len(values) == 2:
+                values.append("newest")
+            created_at, review_id, cursor_sort = values
+            if cursor_sort != sort:
+                raise ValueError("Cursor belongs to another sort order")
+            return datetime.fromisoformat(created_at), int(review_id)
+        except (TypeError, ValueError) as exc:
+            raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+    @staticmethod
+    def _next_review_cursor(
+        rows: List[Any], limit: Optional[int], sort: ReviewSort
+    ) -> Optional[str]:
+        """Encode the last row's (created_at, id) when a limited page came back full."""
+        if limit is None or len(rows) < limit:
+            return None
+        last = rows[-1]
+        return encode_cursor(last.created_at.isoformat(), last.id, sort)
+
+    @staticmethod
+    def _validation_message(exc: ValidationError) -> str:
+        """One line per failed field, e.g. "rating: Input should be ..."."""
+        return "; ".join(
+            f"{'.'.join(str(part) for part in err['loc']) or 'item'}: {err['msg']}"
+            for err in exc.errors()
+        )
+
+    @staticmethod
+    def _batch_result(
+        results: List[Optional[ReviewBatchItemResult]],
+    ) -> ReviewBatchResult:
+        """Wrap the per-item results with their status counts."""
+        items = [r for r in results if r is not None]
+        statuses = Counter(r.status for r in items)
+        return ReviewBatchResult(
+            items=items,
+            created=statuses["created"],
+            updated=statuses["updated"],
+            failed=statuses["invalid"] + statuses["book_not_found"],
+        )
 
     @staticmethod
     def _raise_book_not_found() -> None:
@@ -81,6 +277,81 @@ class ReviewService:
         """Map a single row/object to `ReviewRead` exactly as before."""
         return ReviewRead.model_validate(row)
 
-    def _to_review_reads(self, rows: Iterable[Any]) -> List[ReviewRead]:
-        """Map an iterable of rows/objects to a list of `ReviewRead`."""
-        return [self._to_review_read(x) for x in rows]
+    @staticmethod
+    def _row_to_review_read(row: Any) -> ReviewRead:
+        """
+        Build `ReviewRead` from a projected listing row without re-validating:
+        the values come straight from typed DB columns.
+        """
+        return ReviewRead.model_construct(
+            id=row.id,
+            book_id=row.book_id,
+            username=row.username,
+            rating=row.rating,
+            review_text=row.review_text,
+        )
+
+
+# -----------------------------------------------------------------------------
+# Write-behind (group commit) of single review upserts
+# -----------------------------------------------------------------------------
+ReviewKey = Tuple[int, str]  # (book_id, username)
+
+_review_write_buffer: Optional[
+    WriteBehindBuffer[ReviewKey, Dict[str, Any], ReviewRead]
+] = None
+
+
+def get_review_write_buffer() -> WriteBehindBuffer[
+    ReviewKey, Dict[str, Any], ReviewRead
+]:
+    """The process-wide buffer behind REVIEW_WRITE_BEHIND, created on first use."""
+    global _review_write_buffer
+    if _review_write_buffer is None:
+        _review_write_buffer = WriteBehindBuffer(
+            "reviews",
+            _flush_review_writes,
+            max_items=settings.REVIEW_WRITE_BEHIND_MAX_ITEMS,
+            interval_seconds=settings.REVIEW_WRITE_BEHIND_INTERVAL_MS / 1000,
+        )
+    return _review_write_buffer
+
+
+async def close_review_write_buffer() -> None:
+    """Commit the writes still buffered (on shutdown) and drop the buffer."""
+    global _review_write_buffer
+    if _review_write_buffer is not None:
+        await _review_write_buffer.close()
+        _review_write_buffer = None
+
+
+async def _flush_review_writes(
+    batch: Dict[ReviewKey, Dict[str, Any]],
+) -> Dict[ReviewKey, Any]:
+    """
+    Write one buffered batch in a single transaction (ReviewRepository.
+    upsert_many, keys in sorted order). A write the database rejects, e.g.
+    for an unknown book, would fail the whole batch, so then the batch is
+    retried one write per transaction and only the bad ones fail.
+    """
+    async with AsyncSessionLocal() as session:
+        repo = ReviewRepository(session)
+        try:
+            written = await repo.upsert_many(
+                rows=[batch[key] for key in sorted(batch)], chunk_size=len(batch)
+            )
+        except (BookNotFoundError, IntegrityError):
+            return await _write_one_by_one(repo, batch)
+    return {key: ReviewRead(id=written[key][0], **row) for key, row in batch.items()}
+
+
+async def _write_one_by_one(
+    repo: ReviewRepository, batch: Dict[ReviewKey, Dict[str, Any]]
+) -> Dict[ReviewKey, Any]:
+    results: Dict[ReviewKey, Any] = {}
+    for key in sorted(batch):
+        try:
+            results[key] = ReviewRead.model_validate(await repo.upsert(**batch[key]))
+        except (BookNotFoundError, IntegrityError) as e:
+            results[key] = e
+    return results
@@ -1,7 +1,8 @@
-import asyncio
 from app.core.config import settings
+from app.clients.http import shared_http_client_scope
 from app.db.session import AsyncSessionLocal
 from app.services.book_service import BookService
+from app.task.runner import run_task
 from celery import shared_task
 from app.core.logging import setup_logger
 
@@ -9,12 +10,12 @@ logger = setup_logger(__name__)
 
 
 @shared_task(name="app.task.books.refresh_books")
-def refresh_books(query: str = settings.GOOGLE_BOOKS_DEFAULT_QUERY, limit: int = settings.GOOGLE_BOOKS_MAX_RESULTS) -> int:
+def refresh_books(query: str = settings.GOOGLE_BOOKS_DEFAULT_QUERY, limit: int = settings.GOOGLE_BOOKS_MAX_RESULTS) -> dict:
     if not settings.GOOGLE_BOOKS_ENABLED:
-        return 0
+        return {"ok": False, "query": query, "limit": limit}
 
-    async def _run() -> int:
-        async with AsyncSessionLocal() as session:
+    async def _run() -> dict:
+        async with shared_http_client_scope(), AsyncSessionLocal() as session:
             book_service = BookService(session)
             ok = await book_service.seed_from_google(
                 query, limit
@@ -26,7 +27,7 @@ def refresh_books(query: str = settings.GOOGLE_BOOKS_DEFAULT_QUERY, limit: int =
             }
 
     try:
-        result = asyncio.run(_run())
+        result = run_task("refresh_books", _run())
         logger.info("refresh_books finished: %s", result)
         return result
     except Exception as e:
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from celery import chord, group, shared_task
+
+from app.clients.http import shared_http_client_scope
+from app.core.config import settings
+from app.core.logging import setup_logger
+from app.db.session import AsyncSessionLocal
+from app.services.book_service import BookService, CatalogSyncResult
+from app.task.runner import run_task
+
+logger = setup_logger(__name__)
+
+
+def load_sync_queries() -> List[str]:
+    """
+    Queries from CATALOG_SYNC_QUERIES plus CATALOG_SYNC_QUERIES_FILE (one per
+    line; blank lines and '#' comments ignored), de-duplicated in order.
+    """
+    queries: List[str] = list(settings.CATALOG_SYNC_QUERIES)
+    if settings.CATALOG_SYNC_QUERIES_FILE:
+        with Path(settings.CATALOG_SYNC_QUERIES_FILE).open(encoding="utf-8") as f:
+            queries.extend(f)
+    cleaned = (q.strip() for q in queries)
+    return list(dict.fromkeys(q for q in cleaned if q and not q.startswith("#")))
+
+
+def _chunked(queries: List[str], size: int) -> Iterable[List[str]]:
+    for start in range(0, len(queries), size):
+        yield queries[start : start + size]
+
+
+def catalog_sync_workflow(
+    queries: List[str],
+    *,
+    limit: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+):
+    """
+    Celery chord: one `sync_catalog_chunk` per `chunk_size` queries, run in
+    parallel across workers, then `summarize_catalog_sync` over their results.
+    """
+    limit = limit or settings.GOOGLE_BOOKS_MAX_RESULTS
+    size = max(1, chunk_size or settings.CATALOG_SYNC_CHUNK_SIZE)
+    header = group(
+        sync_catalog_chunk.s(chunk, limit) for chunk in _chunked(queries, size)
+    )
+    return chord(header, summarize_catalog_sync.s())
+
+
+@shared_task(name="app.task.catalog.sync_catalog")
+def sync_catalog(
+    queries: Optional[List[str]] = None, limit: Optional[int] = None
+) -> dict:
+    """Fan out a catalog sync over the configured (or given) queries."""
+    if not settings.GOOGLE_BOOKS_ENABLED:
+        return {"ok": False, "queries": 0}
+    queries = queries if queries is not None else load_sync_queries()
+    if not queries:
+        logger.info("sync_catalog: no queries configured, nothing to do")
+        return {"ok": True, "queries": 0}
+
+    result = catalog_sync_workflow(queries, limit=limit).apply_async()
+    logger.info(
+        "sync_catalog dispatched %d queries (chord %s)", len(queries), result.id
+    )
+    return {"ok": True, "queries": len(queries), "chord_id": result.id}
+
+
+@shared_task(name="app.task.catalog.sync_catalog_chunk")
+def sync_catalog_chunk(queries: List[str], limit: int) -> dict:
+    """Fetch one chunk of queries concurrently and ingest their de-duplicated union."""
+
+    async def _run() -> CatalogSyncResult:
+        async with shared_http_client_scope(), AsyncSessionLocal() as session:
+            return await BookService(session).sync_catalog(
+                queries, limit=limit, concurrency=settings.CATALOG_SYNC_CONCURRENCY
+            )
+
+    result = run_task("sync_catalog_chunk", _run())
+    logger.info("sync_catalog_chunk finished: %s", result)
+    return result.as_dict()
+
+
+@shared_task(name="app.task.catalog.summarize_catalog_sync")
+def summarize_catalog_sync(chunk_results: List[dict]) -> dict:
+    """Aggregate the per-chunk counts of one catalog sync."""
+    total = CatalogSyncResult()
+    for chunk in chunk_results:
+        total.merge(CatalogSyncResult(**chunk))
+    summary = {"chunks": len(chunk_results), **total.as_dict()}
+    logger.info("Catalog sync finished: %s", summary)
+    return summary
@@ -0,0 +1,29 @@
+from app.db.session import AsyncSessionLocal
+from app.repositories.book_repo import BookRepository
+from app.task.runner import run_task
+from celery import shared_task
+from app.core.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+
+async def rebuild_rating_aggregates_async() -> int:
+    """Recompute stored per-book rating aggregates from the reviews table."""
+    async with AsyncSessionLocal() as session:
+        return await BookRepository(session).rebuild_rating_aggregates()
+
+
+@shared_task(name="app.task.ratings.rebuild_rating_aggregates")
+def rebuild_rating_aggregates() -> dict:
+    try:
+        fixed = run_task("rebuild_rating_aggregates", rebuild_rating_aggregates_async())
+        logger.info("rebuild_rating_aggregates finished: %s books updated", fixed)
+        return {"ok": True, "updated": fixed}
+    except Exception as e:
+        logger.exception("rebuild_rating_aggregates failed")
+        return {"ok": False, "error": str(e)}
+
+
+if __name__ == "__main__":
+    # Backfill / reconcile from the command line: `python -m app.task.ratings`
+    print(rebuild_rating_aggregates())
@@ -0,0 +1,80 @@
+import sys
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.recommendation_service import (
+    RecommendationService,
+    RecommenderUpdateResult,
+)
+from app.task.runner import run_task
+from celery import shared_task
+from app.core.logging import setup_logger
+
+logger = setup_logger(__name__)
+
+
+async def build_recommendations_async() -> dict:
+    """Rebuild the item-item similarity and per-user recommendation tables."""
+    async with AsyncSessionLocal() as session:
+        result = await RecommendationService(session).build()
+        return result.as_dict()
+
+
+@shared_task(name="app.task.recommendations.build_recommendations")
+def build_recommendations() -> dict:
+    try:
+        summary = run_task("build_recommendations", build_recommendations_async())
+        return {"ok": True, **summary}
+    except Exception as e:
+        logger.exception("build_recommendations failed")
+        return {"ok": False, "error": str(e)}
+
+
+async def apply_review_events_async() -> dict:
+    """Drain the review event queue in batches (bounded per run)."""
+    total = RecommenderUpdateResult()
+    for _ in range(settings.RECOMMENDER_EVENTS_MAX_BATCHES):
+        async with AsyncSessionLocal() as session:
+            batch = await RecommendationService(session).apply_review_events(
+                limit=settings.RECOMMENDER_EVENTS_BATCH_SIZE
+            )
+        total.merge(batch)
+        if batch.events < settings.RECOMMENDER_EVENTS_BATCH_SIZE:
+            break
+    return total.as_dict()
+
+
+@shared_task(name="app.task.recommendations.apply_review_events")
+def apply_review_events() -> dict:
+    if not settings.RECOMMENDER_INCREMENTAL:
+        return {"ok": True, "events": 0}
+    try:
+        summary = run_task("apply_review_events", apply_review_events_async())
+        return {"ok": True, **summary}
+    except Exception as e:
+        logger.exception("apply_review_events failed")
+        return {"ok": False, "error": str(e)}
+
+
+async def build_content_index_async() -> dict:
+    async with AsyncSessionLocal() as session:
+        return await RecommendationService(session).build_content_index()
+
+
+@shared_task(name="app.task.recommendations.build_content_index")
+def build_content_index() -> dict:
+    """Rebuild the content-based index, refitting IDF over the whole catalog."""
+    try:
+        summary = run_task("build_content_index", build_content_index_async())
+        return {"ok": True, **summary}
+    except Exception as e:
+        logger.exception("build_content_index failed")
+        return {"ok": False, "error": str(e)}
+
+
+if __name__ == "__main__":
+    # Build from the command line: `python -m app.task.recommendations [content]`
+    if sys.argv[1:] == ["content"]:
+        print(build_content_index())
+    else:
+        print(build_recommendations())
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import threading
+import time
+from typing import Awaitable, Optional, TypeVar
+
+from app.clients.http import close_shared_http_client, open_shared_http_client
+from app.core.logging import setup_logger
+from app.core.metrics import metrics
+from app.db import session as db_session
+
+logger = setup_logger(__name__)
+
+T = TypeVar("T")
+
+
+class AsyncTaskRunner:
+    """
+    One long-lived event loop per worker process, running on a daemon thread.
+
+    Celery tasks are synchronous; they hand their coroutine to `run()`, which
+    blocks until it completes on the shared loop. Because the loop outlives
+    individual tasks, pooled DB connections and the keep-alive HTTP client
+    (both bound to the loop that opened them) are reused across tasks instead
+    of being rebuilt by a fresh `asyncio.run()` each time. Works with the
+    prefork, threads and solo pools alike.
+    """
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None and self._pid == os.getpid()
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        """Start the loop thread if needed (idempotent, fork-aware)."""
+        with self._lock:
+            if not self.running:
+                # A loop inherited across fork has no thread behind it: replace it.
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever, name="celery-async-runner", daemon=True
+                )
+                thread.start()
+                self._loop, self._thread, self._pid = loop, thread, os.getpid()
+            return self._loop
+
+    def run(self, coro: Awaitable[T]) -> T:
+        """Run a coroutine on the worker loop and return its result."""
+        loop = self.start()
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def stop(self) -> None:
+        with self._lock:
+            if not self.running:
+                return
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = self._pid = None
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=5)
+        loop.close()
+
+
+runner = AsyncTaskRunner()
+
+
+def run_task(name: str, coro: Awaitable[T]) -> T:
+    """
+    Run a task coroutine on the worker loop, timing it end to end.
+    Durations land in the `task.<name>.seconds` histogram and the log.
+    """
+    t0 = time.perf_counter()
+    try:
+        return runner.run(coro)
+    finally:
+        elapsed = time.perf_counter() - t0
+        metrics.histogram(f"task.{name}.seconds").observe(elapsed)
+        logger.info("task %s took duration_ms=%.1f", name, elapsed * 1000)
+
+
+def init_worker_process() -> None:
+    """
+    Per-worker-process setup: drop DB connections inherited from the parent
+    (a pool must not be shared across fork), start the loop and open the
+    pooled HTTP client on it.
+    """
+    db_session.get_engine().sync_engine.dispose(close=False)
+    runner.run(open_shared_http_client())
+    logger.info("Async task runner started in worker pid=%s", os.getpid())
+
+
+def shutdown_worker_process() -> None:
+    """Close the HTTP client and DB pool on the worker loop, then stop it."""
+    if not runner.running:
+        return
+
+    async def _dispose() -> None:
+        await close_shared_http_client()
+        await db_session.get_engine().dispose()
+
+    try:
+        runner.run(_dispose())
+    finally:
+        runner.stop()
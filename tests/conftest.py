@@ -6,9 +6,13 @@ from sqlalchemy import text
 
 # 1) force SQLite-in-memory for tests BEFORE importing app modules
 os.environ["DATABASE_URL"] = "sqlite+aiosqlite:///:memory:"
+os.environ["GOOGLE_BOOKS_CACHE_DIR"] = ""  # no on-disk response cache in tests
+os.environ["CONTENT_INDEX_DIR"] = ""  # tests that need the index point it at tmp_path
 
+from app.core.cache import get_book_list_cache
 from app.db import session as db_session  # import module (not names)
 from app.db.base import Base
+from app.models import book, recommendation, review, user  # noqa: F401  register all tables
 
 
 # single event loop for the whole session
@@ -19,10 +23,11 @@ def event_loop():
     loop.close()
 
 
-# 2) switch engine to sqlite memory and create schema once, on a dedicated conn
+# 2) DATABASE_URL is already sqlite memory at import time, so the engine that
+#    modules imported by name (AsyncSessionLocal, engine) is the one to set up;
+#    create schema once, on a dedicated conn
 @pytest_asyncio.fixture(scope="session", autouse=True)
 async def use_sqlite_memory():
-    db_session.override_database(os.environ["DATABASE_URL"])
     async with db_session.engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
     yield
@@ -34,9 +39,19 @@ async def use_sqlite_memory():
 async def clean_db():
     async with db_session.engine.begin() as conn:
         # order because of FK reviews->books
+        await conn.execute(text("DELETE FROM book_similarities;"))
+        await conn.execute(text("DELETE FROM user_recommendations;"))
+        await conn.execute(text("DELETE FROM book_pair_stats;"))
+        await conn.execute(text("DELETE FROM book_norms;"))
+        await conn.execute(text("DELETE FROM review_events;"))
         await conn.execute(text("DELETE FROM reviews;"))
         await conn.execute(text("DELETE FROM books;"))
         await conn.execute(text("DELETE FROM users;"))
+        await conn.execute(text("DELETE FROM catalog_versions;"))
+    # Rows deleted behind the repositories' back leave cached pages behind.
+    cache = get_book_list_cache()
+    if cache is not None:
+        await cache.clear()
     yield
 
 
@@ -61,3 +61,74 @@ async def test_login_wrong_password_raises_401():
 
         assert isinstance(excinfo.value, HTTPException)
         assert getattr(excinfo.value, "status_code", None) == 401
+
+
+@pytest.mark.asyncio
+async def test_bounded_pool_fails_fast_when_saturated():
+    import asyncio
+    import threading
+
+    from app.core.cpu_pool import BoundedExecutor, PoolSaturatedError
+    from app.core.metrics import metrics
+
+    pool = BoundedExecutor("test.pool", max_workers=1, max_queue=1)
+    release = threading.Event()
+    try:
+        running = asyncio.ensure_future(pool.run(release.wait))
+        queued = asyncio.ensure_future(pool.run(lambda: "queued"))
+        await asyncio.sleep(0.05)
+        assert metrics.gauge("test.pool.queue_depth").value == 1
+
+        with pytest.raises(PoolSaturatedError):
+            await pool.run(lambda: "rejected")
+        assert metrics.counter("test.pool.rejected").value == 1
+
+        release.set()
+        assert await running is True
+        assert await queued == "queued"
+        assert pool.pending == 0
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_login_returns_503_when_verify_pool_is_saturated(monkeypatch):
+    from app.core.cpu_pool import PoolSaturatedError
+    from app.repositories import user_repo
+
+    await _truncate_all()
+    async with AsyncSessionLocal() as s:
+        s.add(User(username="abdur", password=hash_password("password123")))
+        await s.commit()
+
+    async def saturated(plain, hashed):
+        raise PoolSaturatedError("busy")
+
+    monkeypatch.setattr(user_repo, "verify_password_async", saturated)
+    async with AsyncSessionLocal() as s:
+        with pytest.raises(HTTPException) as excinfo:
+            await AuthUseCases(s).login("abdur", "password123")
+    assert excinfo.value.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_metrics_require_a_token():
+    import httpx
+    from fastapi import FastAPI
+
+    from app.api.v1.router import api_router
+    from app.core.security import create_access_token
+
+    app = FastAPI()
+    app.include_router(api_router)
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://t"
+    ) as client:
+        # HTTPBearer answers 403 or 401 without a header, depending on FastAPI.
+        assert (await client.get("/metrics/")).status_code in (401, 403)
+        token = create_access_token("abdur")
+        res = await client.get(
+            "/metrics/", headers={"Authorization": f"Bearer {token}"}
+        )
+    assert res.status_code == 200 and isinstance(res.json(), dict)
@@ -0,0 +1,95 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import event
+
+from app.api.deps import get_current_username
+from app.api.v1.router import api_router
+from app.core.config import settings
+from app.db import session as db_session
+from app.db.session import AsyncSessionLocal
+from app.repositories.book_repo import BookRepository
+from app.repositories.review_repo import ReviewRepository
+from app.services.book_service import BookService
+
+
+def _client() -> httpx.AsyncClient:
+    app = FastAPI()
+    app.include_router(api_router)
+    app.dependency_overrides[get_current_username] = lambda: "tester"
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://t"
+    )
+
+
+async def _seed():
+    async with AsyncSessionLocal() as db:
+        books = BookRepository(db)
+        await books.ingest_books(
+            [{"title": t, "author": "A", "genre": "G"} for t in ("A", "B", "C")]
+        )
+        ids = [row["book"].id for row in await books.list_with_avg(limit=3)]
+        reviews = ReviewRepository(db)
+        await reviews.upsert(book_id=ids[1], username="u", rating=4, review_text="")
+        await reviews.upsert(book_id=ids[1], username="v", rating=2, review_text="")
+        return ids
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_keeps_order_and_reports_missing():
+    a, b, c = await _seed()
+    async with _client() as client:
+        res = await client.get("/books/batch", params={"ids": f"{c},999999,{b},{c}"})
+        assert res.status_code == 200
+        body = res.json()
+        assert [item["id"] for item in body["items"]] == [c, b, c]
+        assert [item["title"] for item in body["items"]] == ["C", "B", "C"]
+        assert body["items"][1]["average_rating"] == 3.0
+        assert body["items"][1]["review_count"] == 2
+        assert body["items"][0]["review_count"] == 0
+        assert body["missing"] == [999999]
+
+        # Repeated query parameters work too; the listing now carries ids.
+        res = await client.get(
+            "/books/batch", params=[("ids", str(a)), ("ids", str(b))]
+        )
+        assert [item["id"] for item in res.json()["items"]] == [a, b]
+        listing = await client.get("/books/", params={"limit": 3})
+        assert [item["id"] for item in listing.json()] == [a, b, c]
+
+        assert (
+            await client.get("/books/batch", params={"ids": "1,x"})
+        ).status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_batch_lookup_is_one_query_with_a_request_identity_cache(monkeypatch):
+    a, b, c = await _seed()
+    selects = []
+
+    def record(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects.append(statement)
+
+    sync_engine = db_session.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", record)
+    try:
+        async with AsyncSessionLocal() as db:
+            service = BookService(db)
+            first = await service.get_books([a, b, b, 424242])
+            assert len(selects) == 1 and " IN " in selects[0].upper()
+            # Already resolved in this request: served without a query.
+            again = await service.get_books([b, a, 424242])
+            assert len(selects) == 1
+            assert [s.id for s in again.items] == [b, a] and again.missing == [424242]
+            # Only the new id is fetched.
+            await service.get_books([a, c])
+            assert len(selects) == 2
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", record)
+    assert [s.id for s in first.items] == [a, b, b]
+
+    monkeypatch.setattr(settings, "BOOKS_BATCH_MAX_IDS", 2)
+    async with _client() as client:
+        res = await client.get("/books/batch", params={"ids": f"{a},{b},{c}"})
+        assert res.status_code == 400
@@ -0,0 +1,168 @@
+import fnmatch
+
+import pytest
+
+from app.core import cache as cache_module
+from app.core.cache import MemoryBackend, RedisBackend, TaggedCache, get_book_list_cache
+from app.core.metrics import metrics
+from app.db.session import AsyncSessionLocal
+from app.repositories.book_repo import BookRepository
+from app.repositories.review_repo import ReviewRepository
+from app.services.book_service import BookService
+
+
+class FakeRedis:
+    """The handful of redis.asyncio commands RedisBackend uses, in a dict."""
+
+    def __init__(self) -> None:
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def sadd(self, key, *members):
+        self.data.setdefault(key, set()).update(members)
+
+    async def expire(self, key, seconds):
+        return key in self.data
+
+    async def smembers(self, key):
+        return set(self.data.get(key, set()))
+
+    async def delete(self, *keys):
+        return sum(self.data.pop(key, None) is not None for key in keys)
+
+    async def scan_iter(self, match):
+        for key in list(self.data):
+            if fnmatch.fnmatch(key, match):
+                yield key
+
+    def pipeline(self, transaction=True):
+        return _FakePipeline(self)
+
+
+class _FakePipeline:
+    def __init__(self, redis: FakeRedis) -> None:
+        self.redis, self.calls = redis, []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+    async def execute(self):
+        return [await getattr(self.redis, n)(*a, **kw) for n, a, kw in self.calls]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("backend_name", ["memory", "redis"])
+async def test_backends_drop_entries_by_tag(backend_name):
+    backend = (
+        MemoryBackend(10) if backend_name == "memory" else RedisBackend(FakeRedis())
+    )
+    cache = TaggedCache(backend, name="test", ttl_seconds=30)
+    await cache.set("p1", b"one", tags=["books", "book:1", "book:2"])
+    await cache.set("p2", b"two", tags=["books", "book:3"])
+
+    assert await cache.get("p1") == b"one"
+    assert await cache.invalidate(["book:2"]) == 1
+    assert await cache.get("p1") is None
+    assert await cache.get("p2") == b"two"
+    assert await cache.invalidate(["books"]) == 1
+    assert await cache.get("p2") is None
+
+    # A fill that raced with an invalidation is not stored.
+    epoch = cache.epoch
+    await cache.invalidate(["book:9"])
+    await cache.set("p3", b"stale", tags=["books"], epoch=epoch)
+    assert await cache.get("p3") is None
+
+
+@pytest.mark.asyncio
+async def test_memory_backend_expires_and_evicts_lru():
+    now = [0.0]
+    backend = MemoryBackend(2, clock=lambda: now[0])
+    await backend.set("a", b"a", ttl=10, tags=["t"])
+    await backend.set("b", b"b", ttl=10, tags=["t"])
+    assert await backend.get("a") == b"a"  # "b" is now least recently used
+    await backend.set("c", b"c", ttl=10, tags=["t"])
+    assert await backend.get("b") is None
+    now[0] = 11
+    assert await backend.get("a") is None
+    assert len(backend) == 1 and await backend.invalidate_tags(["t"]) == 1
+
+
+@pytest.mark.asyncio
+async def test_book_listing_is_cached_until_the_catalog_changes():
+    cache = get_book_list_cache()
+    hits = metrics.counter("cache.books.hits")
+    async with AsyncSessionLocal() as db:
+        books = BookRepository(db)
+        await books.ingest_books(
+            [{"title": t, "author": "Author", "genre": "G"} for t in ("A", "B")]
+        )
+        svc = BookService(db)
+
+        async def page(offset):
+            return await svc.list_books(search=None, limit=1, offset=offset)
+
+        first, second = await page(0), await page(1)
+        before = hits.value
+        assert await page(0) == first and await page(1) == second
+        assert hits.value == before + 2
+        assert 0 < metrics.gauge("cache.books.hit_ratio").value <= 1
+
+        # A rating on B moves the catalog version: no page is served stale.
+        b_id = (await books.list_with_avg(search="B", limit=1))[0]["book"].id
+        await ReviewRepository(db).upsert(
+            book_id=b_id, username="u", rating=4, review_text=""
+        )
+        assert await page(0) == first
+        assert (await page(1))[0].average_rating == 4.0
+
+        # Same rating again changes nothing, so the page stays cached.
+        await ReviewRepository(db).upsert(
+            book_id=b_id, username="u", rating=4, review_text="edited"
+        )
+        before = hits.value
+        await page(1)
+        assert hits.value == before + 1
+
+        # A new book can shift every page.
+        await books.ingest_books([{"title": "0", "author": "Author", "genre": "G"}])
+        assert (await page(0))[0].title == "0"
+        assert cache is not None and cache.epoch > 0
+
+
+@pytest.mark.asyncio
+async def test_writes_from_another_process_are_never_served_stale(monkeypatch):
+    """
+    The write's invalidation lands in a second cache instance (another
+    worker's memory cache); this one must still stop serving its page.
+    """
+    async with AsyncSessionLocal() as db:
+        books = BookRepository(db)
+        await books.ingest_books([{"title": "A", "author": "X", "genre": "G"}])
+        book_id = (await books.list_with_avg(limit=1))[0]["book"].id
+        svc = BookService(db)
+        assert (await svc.list_books(search=None, limit=5, offset=0))[
+            0
+        ].average_rating is None
+
+        other_worker = TaggedCache(MemoryBackend(10), name="other", ttl_seconds=30)
+        with monkeypatch.context() as m:
+            m.setattr(cache_module, "_book_list_cache", other_worker)
+            await ReviewRepository(db).upsert(
+                book_id=book_id, username="u", rating=5, review_text=""
+            )
+        assert other_worker.epoch == 1  # the invalidation went elsewhere
+
+        page = await svc.list_books(search=None, limit=5, offset=0)
+        assert page[0].average_rating == 5.0
@@ -21,3 +21,170 @@ async def test_seed_and_search():
         )
         res = await BookService(db).list_books(search="T1", limit=10, offset=0)
         assert len(res) == 1 and res[0].title == "T1"
+
+
+@pytest.mark.asyncio
+async def test_cursor_pagination_walks_every_book_once():
+    async with AsyncSessionLocal() as db:
+        await BookRepository(db).seed_books(
+            [{"title": f"T{i}", "author": f"A{i}", "genre": "G"} for i in range(5)]
+            # duplicate title, different author: (title, id) breaks the tie
+            + [{"title": "T2", "author": "Other", "genre": "G"}]
+        )
+        svc = BookService(db)
+
+        seen, cursor = [], None
+        for _ in range(10):  # bounded: a broken cursor must not hang the suite
+            page = await svc.list_books_page(search=None, limit=2, cursor=cursor)
+            seen += [(b.title, b.author) for b in page.items]
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        offset_mode = await svc.list_books(search=None, limit=10, offset=0)
+        assert seen == [(b.title, b.author) for b in offset_mode]
+        assert len(seen) == 6
+
+
+@pytest.mark.asyncio
+async def test_invalid_cursor_is_rejected():
+    from fastapi import HTTPException
+
+    async with AsyncSessionLocal() as db:
+        with pytest.raises(HTTPException) as excinfo:
+            await BookService(db).list_books_page(search=None, limit=2, cursor="!!")
+        assert excinfo.value.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_search_uses_index_and_ranks_by_relevance():
+    async with AsyncSessionLocal() as db:
+        repo = BookRepository(db)
+        assert repo.search.ranked  # SQLite test DB -> FTS5 backend
+        await repo.seed_books(
+            [
+                {
+                    "title": "A Python cookbook for many other animals",
+                    "author": "X",
+                    "genre": "G",
+                },
+                {"title": "Python", "author": "Y", "genre": "G"},
+                {
+                    "title": "The Pragmatic Programmer",
+                    "author": "Andrew Hunt",
+                    "genre": "G",
+                },
+            ]
+        )
+        svc = BookService(db)
+
+        ranked = await svc.list_books(search="python", limit=10, offset=0)
+        assert [b.title for b in ranked] == [
+            "Python",
+            "A Python cookbook for many other animals",
+        ]
+
+        # word prefixes, any order, across title and author
+        res = await svc.list_books(search="hunt prag", limit=10, offset=0)
+        assert [b.title for b in res] == ["The Pragmatic Programmer"]
+
+        page = await svc.list_books_page(search="python", limit=1)
+        nxt = await svc.list_books_page(
+            search="python", limit=1, cursor=page.next_cursor
+        )
+        assert [b.title for b in nxt.items] == [
+            "A Python cookbook for many other animals"
+        ]
+
+
+@pytest.mark.asyncio
+async def test_ingest_books_reports_exact_counts():
+    async with AsyncSessionLocal() as db:
+        repo = BookRepository(db)
+        first = await repo.ingest_books(
+            [
+                {"title": "T1", "author": "A1", "genre": "G"},
+                {"title": "T2", "author": "A2", "genre": "G", "extra": "ignored"},
+                {"title": "T1", "author": "A1", "genre": "G"},  # dup within input
+                {"title": "T3", "author": "A3"},  # missing genre
+            ],
+            chunk_size=2,
+        )
+        assert (first.inserted, first.skipped, first.invalid) == (2, 1, 1)
+        assert len(first.inserted_ids) == 2
+
+        second = await repo.ingest_books(
+            [
+                {"title": "T1", "author": "A1", "genre": "G"},
+                {"title": "T4", "author": "A4", "genre": "G"},
+            ]
+        )
+        assert (second.inserted, second.skipped) == (1, 1)
+
+        books = await BookService(db).list_books(search=None, limit=10, offset=0)
+        assert [b.title for b in books] == ["T1", "T2", "T4"]
+
+
+@pytest.mark.asyncio
+async def test_sync_books_writes_only_new_and_changed_rows():
+    from datetime import datetime, timedelta
+
+    from sqlalchemy import event, select
+
+    from app.db.session import engine
+    from app.models.book import Book
+
+    async with AsyncSessionLocal() as db:
+        repo = BookRepository(db)
+        t0 = datetime(2026, 1, 1)
+        first = await repo.sync_books(
+            [
+                {"title": "T1", "author": "A1", "genre": "G"},
+                {"title": "T2", "author": "A2", "genre": "G"},
+                {"title": "T3", "author": "A3", "genre": "G"},
+            ],
+            seen_at=t0,
+        )
+        assert (first.inserted, first.updated, first.unchanged) == (3, 0, 0)
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement.split()[0].upper())
+
+        event.listen(engine.sync_engine, "before_cursor_execute", record)
+        try:
+            t1 = t0 + timedelta(days=40)
+            second = await repo.sync_books(
+                [
+                    {"title": "T1", "author": "A1", "genre": "G"},  # unchanged
+                    {"title": "T2", "author": "A2", "genre": "Fiction"},  # changed
+                    {"title": "T4", "author": "A4", "genre": "G"},  # new
+                    {"title": "T4", "author": "A4", "genre": "G"},  # dup in input
+                    {"title": "T5", "author": "A5"},  # invalid
+                ],
+                seen_at=t1,
+            )
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", record)
+
+        ids = dict((await db.execute(select(Book.title, Book.id))).all())
+        assert second.inserted_ids == [ids["T4"]]
+        assert second.updated_ids == [ids["T2"]]
+        assert (second.unchanged, second.duplicates, second.invalid) == (1, 1, 1)
+        assert sorted(second.affected_ids) == sorted([ids["T2"], ids["T4"]])
+        # One lookup, one insert, one bulk update, one last_seen bump.
+        assert statements.count("SELECT") == 1
+        assert statements.count("UPDATE") == 2
+        # T3 was last seen 40 days before this sync.
+        assert await repo.report_stale(t1) == 1
+
+        rows = {
+            b.title: b
+            for b in (
+                await db.execute(select(Book).execution_options(populate_existing=True))
+            ).scalars()
+        }
+        assert rows["T2"].genre == "Fiction"
+        assert rows["T1"].last_seen_at == t1
+        assert rows["T3"].last_seen_at == t0
@@ -0,0 +1,88 @@
+import httpx
+import pytest
+from sqlalchemy import func, select
+
+from app.celery_app import celery_app
+from app.clients import http
+from app.db.session import AsyncSessionLocal
+from app.models.book import Book
+from app.task import runner
+from app.task.catalog import catalog_sync_workflow, load_sync_queries, sync_catalog
+
+
+def _handler(calls):
+    def handler(request: httpx.Request) -> httpx.Response:
+        q = request.url.params["q"]
+        calls.append(q)
+        if q == "boom":
+            return httpx.Response(500)
+        titles = [f"Shared {j}" for j in range(3)] + [f"{q} only"]
+        return httpx.Response(
+            200,
+            json={
+                "totalItems": len(titles),
+                "items": [
+                    {"volumeInfo": {"title": t, "authors": ["A"]}} for t in titles
+                ],
+            },
+        )
+
+    return handler
+
+
+@pytest.fixture
+def eager_worker():
+    """Run Celery tasks inline, on the worker loop, against a mocked Google API."""
+    calls = []
+    celery_app.conf.update(task_always_eager=True, task_eager_propagates=True)
+    runner.runner.run(
+        http.open_shared_http_client(transport=httpx.MockTransport(_handler(calls)))
+    )
+    try:
+        yield calls
+    finally:
+        runner.runner.run(http.close_shared_http_client())
+        runner.runner.stop()
+        celery_app.conf.update(task_always_eager=False, task_eager_propagates=False)
+
+
+@pytest.mark.asyncio
+async def test_catalog_sync_fans_out_and_aggregates(eager_worker):
+    queries = [f"q{i}" for i in range(5)] + ["boom"]
+
+    summary = catalog_sync_workflow(queries, limit=10, chunk_size=2).apply_async().get()
+
+    assert sorted(eager_worker) == sorted(queries)
+    assert summary == {
+        "chunks": 3,
+        "queries": 6,
+        "failed_queries": 1,
+        "fetched": 20,
+        "unique": 14,  # de-duplicated within each chunk before the DB
+        "inserted": 8,  # 3 shared titles + one per good query
+        "updated": 0,
+        "unchanged": 6,  # shared titles already inserted by an earlier chunk
+        "invalid": 0,
+    }
+    async with AsyncSessionLocal() as db:
+        assert await db.scalar(select(func.count()).select_from(Book)) == 8
+
+
+def test_sync_queries_come_from_settings_and_file(tmp_path, monkeypatch):
+    from app.core.config import settings
+
+    path = tmp_path / "queries.txt"
+    path.write_text("# fiction\nDune\n\nrust programming\nDune\n", encoding="utf-8")
+    monkeypatch.setattr(settings, "CATALOG_SYNC_QUERIES", ["python", "Dune"])
+    monkeypatch.setattr(settings, "CATALOG_SYNC_QUERIES_FILE", str(path))
+
+    assert load_sync_queries() == ["python", "Dune", "rust programming"]
+
+
+def test_sync_catalog_without_queries_is_a_no_op(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "CATALOG_SYNC_QUERIES", [])
+    monkeypatch.setattr(settings, "CATALOG_SYNC_QUERIES_FILE", "")
+
+    assert sync_catalog() == {"ok": True, "queries": 0}
@@ -0,0 +1,109 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from fastapi import HTTPException
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.repositories.book_repo import BookRepository
+from app.services.content_index import ContentIndex
+from app.services.recommendation_service import RecommendationService
+
+BOOKS = [
+    (1, "Fluent Python", "Luciano Ramalho", "Programming"),
+    (2, "Python Crash Course", "Eric Matthes", "Programming"),
+    (3, "Learning Python", "Mark Lutz", "Programming"),
+    (4, "Programming Python", "Mark Lutz", "Programming"),
+    (5, "The Hobbit", "J.R.R. Tolkien", "Fantasy"),
+    (6, "The Silmarillion", "J.R.R. Tolkien", "Fantasy"),
+    (7, "Dune", "Frank Herbert", "Science Fiction"),
+]
+
+
+def test_related_ranks_shared_author_and_title_words(tmp_path):
+    index = ContentIndex(tmp_path, dim=1 << 12)
+    assert index.related(BOOKS[0], 3) == []  # nothing built yet
+    index.build(BOOKS)
+
+    related = index.related(BOOKS[2], 3)
+    assert related[0][0] == 4  # same author, same genre, shared title word
+    assert {book_id for book_id, _ in related} <= {1, 2, 4}
+    assert all(0 < score <= 1 for _, score in related)
+    assert [b for b, _ in index.related(BOOKS[4], 5)] == [6]  # no overlap with others
+
+    # Blocked scan gives the same answer as a single block.
+    blocked = ContentIndex(tmp_path, dim=1 << 12, block_rows=2)
+    assert blocked.related(BOOKS[2], 3) == related
+
+
+def test_append_adds_and_supersedes_rows(tmp_path):
+    assert ContentIndex(tmp_path).append(BOOKS[:1]) is None  # no index to append to
+    index = ContentIndex(tmp_path, dim=1 << 12)
+    index.build(BOOKS)
+    reader = ContentIndex(tmp_path)  # separate reader, like another process
+    assert [b for b, _ in reader.related(BOOKS[6], 3)] == []
+
+    meta = index.append(
+        [
+            (8, "Children of Dune", "Frank Herbert", "Science Fiction"),
+            (5, "Dune Messiah", "Frank Herbert", "Science Fiction"),  # 5 changed
+        ]
+    )
+    assert (meta["rows"], meta["fitted_rows"]) == (9, 7)
+    assert [b for b, _ in reader.related(BOOKS[6], 3)][:2] in ([5, 8], [8, 5])
+    # The superseded row of book 5 no longer matches Tolkien books.
+    assert [b for b, _ in reader.related(BOOKS[5], 3)] == []
+
+    # A full build starts a new generation with a refit IDF.
+    rebuilt = index.build(BOOKS)
+    assert (rebuilt["rows"], rebuilt["fitted_rows"]) == (7, 7)
+    assert [b for b, _ in reader.related(BOOKS[5], 3)] == [5]
+    assert len(list(tmp_path.glob("gen-*"))) == 1
+
+
+@pytest.mark.asyncio
+async def test_related_books_service_indexes_new_books(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "CONTENT_INDEX_DIR", str(tmp_path))
+    async with AsyncSessionLocal() as db:
+        books = BookRepository(db)
+        await books.ingest_books(
+            [{"title": t, "author": a, "genre": g} for _, t, a, g in BOOKS[:4]]
+        )
+        ids = {
+            row["book"].title: row["book"].id
+            for row in await books.list_with_avg(limit=10)
+        }
+        service = RecommendationService(db)
+
+        # The first incremental update builds the index from the whole catalog.
+        assert await service.index_books([ids["Fluent Python"]]) == 4
+        related = await service.related_books(book_id=ids["Learning Python"], limit=2)
+        assert related[0].title == "Programming Python"
+        assert related[0].score > 0
+
+        added = await books.sync_books(
+            [
+                {
+                    "title": "Python Cookbook",
+                    "author": "David Beazley",
+                    "genre": "Programming",
+                }
+            ]
+        )
+        assert await service.index_books(added.affected_ids) == 1
+        related = await service.related_books(book_id=ids["Fluent Python"], limit=10)
+        assert "Python Cookbook" in [r.title for r in related]
+
+        with pytest.raises(HTTPException) as excinfo:
+            await service.related_books(book_id=999_999, limit=5)
+        assert excinfo.value.status_code == 404
+
+
+def test_module_imports_without_fcntl():
+    code = (
+        "import sys; sys.modules['fcntl'] = None; "
+        "import app.services.content_index as m; assert 'fcntl' not in vars(m)"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True, env=os.environ)
@@ -0,0 +1,194 @@
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import event
+
+from app.api.deps import get_current_username
+from app.api.v1.router import api_router
+from app.core import cache as cache_module
+from app.core.cache import MemoryBackend, TaggedCache
+from app.core.etag import etag_matches
+from app.db import session as db_session
+from app.db.session import AsyncSessionLocal
+from app.repositories.book_repo import BookRepository
+from app.repositories.review_repo import ReviewRepository
+from app.repositories.version_repo import VersionRepository, bump_catalog_after_commit
+
+
+def _client() -> httpx.AsyncClient:
+    app = FastAPI()
+    app.include_router(api_router)
+    app.dependency_overrides[get_current_username] = lambda: "tester"
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://t"
+    )
+
+
+def test_if_none_match_parsing():
+    assert etag_matches('"a", W/"b"', '"b"')
+    assert etag_matches("*", '"x"')
+    assert not etag_matches('"a"', '"b"') and not etag_matches(None, '"b"')
+
+
+@pytest.mark.asyncio
+async def test_book_listing_answers_304_until_the_catalog_changes():
+    async with AsyncSessionLocal() as db:
+        books = BookRepository(db)
+        await books.ingest_books([{"title": "A", "author": "X", "genre": "G"}])
+        book_id = (await books.list_with_avg(limit=1))[0]["book"].id
+
+    async with _client() as client:
+        first = await client.get("/books/", params={"limit": 10})
+        etag = first.headers["etag"]
+        assert first.status_code == 200 and first.json()
+
+        again = await client.get(
+            "/books/", params={"limit": 10}, headers={"If-None-Match": etag}
+        )
+        assert again.status_code == 304 and again.content == b""
+        assert again.headers["etag"] == etag
+
+        # Another page has its own tag.
+        other = await client.get(
+            "/books/", params={"limit": 5}, headers={"If-None-Match": etag}
+        )
+        assert other.status_code == 200
+
+        # A rating moves the average shown in the listing.
+        async with AsyncSessionLocal() as db:
+            await ReviewRepository(db).upsert(
+                book_id=book_id, username="u", rating=5, review_text=""
+            )
+        changed = await client.get(
+            "/books/", params={"limit": 10}, headers={"If-None-Match": etag}
+        )
+        assert changed.status_code == 200 and changed.headers["etag"] != etag
+
+        # So does a new book.
+        etag = changed.headers["etag"]
+        async with AsyncSessionLocal() as db:
+            await BookRepository(db).ingest_books(
+                [{"title": "B", "author": "X", "genre": "G"}]
+            )
+        changed = await client.get(
+            "/books/", params={"limit": 10}, headers={"If-None-Match": etag}
+        )
+        assert changed.status_code == 200 and len(changed.json()) == 2
+
+
+@pytest.mark.asyncio
+async def test_review_listing_etag_follows_the_book_version():
+    async with AsyncSessionLocal() as db:
+        books = BookRepository(db)
+        await books.ingest_books(
+            [{"title": t, "author": "X", "genre": "G"} for t in ("A", "B")]
+        )
+        ids = [row["book"].id for row in await books.list_with_avg(limit=2)]
+        reviews = ReviewRepository(db)
+        await reviews.upsert(book_id=ids[0], username="u", rating=3, review_text="ok")
+
+    async with _client() as client:
+        url = f"/reviews/{ids[0]}/reviews"
+        listing = await client.get(url)
+        etag = listing.headers["etag"]
+        assert listing.headers["x-total-count"] == "1"
+        assert (
+            await client.get(url, headers={"If-None-Match": etag})
+        ).status_code == 304
+
+        # A review on another book leaves this one's tag alone.
+        async with AsyncSessionLocal() as db:
+            await ReviewRepository(db).upsert(
+                book_id=ids[1], username="u", rating=4, review_text=""
+            )
+        assert (
+            await client.get(url, headers={"If-None-Match": etag})
+        ).status_code == 304
+
+        # A text-only edit does not change the rating but does change the page.
+        async with AsyncSessionLocal() as db:
+            await ReviewRepository(db).upsert(
+                book_id=ids[0], username="u", rating=3, review_text="edited"
+            )
+        edited = await client.get(url, headers={"If-None-Match": etag})
+        assert edited.status_code == 200
+        assert edited.json()[0]["review_text"] == "edited"
+
+        assert (await client.get("/reviews/999999/reviews")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_etag_and_body_agree_when_another_worker_writes(monkeypatch):
+    async with AsyncSessionLocal() as db:
+        books = BookRepository(db)
+        await books.ingest_books([{"title": "A", "author": "X", "genre": "G"}])
+        book_id = (await books.list_with_avg(limit=1))[0]["book"].id
+
+    async with _client() as client:
+        first = await client.get("/books/", params={"limit": 10})
+        assert first.json()[0]["average_rating"] is None
+
+        # The rating's invalidation reaches another worker's cache, not ours.
+        other_worker = TaggedCache(MemoryBackend(10), name="other", ttl_seconds=30)
+        with monkeypatch.context() as m:
+            m.setattr(cache_module, "_book_list_cache", other_worker)
+            async with AsyncSessionLocal() as db:
+                await ReviewRepository(db).upsert(
+                    book_id=book_id, username="u", rating=5, review_text=""
+                )
+
+        fresh = await client.get(
+            "/books/",
+            params={"limit": 10},
+            headers={"If-None-Match": first.headers["etag"]},
+        )
+        assert fresh.status_code == 200
+        assert fresh.headers["etag"] != first.headers["etag"]
+        assert fresh.json()[0]["average_rating"] == 5.0
+        again = await client.get(
+            "/books/",
+            params={"limit": 10},
+            headers={"If-None-Match": fresh.headers["etag"]},
+        )
+        assert again.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_review_writes_bump_the_catalog_after_their_commit(monkeypatch):
+    # What every database but SQLite (one writer at a time) does.
+    monkeypatch.setattr(ReviewRepository, "_bump_catalog_inline", lambda self: False)
+    async with AsyncSessionLocal() as db:
+        books = BookRepository(db)
+        await books.ingest_books([{"title": "A", "author": "X", "genre": "G"}])
+        book_id = (await books.list_with_avg(limit=1))[0]["book"].id
+        before = await VersionRepository(db).catalog()
+
+    log = []
+
+    def on_statement(conn, cursor, statement, *args):
+        target = " catalog" if "catalog_versions" in statement else ""
+        log.append(statement.split()[0].upper() + target)
+
+    def on_commit(conn):
+        log.append("COMMIT")
+
+    sync_engine = db_session.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", on_statement)
+    event.listen(sync_engine, "commit", on_commit)
+    try:
+        async with AsyncSessionLocal() as db:
+            await ReviewRepository(db).upsert(
+                book_id=book_id, username="u", rating=4, review_text=""
+            )
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", on_statement)
+        event.remove(sync_engine, "commit", on_commit)
+
+    # The review's transaction never touches the counter row.
+    assert log.index("INSERT catalog") > log.index("COMMIT")
+    # Concurrent writers waiting for a bump share one.
+    async with AsyncSessionLocal() as db:
+        await asyncio.gather(*(bump_catalog_after_commit(db) for _ in range(20)))
+        assert await VersionRepository(db).catalog() == before + 2
@@ -39,3 +39,199 @@ async def test_search_books(monkeypatch):
 
     assert len(results) == 2
     assert results[0]["title"] == "Book1"
+
+
+def _volumes_handler(calls):
+    import httpx
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        q = request.url.params["q"]
+        return httpx.Response(
+            200,
+            json={
+                "items": [
+                    {
+                        "volumeInfo": {
+                            "title": f"{q} {i}",
+                            "authors": ["A"],
+                            "categories": ["Tech"],
+                        }
+                    }
+                    for i in range(2)
+                ]
+            },
+        )
+
+    return handler
+
+
+@pytest.mark.asyncio
+async def test_injected_client_is_borrowed_not_closed():
+    import httpx
+
+    calls = []
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(_volumes_handler(calls)))
+    client = GoogleBooksClient(client=shared)
+
+    results = await client.search_books("python", 2)
+    await client.close()
+
+    assert [r["title"] for r in results] == ["python 0", "python 1"]
+    assert calls[0].url.params["maxResults"] == "2"
+    assert not shared.is_closed
+    await shared.aclose()
+
+
+@pytest.mark.asyncio
+async def test_seed_from_google_reuses_shared_pooled_client():
+    import httpx
+
+    from app.clients import http
+    from app.db.session import AsyncSessionLocal
+    from app.services.book_service import BookService
+
+    calls = []
+    shared = await http.open_shared_http_client(
+        transport=httpx.MockTransport(_volumes_handler(calls))
+    )
+    try:
+        async with AsyncSessionLocal() as db:
+            svc = BookService(db)
+            assert await svc.seed_from_google(query="rust", limit=2)
+            assert await svc.seed_from_google(query="go", limit=2)
+        assert len(calls) == 2
+        assert http.get_shared_http_client() is shared and not shared.is_closed
+    finally:
+        await http.close_shared_http_client()
+    assert shared.is_closed
+
+
+def _catalog_handler(calls, total=95, delay=0.0, slow_starts=()):
+    """Paged mock of the volumes endpoint; every 10th title repeats an earlier one."""
+    import asyncio
+
+    import httpx
+
+    state = {"in_flight": 0, "peak": 0}
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        start = int(request.url.params["startIndex"])
+        size = int(request.url.params["maxResults"])
+        state["in_flight"] += 1
+        state["peak"] = max(state["peak"], state["in_flight"])
+        try:
+            await asyncio.sleep(delay * (5 if start in slow_starts else 1))
+        finally:
+            state["in_flight"] -= 1
+        items = [
+            {
+                "volumeInfo": {
+                    "title": f"T{i - 1 if i % 10 == 9 else i}",
+                    "authors": ["A"],
+                }
+            }
+            for i in range(start, min(start + size, total))
+        ]
+        return httpx.Response(200, json={"totalItems": total, "items": items})
+
+    return handler, state
+
+
+@pytest.mark.asyncio
+async def test_search_books_pages_concurrently_and_dedupes():
+    import httpx
+
+    from app.core.rate_limit import RateLimiter
+
+    calls = []
+    handler, state = _catalog_handler(calls, delay=0.01)
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = GoogleBooksClient(
+        client=shared, page_concurrency=2, rate_limiter=RateLimiter(1000, burst=10)
+    )
+
+    results = await client.search_books("python", 200)
+    await shared.aclose()
+
+    titles = [r["title"] for r in results]
+    assert len(titles) == len(set(titles)) == 95 - 9
+    assert titles[:3] == ["T0", "T1", "T2"]  # API order is preserved
+    assert all(int(c.url.params["maxResults"]) <= 40 for c in calls)
+    assert state["peak"] <= 2
+    # Pages at/after startIndex 95 are skipped once totalItems is known.
+    assert sorted(int(c.url.params["startIndex"]) for c in calls) == [0, 40, 80]
+
+
+@pytest.mark.asyncio
+async def test_iter_pages_streams_pages_in_arrival_order():
+    import httpx
+
+    from app.core.rate_limit import RateLimiter
+
+    calls = []
+    handler, _ = _catalog_handler(calls, total=120, delay=0.01, slow_starts=(0,))
+    shared = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    client = GoogleBooksClient(
+        client=shared, page_concurrency=3, rate_limiter=RateLimiter(1000, burst=10)
+    )
+
+    pages = [page async for page in client.iter_pages("python", 120)]
+    await shared.aclose()
+
+    assert pages[-1][0]["title"] == "T0"  # the slow first page lands last
+    assert sum(len(p) for p in pages) == 120 - 12
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_spaces_requests():
+    import time
+
+    from app.core.rate_limit import RateLimiter
+
+    limiter = RateLimiter(50, burst=2)
+    t0 = time.monotonic()
+    for _ in range(6):
+        await limiter.acquire()
+    # Two free, then four more at 20 ms spacing.
+    assert time.monotonic() - t0 >= 0.07
+
+
+@pytest.mark.asyncio
+async def test_seed_from_google_counts_stale_books_once_per_run(monkeypatch):
+    import httpx
+
+    from app.clients import http
+    from app.core.rate_limit import RateLimiter
+    from app.db.session import AsyncSessionLocal
+    from app.repositories.book_repo import BookRepository
+    from app.services.book_service import BookService
+
+    counts = []
+    count_stale = BookRepository.count_stale
+
+    async def counting(self, cutoff):
+        counts.append(cutoff)
+        return await count_stale(self, cutoff)
+
+    monkeypatch.setattr(BookRepository, "count_stale", counting)
+    calls = []
+    handler, _ = _catalog_handler(calls, total=95)
+    await http.open_shared_http_client(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(
+        BookService,
+        "_new_google_client",
+        lambda self, prefer_cache=False: GoogleBooksClient(
+            client=http.get_shared_http_client(),
+            rate_limiter=RateLimiter(1000, burst=10),
+        ),
+    )
+    try:
+        async with AsyncSessionLocal() as db:
+            assert await BookService(db).seed_from_google(query="stale", limit=95)
+    finally:
+        await http.close_shared_http_client()
+
+    assert len(calls) == 3  # three pages ingested...
+    assert len(counts) == 1  # ...but one stale COUNT for the run
@@ -0,0 +1,65 @@
+import gzip
+import json
+
+import pytest
+
+from app.core.config import settings
+from app.core.json_stream import SeedFileError, iter_batches, iter_json_records
+from app.db.session import AsyncSessionLocal
+from app.repositories.book_repo import BookRepository
+from app.services.book_service import BookService
+
+ROWS = [
+    {"title": f"T{i}", "author": 'A, "quoted" [x]', "genre": "G", "n": i * 1.5}
+    for i in range(25)
+]
+
+
+def test_json_array_streams_across_tiny_read_chunks(tmp_path):
+    path = tmp_path / "books.json"
+    path.write_text(" [\n" + " ,\n".join(json.dumps(r) for r in ROWS) + "\n] \n")
+
+    for chunk_chars in (1, 7, 4096):
+        assert list(iter_json_records(path, chunk_chars=chunk_chars)) == ROWS
+
+
+def test_gzip_ndjson_and_batches_with_validation(tmp_path):
+    path = tmp_path / "books.jsonl.gz"
+    with gzip.open(path, "wt", encoding="utf-8") as fh:
+        for row in ROWS:
+            fh.write(json.dumps(row) + "\n\n")
+        fh.write("[1, 2]\n")  # not an object -> dropped
+
+    batches = list(
+        iter_batches(
+            iter_json_records(path),
+            batch_size=10,
+            validate=lambda r: r if r["n"] % 3 == 0 else None,
+        )
+    )
+    assert [len(b) for b in batches] == [10, 3]  # even i only
+    assert all(r["n"] % 3 == 0 for b in batches for r in b)
+
+
+def test_malformed_array_raises_after_valid_prefix(tmp_path):
+    path = tmp_path / "broken.json"
+    path.write_text('[{"a": 1}, {"a": 2} {"a": 3}]')
+
+    records = iter_json_records(path, chunk_chars=4)
+    assert next(records) == {"a": 1}
+    assert next(records) == {"a": 2}
+    with pytest.raises(SeedFileError):
+        next(records)
+
+
+@pytest.mark.asyncio
+async def test_seed_books_streams_seed_file(tmp_path, monkeypatch):
+    path = tmp_path / "books.ndjson"
+    path.write_text("\n".join(json.dumps(r) for r in ROWS[:7]))
+    monkeypatch.setattr(settings, "BOOKS_SEED_FILE", str(path))
+    monkeypatch.setattr(settings, "SEED_BATCH_SIZE", 3)
+
+    async with AsyncSessionLocal() as db:
+        assert await BookRepository(db).seed_books() is True
+        books = await BookService(db).list_books(search=None, limit=50, offset=0)
+        assert len(books) == 7
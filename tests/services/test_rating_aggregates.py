@@ -0,0 +1,75 @@
+import pytest
+from sqlalchemy import update
+
+from app.db.session import AsyncSessionLocal
+from app.models.book import Book
+from app.repositories.book_repo import BookRepository
+from app.schemas.review import ReviewUpsertRequest
+from app.services.book_service import BookService
+from app.services.review_service import ReviewService
+
+
+@pytest.mark.asyncio
+async def test_aggregates_follow_inserts_and_updates():
+    async with AsyncSessionLocal() as db:
+        await BookRepository(db).seed_books(
+            [{"title": "My book", "author": "A1", "genre": "G"}]
+        )
+        rsvc = ReviewService(db)
+        await rsvc.upsert(
+            book_id=1,
+            username="abdur",
+            data=ReviewUpsertRequest(rating=4, review_text="good"),
+        )
+        await rsvc.upsert(
+            book_id=1,
+            username="rafay",
+            data=ReviewUpsertRequest(rating=2, review_text="meh"),
+        )
+        # update path: old rating (2) must be subtracted
+        await rsvc.upsert(
+            book_id=1,
+            username="rafay",
+            data=ReviewUpsertRequest(rating=5, review_text="ok"),
+        )
+
+        book = await db.get(Book, 1, populate_existing=True)
+        assert (book.rating_sum, book.rating_count) == (9, 2)
+
+        books = await BookService(db).list_books(search=None, limit=10, offset=0)
+        assert books[0].average_rating == pytest.approx(4.5)
+
+
+@pytest.mark.asyncio
+async def test_rebuild_rating_aggregates_repairs_drift():
+    async with AsyncSessionLocal() as db:
+        repo = BookRepository(db)
+        await repo.seed_books(
+            [
+                {"title": "T1", "author": "A1", "genre": "G"},
+                {"title": "T2", "author": "A2", "genre": "G"},
+            ]
+        )
+        await ReviewService(db).upsert(
+            book_id=1,
+            username="abdur",
+            data=ReviewUpsertRequest(rating=3, review_text="x"),
+        )
+        await db.execute(
+            update(Book)
+            .where(Book.id == 1)
+            .values(rating_sum=0, rating_count=0, average_rating=None)
+        )
+        await db.commit()
+
+        assert await repo.rebuild_rating_aggregates() == 1
+        assert await repo.rebuild_rating_aggregates() == 0
+
+        # Only the average drifted: still repaired.
+        await db.execute(update(Book).where(Book.id == 1).values(average_rating=1.0))
+        await db.commit()
+        assert await repo.rebuild_rating_aggregates() == 1
+        assert await repo.rebuild_rating_aggregates() == 0
+
+        books = await BookService(db).list_books(search=None, limit=10, offset=0)
+        assert [b.average_rating for b in books] == [3.0, None]
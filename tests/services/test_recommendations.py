@@ -0,0 +1,271 @@
+import numpy as np
+import pytest
+import scipy.sparse as sp
+from fastapi import HTTPException
+
+from sqlalchemy import delete, event, select
+
+from app.db import session as db_session
+from app.db.session import AsyncSessionLocal
+from app.models.recommendation import ReviewEvent
+from app.repositories.book_repo import BookRepository
+from app.repositories.review_repo import ReviewRepository
+from app.services.item_similarity import item_similarities, recommend_for_users
+from app.services.recommendation_service import RecommendationService
+
+RATINGS = {
+    "u1": {"A": 5, "B": 5, "C": 1},
+    "u2": {"A": 4, "B": 5, "C": 2},
+    "u3": {"A": 1, "B": 2, "C": 5, "D": 5},
+    "u4": {"A": 5},
+}
+
+
+def test_blocked_similarity_matches_single_block():
+    rng = np.random.default_rng(3)
+    dense = rng.integers(0, 6, size=(40, 25)).astype(np.float32)
+    dense[dense < 3] = 0
+    ratings = sp.csr_matrix(dense)
+
+    whole = item_similarities(ratings, k=5, block_bytes=1 << 30)
+    blocked = item_similarities(ratings, k=5, block_bytes=1)  # one book per block
+    np.testing.assert_array_equal(whole.indices, blocked.indices)
+    np.testing.assert_allclose(whole.scores, blocked.scores, rtol=1e-6)
+
+    recs = recommend_for_users(ratings, whole, n=3, block_bytes=1)
+    for user in range(dense.shape[0]):
+        rated = set(np.flatnonzero(dense[user]))
+        assert rated.isdisjoint(set(recs.indices[user][recs.indices[user] >= 0]))
+
+
+@pytest.mark.asyncio
+async def test_build_then_serve_similar_books_and_user_recommendations():
+    async with AsyncSessionLocal() as db:
+        books = BookRepository(db)
+        await books.ingest_books(
+            [{"title": t, "author": "Author", "genre": "G"} for t in "ABCD"]
+        )
+        ids = {
+            b["book"].title: b["book"].id for b in await books.list_with_avg(limit=10)
+        }
+        reviews = ReviewRepository(db)
+        for username, rated in RATINGS.items():
+            for title, rating in rated.items():
+                await reviews.upsert(
+                    book_id=ids[title], username=username, rating=rating, review_text=""
+                )
+
+        service = RecommendationService(db)
+        result = await service.build()
+        assert (result.reviews, result.users, result.books) == (11, 4, 4)
+
+        similar = await service.similar_books(book_id=ids["A"], limit=5)
+        assert [s.title for s in similar][:1] == ["B"]
+        assert "C" not in [s.title for s in similar]  # opposite taste: negative
+        assert all(s.score > 0 for s in similar)
+
+        recs = await service.for_user(username="u4", limit=5)
+        assert [r.title for r in recs] == ["B"]
+        assert await service.for_user(username="nobody", limit=5) == []
+
+        with pytest.raises(HTTPException) as excinfo:
+            await service.similar_books(book_id=999_999, limit=5)
+        assert excinfo.value.status_code == 404
+
+        # A rebuild replaces the previous model instead of appending to it.
+        again = await service.build()
+        assert again.similarities == result.similarities
+        assert len(await service.similar_books(book_id=ids["A"], limit=50)) == len(
+            similar
+        )
+
+
+@pytest.mark.asyncio
+async def test_review_events_update_model_like_a_full_rebuild():
+    async with AsyncSessionLocal() as db:
+        books = BookRepository(db)
+        await books.ingest_books(
+            [{"title": t, "author": "Author", "genre": "G"} for t in "ABCD"]
+        )
+        ids = {
+            b["book"].title: b["book"].id for b in await books.list_with_avg(limit=10)
+        }
+        reviews = ReviewRepository(db)
+
+        async def rate(username: str, title: str, rating: int) -> None:
+            await reviews.upsert(
+                book_id=ids[title], username=username, rating=rating, review_text=""
+            )
+
+        for username, rated in RATINGS.items():
+            for title, rating in rated.items():
+                await rate(username, title, rating)
+
+        service = RecommendationService(db)
+        await service.build()
+        assert (
+            await service.recommendations.pending_events(10) == []
+        )  # consumed by build
+
+        await rate("u4", "C", 2)  # new rating
+        await rate("u1", "C", 4)  # changed rating
+        await rate("u1", "C", 3)  # changed again, same batch
+        await rate("u1", "A", 5)  # unchanged rating: no event
+        await rate("u5", "C", 5)  # new user
+        await rate("u5", "D", 4)
+        assert len(await service.recommendations.pending_events(10)) == 5
+
+        applied = await service.apply_review_events(limit=3)
+        applied.merge(await service.apply_review_events(limit=3))
+        assert (applied.events, applied.users) == (5, 3)
+        assert await service.recommendations.pending_events(10) == []
+
+        async def snapshot():
+            similar = {
+                title: [
+                    (s.title, round(s.score, 4))
+                    for s in await service.similar_books(book_id=book_id, limit=10)
+                ]
+                for title, book_id in ids.items()
+            }
+            # Scores of users from the first batch predate the second batch's
+            # similarity changes; only their ranking is expected to match.
+            users = {
+                name: [r.title for r in await service.for_user(username=name, limit=10)]
+                for name in ("u1", "u4", "u5")
+            }
+            return similar, users
+
+        incremental = await snapshot()
+        await service.build()
+        assert incremental == await snapshot()
+
+
+@pytest.mark.asyncio
+async def test_a_review_written_as_the_build_starts_is_counted_once(monkeypatch):
+    async with AsyncSessionLocal() as db:
+        books = BookRepository(db)
+        await books.ingest_books(
+            [{"title": t, "author": "Author", "genre": "G"} for t in "ABCD"]
+        )
+        ids = {
+            b["book"].title: b["book"].id for b in await books.list_with_avg(limit=10)
+        }
+        reviews = ReviewRepository(db)
+        for username, rated in RATINGS.items():
+            for title, rating in rated.items():
+                await reviews.upsert(
+                    book_id=ids[title], username=username, rating=rating, review_text=""
+                )
+
+        service = RecommendationService(db)
+        iter_ratings = service.recommendations.iter_ratings
+
+        async def review_lands_first(*args, **kwargs):
+            async with AsyncSessionLocal() as other:
+                await ReviewRepository(other).upsert(
+                    book_id=ids["D"], username="u4", rating=4, review_text=""
+                )
+            async for batch in iter_ratings(*args, **kwargs):
+                yield batch
+
+        monkeypatch.setattr(service.recommendations, "iter_ratings", review_lands_first)
+        result = await service.build()
+        assert result.reviews == 12
+        # The rating is in the build, so its event must not be applied again.
+        assert await service.recommendations.pending_events(10) == []
+
+
+async def _rate_all(db):
+    books = BookRepository(db)
+    await books.ingest_books(
+        [{"title": t, "author": "Author", "genre": "G"} for t in "ABCD"]
+    )
+    ids = {b["book"].title: b["book"].id for b in await books.list_with_avg(limit=10)}
+    reviews = ReviewRepository(db)
+    for username, rated in RATINGS.items():
+        for title, rating in rated.items():
+            await reviews.upsert(
+                book_id=ids[title], username=username, rating=rating, review_text=""
+            )
+    return ids
+
+
+@pytest.mark.asyncio
+async def test_build_drops_only_the_events_it_read(monkeypatch):
+    async with AsyncSessionLocal() as db:
+        await _rate_all(db)
+        lowest = await db.scalar(select(ReviewEvent).order_by(ReviewEvent.id).limit(1))
+        late = {
+            "id": lowest.id,
+            "book_id": lowest.book_id,
+            "username": lowest.username,
+            "old_rating": None,
+            "new_rating": lowest.new_rating,
+        }
+        # Not visible to the build's snapshot, as a sequence value committed
+        # out of order would be.
+        await db.execute(delete(ReviewEvent).where(ReviewEvent.id == lowest.id))
+        await db.commit()
+
+        service = RecommendationService(db)
+        replace_all = service.recommendations.replace_all
+
+        async def late_commit(*args, **kwargs):
+            db.add(ReviewEvent(**late))
+            await db.flush()
+            return await replace_all(*args, **kwargs)
+
+        monkeypatch.setattr(service.recommendations, "replace_all", late_commit)
+        await service.build()
+        assert [e.id for e in await service.recommendations.pending_events(10)] == [
+            late["id"]
+        ]
+
+
+@pytest.mark.asyncio
+async def test_consumer_stands_aside_while_a_build_holds_the_lock(monkeypatch):
+    async with AsyncSessionLocal() as db:
+        await _rate_all(db)
+        service = RecommendationService(db)
+
+        async def held(*, wait=True):
+            return wait
+
+        monkeypatch.setattr(service.recommendations, "lock_model", held)
+        assert (await service.apply_review_events(limit=100)).events == 0
+        assert len(await service.recommendations.pending_events(100)) == 11
+
+
+@pytest.mark.asyncio
+async def test_neighbour_lists_are_refreshed_in_bulk():
+    async with AsyncSessionLocal() as db:
+        ids = await _rate_all(db)
+        service = RecommendationService(db)
+        await service.build()
+        reviews = ReviewRepository(db)
+        for username, title in (("u4", "B"), ("u4", "C"), ("u4", "D"), ("u1", "D")):
+            await reviews.upsert(
+                book_id=ids[title], username=username, rating=3, review_text=""
+            )
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement)
+
+        sync_engine = db_session.engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", record)
+        try:
+            applied = await service.apply_review_events(limit=100)
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", record)
+
+        assert applied.books == 4
+        pair_reads = [
+            s for s in statements if s.startswith("SELECT") and "book_pair_stats" in s
+        ]
+        similarity_deletes = [
+            s for s in statements if s.startswith("DELETE FROM book_similarities")
+        ]
+        assert len(pair_reads) == 1 and len(similarity_deletes) == 1
@@ -0,0 +1,164 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+
+from app.clients.google_book_clients import GoogleBooksClient
+from app.clients.response_cache import ResponseCache
+from app.core.rate_limit import RateLimiter
+
+
+def _cache(tmp_path, **overrides) -> ResponseCache:
+    options = {"ttl_seconds": 60, "max_stale_seconds": 3600, "max_bytes": 1 << 20}
+    options.update(overrides)
+    return ResponseCache(tmp_path / "cache", **options)
+
+
+def _volumes(title: str) -> dict:
+    return {
+        "totalItems": 1,
+        "items": [{"volumeInfo": {"title": title, "authors": ["A"]}}],
+    }
+
+
+def _client(handler, cache, **kwargs) -> GoogleBooksClient:
+    return GoogleBooksClient(
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        rate_limiter=RateLimiter(1000, burst=10),
+        cache=cache,
+        **kwargs,
+    )
+
+
+def _age(cache: ResponseCache, seconds: float) -> None:
+    """Pretend every stored entry was written `seconds` ago."""
+    for path in cache.directory.iterdir():
+        data = json.loads(path.read_text())
+        data["stored_at"] -= seconds
+        path.write_text(json.dumps(data))
+
+
+@pytest.mark.asyncio
+async def test_fresh_pages_are_served_without_a_request(tmp_path):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json=_volumes("Dune"), headers={"ETag": '"v1"'})
+
+    cache = _cache(tmp_path)
+    first = await _client(handler, cache).search_books("dune", 1)
+    second = await _client(handler, cache).search_books("dune", 1)
+
+    assert first == second == [{"title": "Dune", "author": "A", "genre": "General"}]
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_stale_pages_are_revalidated_with_validators(tmp_path):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        if request.headers.get("If-None-Match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(
+            200,
+            json=_volumes("Dune"),
+            headers={"ETag": '"v1"', "Last-Modified": "Tue, 01 Sep 2026 00:00:00 GMT"},
+        )
+
+    cache = _cache(tmp_path)
+    await _client(handler, cache).search_books("dune", 1)
+    _age(cache, 120)
+
+    results = await _client(handler, cache).search_books("dune", 1)
+
+    assert [r["title"] for r in results] == ["Dune"]
+    assert calls[1].headers["If-Modified-Since"] == "Tue, 01 Sep 2026 00:00:00 GMT"
+    # The 304 made the entry fresh again: no third request.
+    await _client(handler, cache).search_books("dune", 1)
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_stale_copy_is_served_when_remote_fails(tmp_path):
+    healthy = {"ok": True}
+
+    def handler(request):
+        if healthy["ok"]:
+            return httpx.Response(200, json=_volumes("Dune"))
+        return httpx.Response(503)
+
+    cache = _cache(tmp_path)
+    await _client(handler, cache).search_books("dune", 1)
+    _age(cache, 120)
+    healthy["ok"] = False
+
+    assert [
+        r["title"] for r in await _client(handler, cache).search_books("dune", 1)
+    ] == ["Dune"]
+    with pytest.raises(httpx.HTTPStatusError):
+        await _client(handler, cache).search_books("uncached", 1)
+
+
+@pytest.mark.asyncio
+async def test_prefer_cache_skips_revalidation(tmp_path):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(200, json=_volumes("Dune"))
+
+    cache = _cache(tmp_path)
+    await _client(handler, cache).search_books("dune", 1)
+    _age(cache, 120)
+
+    await _client(handler, cache, prefer_cache=True).search_books("dune", 1)
+    assert len(calls) == 1
+
+
+def test_entries_past_max_stale_are_dropped(tmp_path):
+    cache = _cache(tmp_path, ttl_seconds=1, max_stale_seconds=1)
+    cache.put("u", {"q": "a"}, {"x": 1})
+    _age(cache, 5)
+
+    assert cache.get("u", {"q": "a"}) is None
+    assert list(cache.directory.iterdir()) == []
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    cache = _cache(tmp_path, max_bytes=2500)
+    body = {"pad": "x" * 900}
+    cache.put("u", {"q": "a"}, body)
+    cache.put("u", {"q": "b"}, body)
+    old = time.time() - 100
+    for path in cache.directory.iterdir():
+        os.utime(path, (old, old))
+    assert cache.get("u", {"q": "a"}) is not None  # "a" becomes most recent
+
+    cache.put("u", {"q": "c"}, body)
+
+    assert cache.get("u", {"q": "b"}) is None
+    assert cache.get("u", {"q": "a"}) is not None
+    assert cache.get("u", {"q": "c"}) is not None
+
+
+def test_refreshes_count_only_the_size_difference(tmp_path):
+    cache = _cache(tmp_path, max_bytes=2500)
+    entry = cache.put("u", {"q": "a"}, {"pad": "x" * 900})
+    for _ in range(5):
+        cache.refresh(entry)  # rewrites the same file: no eviction
+    cache.put("u", {"q": "a"}, {"pad": "x" * 10})
+    assert cache.get("u", {"q": "a"}) is not None
+    assert cache._approx_bytes == cache._disk_usage()
+
+
+def test_threads_can_write_the_same_key(tmp_path):
+    cache = _cache(tmp_path)
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda i: cache.put("u", {"q": "b"}, {"i": i}), range(64)))
+    assert [p.suffix for p in cache.directory.iterdir()] == [".json"]
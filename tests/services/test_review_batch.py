@@ -0,0 +1,204 @@
+import json
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import event, func, select
+
+from app.api.deps import get_current_username
+from app.api.v1.router import api_router
+from app.core.config import settings
+from app.core.json_stream import SeedFileError, aiter_ndjson
+from app.db import session as db_session
+from app.db.session import AsyncSessionLocal
+from app.models.book import Book
+from app.models.recommendation import ReviewEvent
+from app.models.review import Review
+from app.repositories.book_repo import BookRepository
+from app.repositories.review_repo import ReviewRepository
+from app.repositories.version_repo import VersionRepository
+
+
+def _client() -> httpx.AsyncClient:
+    app = FastAPI()
+    app.include_router(api_router)
+    app.dependency_overrides[get_current_username] = lambda: "tester"
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://t"
+    )
+
+
+async def _seed(n: int):
+    async with AsyncSessionLocal() as db:
+        books = BookRepository(db)
+        await books.ingest_books(
+            [{"title": f"T{i}", "author": "A", "genre": "G"} for i in range(n)]
+        )
+        return sorted(row["book"].id for row in await books.list_with_avg(limit=n))
+
+
+@pytest.mark.asyncio
+async def test_ndjson_lines_stream_across_chunks():
+    async def chunks(*parts):
+        for part in parts:
+            yield part
+
+    body = b'{"a": 1}\n\n{"b": [1,\n'
+    with pytest.raises(SeedFileError, match="line 3"):
+        [r async for r in aiter_ndjson(chunks(body[:5], body[5:]))]
+    records = [r async for r in aiter_ndjson(chunks(b'{"a"', b": 1}\n  \n", b"[2]"))]
+    assert records == [{"a": 1}, [2]]
+
+
+@pytest.mark.asyncio
+async def test_batch_reports_per_item_status_and_writes_in_bulk(monkeypatch):
+    monkeypatch.setattr(settings, "REVIEWS_BATCH_CHUNK_SIZE", 2)
+    ids = await _seed(4)
+    async with AsyncSessionLocal() as db:
+        await ReviewRepository(db).upsert(
+            book_id=ids[3], username="tester", rating=1, review_text="old"
+        )
+        catalog_before = await VersionRepository(db).catalog()
+
+    batch = [
+        {"book_id": ids[0], "rating": 2, "review_text": "first"},
+        {"book_id": ids[1], "rating": 4},
+        {"book_id": ids[0], "rating": 5, "review_text": "second"},
+        {"book_id": 999999, "rating": 3, "review_text": ""},
+        {"book_id": ids[2], "rating": 9, "review_text": ""},
+        "not an object",
+        {"book_id": ids[3], "rating": 3, "review_text": "new"},
+    ]
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sync_engine = db_session.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", record)
+    try:
+        async with _client() as client:
+            res = await client.post("/reviews/batch", json=batch)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", record)
+
+    assert res.status_code == 200
+    body = res.json()
+    statuses = [item["status"] for item in body["items"]]
+    assert statuses == [
+        "superseded",
+        "created",
+        "created",
+        "book_not_found",
+        "invalid",
+        "invalid",
+        "updated",
+    ]
+    assert body["items"][0]["review_id"] == body["items"][2]["review_id"]
+    assert "rating" in body["items"][4]["error"]
+    assert (body["created"], body["updated"], body["failed"]) == (2, 1, 3)
+
+    # One IN query for the books, one upsert per chunk of two.
+    selects = [s for s in statements if s.lstrip().upper().startswith("SELECT")]
+    upserts = [s for s in statements if "INSERT INTO reviews" in s]
+    assert len(selects) == 1 and " IN " in selects[0].upper()
+    assert len(upserts) == 2
+
+    async with AsyncSessionLocal() as db:
+        reviews = {
+            r.book_id: r for r in (await db.execute(select(Review))).scalars().all()
+        }
+        assert reviews[ids[0]].rating == 5 and reviews[ids[0]].review_text == "second"
+        assert reviews[ids[1]].review_text == ""
+        for book_id, expected in ((ids[0], 5), (ids[1], 4), (ids[3], 3)):
+            book = await db.get(Book, book_id)
+            assert (book.rating_count, book.rating_sum) == (1, expected)
+        # Once per chunk, not once per review.
+        assert await VersionRepository(db).catalog() == catalog_before + 2
+        events = await db.scalar(select(func.count()).select_from(ReviewEvent))
+        assert events == 4  # the single upsert + three rating changes
+
+
+@pytest.mark.asyncio
+async def test_many_users_on_one_book_update_it_once_per_chunk():
+    [book_id] = await _seed(1)
+    async with AsyncSessionLocal() as db:
+        await ReviewRepository(db).upsert(
+            book_id=book_id, username="user0", rating=1, review_text=""
+        )
+    rows = [
+        {
+            "book_id": book_id,
+            "username": f"user{i}",
+            "rating": 1 + i % 5,
+            "review_text": "",
+        }
+        for i in range(20)
+    ]
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sync_engine = db_session.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", record)
+    try:
+        async with AsyncSessionLocal() as db:
+            written = await ReviewRepository(db).upsert_many(rows=rows, chunk_size=50)
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", record)
+
+    assert sum(created for _, created in written.values()) == 19
+    book_updates = [
+        s for s in statements if s.lstrip().upper().startswith("UPDATE BOOKS")
+    ]
+    assert len(book_updates) == 1
+    async with AsyncSessionLocal() as db:
+        book = await db.get(Book, book_id)
+        assert (book.rating_count, book.rating_sum) == (
+            20,
+            sum(r["rating"] for r in rows),
+        )
+        events = await db.scalar(select(func.count()).select_from(ReviewEvent))
+        assert events == 20  # user0's first rating is unchanged by the batch
+
+
+@pytest.mark.asyncio
+async def test_batch_accepts_ndjson_and_enforces_the_limit(monkeypatch):
+    ids = await _seed(2)
+    lines = "\n".join(
+        json.dumps({"book_id": book_id, "rating": 4, "review_text": "x"})
+        for book_id in ids
+    )
+    async with _client() as client:
+        res = await client.post(
+            "/reviews/batch",
+            content=lines.encode(),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert res.status_code == 200
+        assert [item["status"] for item in res.json()["items"]] == [
+            "created",
+            "created",
+        ]
+        listing = await client.get(f"/reviews/{ids[0]}/reviews")
+        assert listing.json()[0]["rating"] == 4
+
+        monkeypatch.setattr(settings, "REVIEWS_BATCH_MAX_ITEMS", 1)
+        res = await client.post(
+            "/reviews/batch",
+            content=lines.encode(),
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert res.status_code == 413
+        assert (
+            await client.post("/reviews/batch", json={"book_id": 1})
+        ).status_code == 400
+        bad = await client.post(
+            "/reviews/batch",
+            content=b"{oops\n",
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+        assert bad.status_code == 400 and "line 1" in bad.json()["detail"]
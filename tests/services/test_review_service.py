@@ -1,4 +1,15 @@
+import asyncio
+
 import pytest
+from fastapi import HTTPException
+from sqlalchemy import event, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.db import session as db_session
+from app.db.base import Base
+from app.db.dialect import enforce_foreign_keys
+from app.models.recommendation import ReviewEvent
+from app.models.review import Review
 from app.repositories.book_repo import BookRepository
 from app.services.review_service import ReviewService
 from app.schemas.review import ReviewUpsertRequest
@@ -26,3 +37,165 @@ async def test_upsert_review_and_list():
         assert r2.rating == 3
         reviews = await svc.list_for_book(book_id=1)
         assert len(reviews) == 1 and reviews[0].username == "abdur"
+
+
+@pytest.mark.asyncio
+async def test_review_cursor_pagination_newest_first():
+    async with AsyncSessionLocal() as db:
+        await BookRepository(db).seed_books(
+            [{"title": "T1", "author": "A1", "genre": "G"}]
+        )
+        svc = ReviewService(db)
+        for i in range(5):
+            await svc.upsert(
+                book_id=1,
+                username=f"user{i}",
+                data=ReviewUpsertRequest(rating=3, review_text="x"),
+            )
+
+        ids, cursor = [], None
+        for _ in range(10):  # bounded: a broken cursor must not hang the suite
+            page = await svc.list_for_book_page(book_id=1, limit=2, cursor=cursor)
+            ids += [r.id for r in page.items]
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+
+        # same created_at second for all rows: ordering falls back to id DESC
+        assert ids == [5, 4, 3, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_review_listing_sort_total_and_index():
+    async with AsyncSessionLocal() as db:
+        await BookRepository(db).seed_books(
+            [{"title": "T1", "author": "A1", "genre": "G"}]
+        )
+        svc = ReviewService(db)
+        for i in range(5):
+            await svc.upsert(
+                book_id=1,
+                username=f"user{i}",
+                data=ReviewUpsertRequest(rating=4, review_text=f"r{i}"),
+            )
+
+        ids, cursor = [], None
+        for _ in range(10):
+            page = await svc.list_for_book_page(
+                book_id=1, limit=2, cursor=cursor, sort="oldest"
+            )
+            assert page.total == 5  # from books.rating_count, on every page
+            ids += [r.id for r in page.items]
+            cursor = page.next_cursor
+            if cursor is None:
+                break
+        assert ids == [1, 2, 3, 4, 5]
+        assert page.items[0].review_text == "r4"
+
+        # A cursor only resumes the order it was issued for.
+        first = await svc.list_for_book_page(book_id=1, limit=2, sort="oldest")
+        with pytest.raises(HTTPException) as excinfo:
+            await svc.list_for_book_page(
+                book_id=1, limit=2, cursor=first.next_cursor, sort="newest"
+            )
+        assert excinfo.value.status_code == 400
+
+        plan = await db.execute(
+            text(
+                "EXPLAIN QUERY PLAN SELECT id FROM reviews WHERE book_id = 1 "
+                "ORDER BY created_at DESC, id DESC LIMIT 2"
+            )
+        )
+        assert "ix_reviews_book_created_id" in " ".join(str(row) for row in plan)
+
+
+@pytest.mark.asyncio
+async def test_upsert_is_one_write_and_fk_maps_to_404():
+    async with AsyncSessionLocal() as db:
+        await BookRepository(db).seed_books(
+            [{"title": "T1", "author": "A1", "genre": "G"}]
+        )
+        svc = ReviewService(db)
+
+        statements = []
+
+        def record(conn, cursor, statement, *args):
+            statements.append(statement.lstrip().split()[0].upper())
+
+        sync_engine = db_session.engine.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", record)
+        try:
+            first = await svc.upsert(
+                book_id=1,
+                username="u",
+                data=ReviewUpsertRequest(rating=2, review_text="a"),
+            )
+            second = await svc.upsert(
+                book_id=1,
+                username="u",
+                data=ReviewUpsertRequest(rating=5, review_text="b"),
+            )
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", record)
+
+        # Upsert + aggregate UPDATE + catalog bump + outbox INSERT per write,
+        # and no SELECT (existence check, race re-select or refresh).
+        assert "SELECT" not in statements
+        assert len(statements) == 8
+        assert first.id == second.id and second.rating == 5
+        assert second.review_text == "b"
+
+        book = await BookRepository(db).get(1)
+        assert (book.rating_count, book.rating_sum) == (1, 5)
+
+        with pytest.raises(HTTPException) as excinfo:
+            await svc.upsert(
+                book_id=999,
+                username="u",
+                data=ReviewUpsertRequest(rating=3, review_text=""),
+            )
+        assert excinfo.value.status_code == 404
+
+        # The failed write left the session usable.
+        third = await svc.upsert(
+            book_id=1, username="v", data=ReviewUpsertRequest(rating=1, review_text="")
+        )
+        assert third.rating == 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_upserts_keep_one_row_and_exact_aggregates(tmp_path):
+    # A file database: the shared in-memory one funnels every session
+    # through a single connection, so writers would not really overlap.
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'reviews.db'}")
+    enforce_foreign_keys(engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    sessions = async_sessionmaker(engine, expire_on_commit=False)
+    async with sessions() as db:
+        await BookRepository(db).seed_books(
+            [{"title": "T1", "author": "A1", "genre": "G"}]
+        )
+
+    async def write(i: int):
+        async with sessions() as db:
+            return await ReviewService(db).upsert(
+                book_id=1,
+                username=f"u{i % 3}",
+                data=ReviewUpsertRequest(rating=i % 5 + 1, review_text=str(i)),
+            )
+
+    try:
+        results = await asyncio.gather(*(write(i) for i in range(60)))
+        async with sessions() as db:
+            rows = (await db.execute(select(Review.rating))).scalars().all()
+            book = await BookRepository(db).get(1)
+            events = (await db.execute(select(ReviewEvent))).scalars().all()
+    finally:
+        await engine.dispose()
+
+    assert len({r.id for r in results}) == 3 and len(rows) == 3
+    assert (book.rating_count, book.rating_sum) == (3, sum(rows))
+    assert book.average_rating == pytest.approx(sum(rows) / 3)
+    # The outbox replays to the same totals.
+    assert sum(e.new_rating - (e.old_rating or 0) for e in events) == sum(rows)
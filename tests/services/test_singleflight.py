@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+from sqlalchemy import event
+
+from app.core.config import settings
+from app.core.singleflight import SingleFlight
+from app.db import session as db_session
+from app.db.session import AsyncSessionLocal
+from app.repositories.book_repo import BookRepository
+from app.services.book_service import BookService
+
+
+@pytest.mark.asyncio
+async def test_concurrent_callers_share_one_call():
+    flight, calls, gate = SingleFlight("test"), 0, asyncio.Event()
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await gate.wait()
+        return calls
+
+    waiters = [asyncio.create_task(flight.do("k", load)) for _ in range(10)]
+    await asyncio.sleep(0)
+    gate.set()
+    assert await asyncio.gather(*waiters) == [1] * 10
+    assert calls == 1 and flight.in_flight() == 0
+
+    # Not a cache: a later call runs again.
+    assert await flight.do("k", load) == 2
+
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter():
+    flight, gate = SingleFlight("test"), asyncio.Event()
+
+    async def fail():
+        await gate.wait()
+        raise ValueError("boom")
+
+    waiters = [asyncio.create_task(flight.do("k", fail)) for _ in range(5)]
+    await asyncio.sleep(0)
+    gate.set()
+    results = await asyncio.gather(*waiters, return_exceptions=True)
+    assert all(isinstance(r, ValueError) for r in results)
+    assert flight.in_flight() == 0
+
+
+@pytest.mark.asyncio
+async def test_cancellation_is_per_waiter():
+    flight, calls, gate = SingleFlight("test"), 0, asyncio.Event()
+
+    async def load():
+        nonlocal calls
+        calls += 1
+        await gate.wait()
+        return "done"
+
+    leader = asyncio.create_task(flight.do("k", load))
+    await asyncio.sleep(0)
+    follower = asyncio.create_task(flight.do("k", load))
+    quitter = asyncio.create_task(flight.do("k", load))
+    await asyncio.sleep(0)
+
+    # A cancelled follower leaves the shared call alone.
+    quitter.cancel()
+    await asyncio.sleep(0)
+    assert quitter.cancelled() and calls == 1
+
+    # A cancelled leader hands over: the follower retries and leads.
+    leader.cancel()
+    await asyncio.sleep(0)
+    assert leader.cancelled()
+    gate.set()
+    assert await follower == "done"
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_leader_hand_over_without_task_cancelling():
+    class PreTask311(asyncio.Task):
+        cancelling = None  # Task.cancelling() arrived in Python 3.11
+
+    loop = asyncio.get_running_loop()
+    factory = loop.get_task_factory()
+    loop.set_task_factory(lambda loop, coro, **kw: PreTask311(coro, loop=loop, **kw))
+    try:
+        flight, gate = SingleFlight("test"), asyncio.Event()
+
+        async def load():
+            await gate.wait()
+            return "done"
+
+        leader = asyncio.create_task(flight.do("k", load))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(flight.do("k", load))
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+        gate.set()
+        assert await follower == "done"
+    finally:
+        loop.set_task_factory(factory)
+
+
+@pytest.mark.asyncio
+async def test_thundering_herd_runs_fewer_queries(monkeypatch):
+    monkeypatch.setattr(settings, "BOOK_LIST_CACHE_BACKEND", "none")
+    async with AsyncSessionLocal() as db:
+        await BookRepository(db).ingest_books(
+            [{"title": f"T{i}", "author": "A", "genre": "G"} for i in range(30)]
+        )
+
+    selects = 0
+
+    def count(conn, cursor, statement, *args):
+        nonlocal selects
+        if statement.lstrip().upper().startswith("SELECT"):
+            selects += 1
+
+    async def herd(size: int):
+        async def request():
+            async with AsyncSessionLocal() as db:
+                return await BookService(db).list_books(search=None, limit=10, offset=0)
+
+        return await asyncio.gather(*(request() for _ in range(size)))
+
+    sync_engine = db_session.engine.sync_engine
+    event.listen(sync_engine, "before_cursor_execute", count)
+    try:
+        monkeypatch.setattr(settings, "BOOK_LIST_COALESCE", False)
+        uncoalesced = await herd(50)
+        without = selects
+
+        selects = 0
+        monkeypatch.setattr(settings, "BOOK_LIST_COALESCE", True)
+        coalesced = await herd(50)
+        with_coalescing = selects
+    finally:
+        event.remove(sync_engine, "before_cursor_execute", count)
+
+    assert coalesced == uncoalesced
+    assert without == 50
+    assert with_coalescing < without / 10
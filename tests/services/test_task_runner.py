@@ -0,0 +1,47 @@
+import asyncio
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.clients import http
+from app.core.metrics import metrics
+from app.db import session as db_session
+from app.task import runner
+from app.task.ratings import rebuild_rating_aggregates
+
+
+def test_tasks_share_one_long_lived_loop():
+    async def current_loop():
+        return asyncio.get_running_loop()
+
+    observed = metrics.histogram("task.probe.seconds").count
+    try:
+        first = runner.run_task("probe", current_loop())
+        second = runner.run_task("probe", current_loop())
+        assert first is second and first.is_running()
+        assert metrics.histogram("task.probe.seconds").count == observed + 2
+    finally:
+        runner.runner.stop()
+    assert not runner.runner.running
+
+
+def test_worker_lifecycle_opens_and_disposes_resources(monkeypatch):
+    # Disposing the shared in-memory engine would drop the test database.
+    engine = create_async_engine("sqlite+aiosqlite://")
+    monkeypatch.setattr(db_session, "get_engine", lambda: engine)
+
+    runner.init_worker_process()
+    client = http.get_shared_http_client()
+    assert client is not None and not client.is_closed
+
+    runner.shutdown_worker_process()
+
+    assert client.is_closed and http.get_shared_http_client() is None
+    assert not runner.runner.running
+
+
+def test_celery_task_runs_on_worker_loop():
+    try:
+        assert rebuild_rating_aggregates() == {"ok": True, "updated": 0}
+        assert rebuild_rating_aggregates() == {"ok": True, "updated": 0}
+    finally:
+        runner.runner.stop()
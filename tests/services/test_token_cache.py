@@ -0,0 +1,64 @@
+import time
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import HTTPAuthorizationCredentials
+from jose import jwt
+
+from app.api.deps import get_current_username
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.security import create_access_token
+from app.core.token_cache import TokenCache, token_cache
+
+
+def _creds(token: str) -> HTTPAuthorizationCredentials:
+    return HTTPAuthorizationCredentials(scheme="Bearer", credentials=token)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    token_cache.clear()
+    yield
+    token_cache.clear()
+
+
+@pytest.mark.asyncio
+async def test_verified_token_is_served_from_cache():
+    token = create_access_token("abdur")
+    hits = metrics.counter("auth.token_cache.hits").value
+
+    assert await get_current_username(_creds(token)) == "abdur"
+    assert await get_current_username(_creds(token)) == "abdur"
+
+    assert metrics.counter("auth.token_cache.hits").value == hits + 1
+    assert len(token_cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_bad_tokens_are_rejected_every_time_and_never_cached():
+    forged = jwt.encode(
+        {"sub": "abdur", "exp": time.time() + 60}, "wrong-key", algorithm="HS256"
+    )
+    no_sub = jwt.encode(
+        {"exp": time.time() + 60}, settings.SECRET_KEY, algorithm=settings.ALGORITHM
+    )
+    for token in (forged, forged, no_sub, "garbage"):
+        with pytest.raises(HTTPException) as excinfo:
+            await get_current_username(_creds(token))
+        assert excinfo.value.status_code == 401
+    assert len(token_cache) == 0
+
+
+def test_entries_expire_at_token_exp_and_respect_size_cap():
+    cache = TokenCache(max_size=2)
+    now = time.time()
+    cache.put("a", "alice", now + 10)
+    cache.put("b", "bob", now + 10)
+    assert cache.get("a", now=now) == "alice"  # refresh "a"
+    cache.put("c", "carol", now + 10)  # evicts least recently used "b"
+
+    assert cache.get("b", now=now) is None
+    assert cache.get("c", now=now) == "carol"
+    assert cache.get("a", now=now + 10) is None  # expired at exp
+    assert len(cache) == 1
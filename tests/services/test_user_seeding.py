@@ -0,0 +1,52 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import select
+
+from app import main
+from app.core.config import settings
+from app.core.security import hash_password, verify_password
+from app.db.session import AsyncSessionLocal
+from app.models.user import User
+
+
+@pytest.mark.asyncio
+async def test_seed_users_hashes_only_new_usernames(tmp_path, monkeypatch):
+    seed = tmp_path / "users.json"
+    seed.write_text(
+        json.dumps(
+            [
+                {"username": "abdur", "password": "password123"},  # already stored
+                {"username": "rafay", "password": "test123"},
+                {"username": "rafay", "password": "dupe"},  # repeated in file
+                {"username": "noPassword"},
+            ]
+            + [{"username": f"user{i}", "password": f"pw{i}"} for i in range(5)]
+        )
+    )
+    monkeypatch.setattr(settings, "USERS_SEED_FILE", str(seed))
+    monkeypatch.setattr(settings, "SEED_BATCH_SIZE", 4)
+    monkeypatch.setattr(settings, "SEED_HASH_CHUNK_SIZE", 2)
+
+    hashed = []
+
+    def recording_hash(plains):
+        hashed.extend(plains)
+        return [hash_password(p) for p in plains]
+
+    monkeypatch.setattr(main, "hash_passwords", recording_hash)
+
+    async with AsyncSessionLocal() as s:
+        s.add(User(username="abdur", password=hash_password("password123")))
+        await s.commit()
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        await main.seed_users(executor=pool)
+
+    assert sorted(hashed) == sorted(["test123"] + [f"pw{i}" for i in range(5)])
+    async with AsyncSessionLocal() as s:
+        users = {u.username: u for u in (await s.execute(select(User))).scalars()}
+    assert len(users) == 7
+    assert verify_password("test123", users["rafay"].password)
+    assert verify_password("pw3", users["user3"].password)
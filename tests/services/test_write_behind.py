@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.core.write_behind import WriteBehindBuffer
+from app.db.session import AsyncSessionLocal
+from app.models.book import Book
+from app.models.review import Review
+from app.repositories.book_repo import BookRepository
+from app.schemas.review import ReviewUpsertRequest
+from app.services.review_service import ReviewService, close_review_write_buffer
+
+
+@pytest.mark.asyncio
+async def test_buffer_groups_merges_and_isolates_failures():
+    batches = []
+
+    async def flush(batch):
+        batches.append(dict(batch))
+        return {
+            key: ValueError(key) if value == "bad" else value.upper()
+            for key, value in batch.items()
+        }
+
+    buffer = WriteBehindBuffer("test", flush, max_items=3, interval_seconds=60)
+    first = asyncio.create_task(buffer.submit("a", "one"))
+    await asyncio.sleep(0)
+    # Reaching max_items flushes right away, long before the interval.
+    results = await asyncio.gather(
+        first,
+        buffer.submit("a", "two"),  # same key: merged, last write wins
+        buffer.submit("b", "bad"),
+        buffer.submit("c", "three"),
+        return_exceptions=True,
+    )
+    assert batches == [{"a": "two", "b": "bad", "c": "three"}]
+    assert results[:2] == ["TWO", "TWO"] and results[3] == "THREE"
+    assert isinstance(results[2], ValueError)
+    assert metrics.counter("write_behind.test.merged").value >= 1
+
+    # A partial batch waits for the interval; close() flushes it at once.
+    buffer.interval_seconds = 0.01
+    assert await buffer.submit("d", "four") == "FOUR"
+    pending = asyncio.create_task(buffer.submit("e", "five"))
+    await asyncio.sleep(0)
+    buffer.interval_seconds = 60
+    await buffer.close()
+    assert await pending == "FIVE" and batches[-1] == {"e": "five"}
+
+
+@pytest.mark.asyncio
+async def test_a_failing_flush_fails_its_callers_only():
+    calls = 0
+
+    async def flush(batch):
+        nonlocal calls
+        calls += 1
+        if calls == 1:
+            raise RuntimeError("db down")
+        return dict(batch)
+
+    buffer = WriteBehindBuffer("test", flush, max_items=2, interval_seconds=0.01)
+    results = await asyncio.gather(
+        buffer.submit(1, "x"), buffer.submit(2, "y"), return_exceptions=True
+    )
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert await buffer.submit(3, "z") == "z"
+    await buffer.close()
+
+
+@pytest.mark.asyncio
+async def test_cancelling_a_flush_does_not_strand_its_callers():
+    started = asyncio.Event()
+
+    async def flush(batch):
+        started.set()
+        await asyncio.sleep(60)
+        return dict(batch)
+
+    buffer = WriteBehindBuffer("test", flush, max_items=1, interval_seconds=0.01)
+    writes = asyncio.gather(buffer.submit(1, "x"), return_exceptions=True)
+    await started.wait()
+    buffer._task.cancel()
+    [result] = await asyncio.wait_for(writes, 1)
+    assert isinstance(result, RuntimeError) and "cancelled" in str(result)
+
+
+@pytest.mark.asyncio
+async def test_review_posts_are_group_committed(monkeypatch):
+    monkeypatch.setattr(settings, "REVIEW_WRITE_BEHIND", True)
+    monkeypatch.setattr(settings, "REVIEW_WRITE_BEHIND_MAX_ITEMS", 100)
+    monkeypatch.setattr(settings, "REVIEW_WRITE_BEHIND_INTERVAL_MS", 20)
+    async with AsyncSessionLocal() as db:
+        books = BookRepository(db)
+        await books.ingest_books(
+            [{"title": f"T{i}", "author": "A", "genre": "G"} for i in range(4)]
+        )
+        ids = sorted(row["book"].id for row in await books.list_with_avg(limit=4))
+
+    flushes = metrics.histogram("write_behind.reviews.batch_size")
+    flushes_before = flushes.count
+
+    async def post(book_id: int, username: str, rating: int):
+        async with AsyncSessionLocal() as db:
+            return await ReviewService(db).upsert(
+                book_id=book_id,
+                username=username,
+                data=ReviewUpsertRequest(rating=rating, review_text=f"{rating}"),
+            )
+
+    writes = [
+        (book_id, f"u{u}", 1 + (book_id + u) % 5) for book_id in ids for u in range(5)
+    ]
+    try:
+        results = await asyncio.gather(
+            *(post(*w) for w in writes),
+            post(ids[0], "u0", 5),  # rewrites an earlier pending review
+        )
+        # All 21 POSTs went out in one transaction.
+        assert flushes.count - flushes_before == 1
+        assert all(r.id for r in results)
+        # Both writes to (ids[0], "u0") resolve to the merged final review.
+        assert results[0].rating == results[-1].rating == 5
+        assert results[0].id == results[-1].id
+
+        # An unknown book fails only its own caller (the batch is redone row by row).
+        results = await asyncio.gather(
+            post(999999, "u0", 3), post(ids[1], "late", 4), return_exceptions=True
+        )
+        assert isinstance(results[0], HTTPException) and results[0].status_code == 404
+        assert results[1].rating == 4
+    finally:
+        await close_review_write_buffer()
+
+    async with AsyncSessionLocal() as db:
+        ratings = {
+            (r.book_id, r.username): r.rating
+            for r in (await db.execute(select(Review))).scalars().all()
+        }
+        assert len(ratings) == len(writes) + 1 and ratings[(ids[0], "u0")] == 5
+        for book_id in ids:
+            book = await db.get(Book, book_id)
+            expected = [v for (b, _), v in ratings.items() if b == book_id]
+            assert (book.rating_count, book.rating_sum) == (
+                len(expected),
+                sum(expected),
+            )